@@ -0,0 +1,709 @@
+#!/usr/bin/env python3
+"""Article Flow - Run the article pipeline in a single process
+
+    python scripts/article_flow.py run --params-file params.json --output-dir output/<article_id>
+    python scripts/article_flow.py batch --requests-file requests.csv --output-dir output/batch
+
+Phases run as an in-memory DAG: each phase receives its upstream results
+directly and shares one Claude client, config and research cache with the
+others. Every phase still writes the same artifacts as its standalone script.
+
+In batch mode the phases of all articles are interleaved on one worker pool,
+and Claude and search calls draw from shared per-provider token buckets, so
+throughput is bounded by API quota rather than by one article's serial chain.
+
+With `--speculative-structure FRACTION`, structure planning starts on the
+searches finished so far once that fraction of research has landed. When
+research completes, the draft is kept unless the high-priority sources
+changed materially (`--reconcile-threshold`), in which case it is re-planned.
+The draft writes no files; the structure and outline are saved once accepted.
+
+With `--stream-sections`, the structure response is streamed and each main
+section starts being written as soon as its outline entry is complete, so
+writing overlaps the rest of structure planning. Sections whose final outline
+differs from the streamed one are rewritten.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.claude_api import ClaudeAPI
+from utils.file_utils import read_json, write_json, write_text, ensure_dir
+from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
+from utils.config import Config, validate_environment
+from utils.prompt_budget import DEFAULT_STRUCTURE_SOURCE_BUDGET, DEFAULT_SECTION_SOURCE_BUDGET
+from utils.research_cache import ResearchCache
+from utils.rate_limit import ProviderLimiter
+from utils.tracing import configure_tracing, start_span, end_span, use_span, span
+from utils.blob_store import BlobStore, pack_directory
+from utils.prompt_registry import validate_prompts
+from utils.incremental import PhaseState, hash_value, hash_module, hash_prompt, MISSING, STATE_DIR_NAME
+
+from phase1_request_analysis import run_analysis, analysis_prompt
+from phase2_research import run_research, RESEARCH_PROMPT
+from phase3_structure_planning import (
+    run_structure_planning,
+    reconcile_speculative_structure,
+    save_structure,
+    DEFAULT_RECONCILE_THRESHOLD,
+    STRUCTURE_PROMPT
+)
+from phase4_writing import run_writing, SectionWriter, DEFAULT_WRITER_WORKERS, WRITING_PROMPT
+from generate_images import create_generator, run_image_generation
+from generate_html_article import convert_markdown_to_html
+
+
+class PipelineContext:
+    """Clients, options and phase results shared by every phase of a run"""
+    
+    def __init__(
+        self,
+        params: dict,
+        output_dir: Path,
+        options: argparse.Namespace,
+        logger,
+        config: Optional[Config] = None,
+        claude: Optional[ClaudeAPI] = None,
+        research_cache: Optional[ResearchCache] = None,
+        limiters: Optional[Dict[str, ProviderLimiter]] = None,
+        research_providers: Optional[list] = None
+    ):
+        self.params = params
+        self.output_dir = ensure_dir(output_dir)
+        self.options = options
+        self.logger = logger
+        
+        # Created once (or passed in by the batch runner) so every phase reuses warm connections
+        self.config = config or Config()
+        self.claude = claude or ClaudeAPI()
+        self.research_cache = research_cache or ResearchCache()
+        self.limiters = limiters or {}
+        # None means the phase scripts' default providers
+        self.research_providers = research_providers
+        
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        # Root span of this article's trace, opened when its first phase starts
+        self.trace_span = None
+        
+        # Incremental mode: stored results are reused for phases whose inputs are unchanged
+        self.force = set(getattr(options, "force", None) or [])
+        incremental = getattr(options, "incremental", False) or bool(self.force)
+        self.phase_state = PhaseState(self.output_dir) if incremental else None
+        self.result_hashes: Dict[str, Optional[str]] = {}
+        self.reuse: Dict[str, Dict[str, Any]] = {}
+        
+        # Speculative structure planning: (partial research, future of the draft structure)
+        self.speculation: Optional[tuple] = None
+        self.speculation_report: Optional[Dict[str, Any]] = None
+        
+        # Streaming structure-to-writing: sections already being written while the outline streams in
+        self.section_writer: Optional[SectionWriter] = None
+
+
+def phase_analysis(context: PipelineContext) -> dict:
+    return run_analysis(context.params, context.config, context.claude, context.output_dir, context.logger)
+
+
+def phase_research(context: PipelineContext) -> dict:
+    speculate_at = getattr(context.options, "speculative_structure", None)
+    return run_research(
+        context.results["analysis"],
+        context.claude,
+        context.output_dir,
+        context.logger,
+        context.options.parallel_batches,
+        context.research_cache,
+        context.limiters.get("search"),
+        context.research_providers,
+        speculate_at,
+        (lambda draft_research: start_speculative_structure(context, draft_research)) if speculate_at else None
+    )
+
+
+def start_speculative_structure(context: PipelineContext, draft_research: dict) -> None:
+    """Plan the structure on partial research in the background while the remaining searches run"""
+    completed = draft_research["metadata"]["completed_queries"]
+    total = len(draft_research["research_queries"])
+    context.logger.info(f"Starting speculative structure planning on {completed}/{total} research queries")
+    
+    def plan() -> dict:
+        with use_span(context.trace_span), span("structure.speculative", {"research.completed_queries": completed}):
+            return run_structure_planning(
+                draft_research,
+                context.claude,
+                context.config,
+                context.output_dir,
+                context.logger,
+                context.options.structure_token_budget,
+                write_outputs=False
+            )
+    
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculative-structure")
+    context.speculation = (draft_research, executor.submit(plan))
+    executor.shutdown(wait=False)
+
+
+def phase_structure(context: PipelineContext) -> dict:
+    if context.speculation is not None:
+        draft_research, draft = context.speculation
+        context.speculation = None
+        try:
+            structure = draft.result()
+        except Exception as e:
+            context.logger.warning(f"Speculative structure planning failed, planning from the full research: {e}")
+            structure = None
+        
+        if structure is not None:
+            threshold = getattr(context.options, "reconcile_threshold", DEFAULT_RECONCILE_THRESHOLD)
+            report = reconcile_speculative_structure(draft_research, context.results["research"], threshold)
+            context.speculation_report = report
+            if report["accepted"]:
+                context.logger.info(f"Keeping the speculative structure: {report['reason']}")
+                structure["metadata"]["speculative"] = report
+                save_structure(structure, context.output_dir)
+                return structure
+            context.logger.info(f"Re-planning the structure: {report['reason']}")
+    
+    on_section = None
+    if getattr(context.options, "stream_sections", False):
+        context.section_writer = SectionWriter(
+            context.results["research"],
+            context.claude,
+            context.config,
+            context.options.section_token_budget,
+            getattr(context.options, "writer_workers", DEFAULT_WRITER_WORKERS),
+            context.logger
+        )
+        on_section = context.section_writer.submit
+    
+    try:
+        return run_structure_planning(
+            context.results["research"],
+            context.claude,
+            context.config,
+            context.output_dir,
+            context.logger,
+            context.options.structure_token_budget,
+            on_section
+        )
+    except Exception:
+        if context.section_writer is not None:
+            context.section_writer.shutdown()
+            context.section_writer = None
+        raise
+
+
+def phase_writing(context: PipelineContext) -> dict:
+    writer, context.section_writer = context.section_writer, None
+    try:
+        return run_writing(
+            context.results["structure"],
+            context.results["research"],
+            context.claude,
+            context.config,
+            context.output_dir,
+            context.logger,
+            context.options.section_token_budget,
+            writer,
+            getattr(context.options, "writer_workers", DEFAULT_WRITER_WORKERS)
+        )
+    finally:
+        if writer is not None:
+            writer.shutdown()
+
+
+def phase_images(context: PipelineContext) -> Optional[dict]:
+    if context.options.image_generator == "none":
+        context.logger.info("Image generation disabled")
+        return None
+    
+    # Images are optional: without them (e.g. no OPENAI_API_KEY) the article is assembled text-only
+    try:
+        return run_image_generation(
+            context.results["structure"],
+            context.output_dir / "images",
+            create_generator(context.options.image_generator),
+            context.logger,
+            parallel=True,
+            generator_name=context.options.image_generator
+        )
+    except Exception as e:
+        context.logger.warning(f"Image generation failed, assembling the article without images: {e}")
+        return None
+
+
+def phase_html(context: PipelineContext) -> dict:
+    # generate_html_article works on the article directory's final_article.md and
+    # inserts whichever images were generated successfully
+    images = context.results.get("images")
+    if images is not None:
+        context.logger.info(
+            f"Assembling with {images['statistics']['successful']}/{images['statistics']['total_requested']} images"
+        )
+    write_text(context.results["writing"]["article"], context.output_dir / "final_article.md")
+    if not convert_markdown_to_html(str(context.output_dir)):
+        raise RuntimeError("HTML conversion failed")
+    return {"html_file": str(context.output_dir / "article.html")}
+
+
+# Phase DAG: each phase starts as soon as everything it requires has finished
+PHASES: List[Dict[str, Any]] = [
+    {"name": "analysis", "label": "Phase 1: Request Analysis", "requires": [], "run": phase_analysis},
+    {"name": "research", "label": "Phase 2: Research", "requires": ["analysis"], "run": phase_research},
+    {"name": "structure", "label": "Phase 3: Structure Planning", "requires": ["research"], "run": phase_structure},
+    {"name": "writing", "label": "Phase 4: Writing", "requires": ["structure", "research"], "run": phase_writing},
+    # Image prompts only need the structure, so images are generated while the article is written
+    {"name": "images", "label": "Phase 5: Image Generation", "requires": ["structure"], "run": phase_images},
+    {"name": "html", "label": "Phase 6: HTML Generation", "requires": ["writing", "images"], "run": phase_html}
+]
+
+# What each phase's result depends on besides its upstream results, for incremental runs.
+# Phases without an entry always run.
+PHASE_INPUTS: Dict[str, Dict[str, Any]] = {
+    "analysis": {
+        "params": True,
+        "prompts": ["00_parse_request", "00_parse_request_v3"],
+        "env": ["ENABLE_GEMINI_RESEARCH"],
+        "model": True,
+        "code": ["phase1_request_analysis"],
+        "outputs": ["phase1_output.json"]
+    },
+    "research": {
+        "prompts": ["01_research"],
+        "model": True,
+        "code": ["phase2_research", "utils.research_engine", "utils.research_providers", "utils.query_dedup"],
+        "outputs": ["phase2_research.json"]
+    },
+    "structure": {
+        "prompts": ["02_structure"],
+        "config": ["requirements"],
+        "options": ["structure_token_budget", "speculative_structure", "reconcile_threshold"],
+        "model": True,
+        "code": ["phase3_structure_planning", "utils.prompt_budget"],
+        "outputs": ["phase3_structure.json", "article_outline.md"]
+    },
+    "writing": {
+        "prompts": ["03_writing"],
+        "config": ["requirements"],
+        "options": ["section_token_budget"],
+        "model": True,
+        "code": ["phase4_writing", "utils.prompt_budget", "utils.source_index", "utils.keyword_index"],
+        "outputs": ["phase4_article.md", "phase4_metadata.json"]
+    },
+    "images": {
+        "options": ["image_generator"],
+        "code": ["generate_images"],
+        "outputs": ["images/images_metadata.json"]
+    },
+    "html": {
+        "code": ["generate_html_article"],
+        "outputs": ["final_article.md", "article.html"]
+    }
+}
+
+
+def phase_inputs(phase: Dict[str, Any], context: PipelineContext) -> Dict[str, Optional[str]]:
+    """Hash every declared input of a phase (None marks an upstream result that can't be fingerprinted)"""
+    declared = PHASE_INPUTS[phase["name"]]
+    inputs = {f"upstream.{name}": context.result_hashes.get(name) for name in phase["requires"]}
+    if declared.get("params"):
+        inputs["params"] = hash_value(context.params)
+    for name in declared.get("prompts", []):
+        inputs[f"prompt.{name}"] = hash_prompt(name)
+    for name in declared.get("config", []):
+        try:
+            inputs[f"config.{name}"] = hash_value(context.config.load_config(name))
+        except FileNotFoundError:
+            inputs[f"config.{name}"] = MISSING
+    for name in declared.get("options", []):
+        inputs[f"option.{name}"] = hash_value(getattr(context.options, name, None))
+    for name in declared.get("env", []):
+        inputs[f"env.{name}"] = hash_value(os.environ.get(name, ""))
+    for name in declared.get("code", []):
+        inputs[f"code.{name}"] = hash_module(name)
+    if declared.get("model"):
+        inputs["model"] = hash_value(getattr(context.claude, "model", None))
+        router = getattr(context.claude, "router", None)
+        if router is not None:
+            inputs["model_routing"] = hash_value(router.policy())
+    return inputs
+
+
+def run_phase(phase: Dict[str, Any], context: PipelineContext) -> Any:
+    """Run one phase with the usual phase logging and record its duration
+    
+    In incremental mode the stored result is returned instead when the
+    phase's input hashes match the last run, unless the phase is forced.
+    """
+    state = context.phase_state if phase["name"] in PHASE_INPUTS else None
+    inputs = None
+    if state is not None:
+        inputs = phase_inputs(phase, context)
+        reusable, reason = state.lookup(phase["name"], inputs)
+        if phase["name"] in context.force or "all" in context.force:
+            reusable, reason = False, "forced"
+        if reusable:
+            context.logger.info(f"♻️  {phase['label']}: inputs unchanged, reusing the stored result")
+            context.result_hashes[phase["name"]] = state.result_hash(phase["name"])
+            context.reuse[phase["name"]] = {"status": "reused", "reason": reason}
+            context.timings[phase["name"]] = 0.0
+            return state.load_result(phase["name"])
+        context.reuse[phase["name"]] = {"status": "ran", "reason": reason}
+    
+    # Worker threads don't inherit the scheduler's context, so parent the phase span explicitly
+    with use_span(context.trace_span):
+        log_phase_start(context.logger, phase["label"])
+        start_time = time.time()
+        try:
+            result = phase["run"](context)
+        except Exception as e:
+            log_error(context.logger, e, phase["label"])
+            log_phase_end(context.logger, phase["label"], success=False)
+            raise
+        finally:
+            context.timings[phase["name"]] = round(time.time() - start_time, 2)
+        
+        log_metric(context.logger, f"{phase['name']}_time", context.timings[phase["name"]], "seconds")
+        log_phase_end(context.logger, phase["label"], success=True)
+    
+    if state is not None:
+        context.result_hashes[phase["name"]] = state.record(
+            phase["name"], inputs, result, PHASE_INPUTS[phase["name"]].get("outputs", [])
+        )
+    return result
+
+
+def run_pipelines(
+    contexts: List[PipelineContext],
+    phases: List[Dict[str, Any]] = PHASES,
+    max_workers: int = 4
+) -> List[Optional[Exception]]:
+    """Interleave the phase DAGs of several runs on one worker pool
+    
+    Whenever a worker is free, the ready phase furthest along the pipeline is
+    started first (earlier articles break ties), so articles in flight finish
+    before new ones are started. A failed phase stops only its own run.
+    
+    Returns:
+        The error of each run, or None for runs that completed
+    """
+    order = {phase["name"]: position for position, phase in enumerate(phases)}
+    pending = [{phase["name"]: phase for phase in phases} for _ in contexts]
+    errors: List[Optional[Exception]] = [None] * len(contexts)
+    running: Dict[Any, tuple] = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            ready = [
+                (-order[name], index, name)
+                for index, remaining in enumerate(pending)
+                if errors[index] is None
+                for name, phase in remaining.items()
+                if all(dependency in contexts[index].results for dependency in phase["requires"])
+            ]
+            for _, index, name in sorted(ready)[:max_workers - len(running)]:
+                phase = pending[index].pop(name)
+                if contexts[index].trace_span is None:
+                    contexts[index].trace_span = start_span("article", {
+                        "article.id": getattr(contexts[index].logger, "extra", {}).get("article_id"),
+                        "article.topic": contexts[index].params.get("topic"),
+                        "article.output_dir": str(contexts[index].output_dir)
+                    }, activate=False)
+                running[executor.submit(run_phase, phase, contexts[index])] = (index, name)
+            
+            if not running:
+                break
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, name = running.pop(future)
+                try:
+                    contexts[index].results[name] = future.result()
+                except Exception as e:
+                    errors[index] = e
+                
+                in_flight = any(running_index == index for running_index, _ in running.values())
+                if errors[index] is not None or not (pending[index] or in_flight):
+                    end_span(contexts[index].trace_span, errors[index])
+    
+    for index, remaining in enumerate(pending):
+        if errors[index] is None and remaining:
+            errors[index] = RuntimeError(f"Unsatisfiable phase dependencies: {sorted(remaining)}")
+            end_span(contexts[index].trace_span, errors[index])
+    
+    return errors
+
+
+def validate_pipeline_prompts() -> None:
+    """Check every template the phases render, before the first API call"""
+    validate_prompts([analysis_prompt().name, RESEARCH_PROMPT.name, STRUCTURE_PROMPT.name, WRITING_PROMPT.name])
+
+
+def log_reuse_report(context: PipelineContext) -> None:
+    """One line per phase saying whether it ran or was reused, and why"""
+    if context.phase_state is None:
+        return
+    reused = [name for name, entry in context.reuse.items() if entry["status"] == "reused"]
+    context.logger.info(f"Incremental run: {len(reused)}/{len(context.reuse)} phases reused")
+    for name, entry in context.reuse.items():
+        marker = "♻️ " if entry["status"] == "reused" else "▶️ "
+        context.logger.info(f"  {marker} {name:<10} {entry['status']:<7} {entry['reason']} ({context.timings.get(name, 0)}s)")
+
+
+def run_pipeline(context: PipelineContext, phases: List[Dict[str, Any]] = PHASES, max_workers: int = 4) -> Dict[str, Any]:
+    """Run one request's phases in dependency order, starting independent phases concurrently"""
+    error = run_pipelines([context], phases, max_workers)[0]
+    if error is not None:
+        raise error
+    return context.results
+
+
+class ArticleLogger(logging.LoggerAdapter):
+    """Prefix messages with the article id so interleaved batch logs stay readable"""
+    
+    def process(self, msg, kwargs):
+        return f"[{self.extra['article_id']}] {msg}", kwargs
+
+
+def load_requests(requests_file: str) -> List[dict]:
+    """Read article requests from a CSV (header row = parameter names) or JSONL file"""
+    path = Path(requests_file)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.suffix.lower() == ".csv":
+            requests = [
+                {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+                for row in csv.DictReader(f)
+            ]
+        else:
+            requests = [json.loads(line) for line in f if line.strip()]
+    
+    return [request for request in requests if request]
+
+
+def create_limiters(args: argparse.Namespace) -> Dict[str, ProviderLimiter]:
+    """Shared quotas for every provider the pipeline calls"""
+    return {
+        "anthropic": ProviderLimiter("anthropic", args.anthropic_rpm, args.anthropic_itpm),
+        "search": ProviderLimiter("search", args.search_rpm)
+    }
+
+
+def command_run(args: argparse.Namespace) -> None:
+    """`run`: execute the whole pipeline for one request"""
+    logger = setup_logging("article_flow", args.log_level)
+    output_dir = Path(args.output_dir)
+    start_time = time.time()
+    
+    try:
+        validate_environment()
+        validate_pipeline_prompts()
+        context = PipelineContext(read_json(args.params_file), output_dir, args, logger)
+        run_pipeline(context)
+    except Exception as e:
+        log_error(logger, e, "Article Flow")
+        sys.exit(1)
+    
+    log_reuse_report(context)
+    elapsed_time = time.time() - start_time
+    summary = {
+        "params_file": args.params_file,
+        "output_dir": str(output_dir),
+        "phase_times": context.timings,
+        "total_time": round(elapsed_time, 2),
+        "research_cache": context.research_cache.stats(),
+        "models": context.claude.model_stats(),
+        "completed_at": datetime.utcnow().isoformat()
+    }
+    if context.phase_state is not None:
+        summary["incremental"] = context.reuse
+    if context.speculation_report is not None:
+        summary["speculative_structure"] = context.speculation_report
+    if args.blob_store:
+        store = BlobStore(args.blob_store)
+        manifest = pack_directory(store, output_dir, exclude=[STATE_DIR_NAME])
+        summary["artifact_manifest"] = str(store.manifests_dir / f"{manifest['run_id']}.json")
+        summary["artifact_store"] = manifest["stats"]
+    write_json(summary, output_dir / "pipeline_summary.json")
+    
+    log_metric(logger, "pipeline_time", round(elapsed_time, 2), "seconds")
+    logger.info(f"Article generated in {output_dir}")
+
+
+def command_batch(args: argparse.Namespace) -> None:
+    """`batch`: run many requests concurrently under shared provider quotas"""
+    logger = setup_logging("article_flow", args.log_level)
+    output_root = ensure_dir(args.output_dir)
+    start_time = time.time()
+    
+    try:
+        validate_environment()
+        validate_pipeline_prompts()
+        requests = load_requests(args.requests_file)
+        if not requests:
+            raise ValueError(f"No article requests found in {args.requests_file}")
+        
+        limiters = create_limiters(args)
+        config = Config()
+        claude = ClaudeAPI(limiter=limiters["anthropic"])
+        research_cache = ResearchCache()
+    except Exception as e:
+        log_error(logger, e, "Article Flow batch")
+        sys.exit(1)
+    
+    logger.info(f"Running {len(requests)} articles with {args.workers} phase workers")
+    
+    contexts = []
+    for index, params in enumerate(requests, 1):
+        article_id = str(params.get("article_id") or f"article_{index:03d}")
+        contexts.append(PipelineContext(
+            params,
+            output_root / article_id,
+            args,
+            ArticleLogger(logger, {"article_id": article_id}),
+            config=config,
+            claude=claude,
+            research_cache=research_cache,
+            limiters=limiters
+        ))
+    
+    errors = run_pipelines(contexts, max_workers=args.workers)
+    elapsed_time = time.time() - start_time
+    
+    # One store for the whole batch, so artifacts shared between articles are stored once
+    store = BlobStore(args.blob_store) if args.blob_store else None
+    
+    articles = []
+    for context, error in zip(contexts, errors):
+        if error is not None:
+            log_error(context.logger, error, "Article Flow batch")
+        log_reuse_report(context)
+        article = {
+            "article_id": context.logger.extra["article_id"],
+            "topic": context.params.get("topic"),
+            "output_dir": str(context.output_dir),
+            "status": "failed" if error else "completed",
+            "error": str(error) if error else None,
+            "phase_times": context.timings
+        }
+        if context.speculation_report is not None:
+            article["speculative_structure"] = "kept" if context.speculation_report["accepted"] else "re-planned"
+        if context.phase_state is not None:
+            article["reused_phases"] = [name for name, entry in context.reuse.items() if entry["status"] == "reused"]
+        if store is not None:
+            manifest = pack_directory(store, context.output_dir, article["article_id"], [STATE_DIR_NAME])
+            article["artifact_manifest"] = str(store.manifests_dir / f"{manifest['run_id']}.json")
+        articles.append(article)
+    
+    completed = len([a for a in articles if a["status"] == "completed"])
+    summary = {
+        "requests_file": args.requests_file,
+        "articles": articles,
+        "completed": completed,
+        "failed": len(articles) - completed,
+        "total_time": round(elapsed_time, 2),
+        "articles_per_hour": round(completed / elapsed_time * 3600, 2) if elapsed_time else 0,
+        "quotas": {name: limiter.stats() for name, limiter in limiters.items()},
+        "research_cache": research_cache.stats(),
+        "models": claude.model_stats(),
+        "completed_at": datetime.utcnow().isoformat()
+    }
+    if store is not None:
+        summary["artifact_store"] = store.stats()
+    write_json(summary, output_root / "batch_summary.json")
+    
+    log_metric(logger, "articles_completed", completed)
+    log_metric(logger, "articles_per_hour", summary["articles_per_hour"])
+    
+    if completed < len(articles):
+        logger.warning(f"{len(articles) - completed} of {len(articles)} articles failed")
+        sys.exit(1)
+
+
+def add_pipeline_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options shared by `run` and `batch`"""
+    parser.add_argument("--output-dir", required=True, help="Output directory")
+    parser.add_argument("--parallel-batches", type=int, default=5, help="Number of concurrent searches")
+    parser.add_argument("--structure-token-budget", type=int, default=DEFAULT_STRUCTURE_SOURCE_BUDGET,
+                        help="Estimated token budget for research sources in the structure prompt")
+    parser.add_argument("--section-token-budget", type=int, default=DEFAULT_SECTION_SOURCE_BUDGET,
+                        help="Estimated token budget for research sources in each section prompt")
+    parser.add_argument("--image-generator", default="dalle3", choices=["dalle3", "stable", "none"])
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    parser.add_argument("--trace", help="Write an OpenTelemetry (OTLP/JSON) trace of the run to this file")
+    parser.add_argument("--blob-store", help="Also pack each article's artifacts into this content-addressed store")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse stored phase results whose inputs (upstream results, prompts, config, code, model) are unchanged")
+    parser.add_argument("--force", action="append", metavar="PHASE", choices=[phase["name"] for phase in PHASES] + ["all"],
+                        help="Re-run this phase even if its inputs are unchanged (implies --incremental; repeatable)")
+    add_speculation_arguments(parser)
+    add_streaming_arguments(parser)
+
+
+def research_fraction(value: str) -> float:
+    fraction = float(value)
+    if not 0 < fraction <= 1:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 1, got {value}")
+    return fraction
+
+
+def add_speculation_arguments(parser: argparse.ArgumentParser) -> None:
+    """Speculative structure planning options (also used by the benchmark)"""
+    parser.add_argument("--speculative-structure", type=research_fraction, metavar="FRACTION",
+                        help="Start structure planning once this fraction of the research queries has finished")
+    parser.add_argument("--reconcile-threshold", type=float, default=DEFAULT_RECONCILE_THRESHOLD,
+                        help="Re-plan a speculative structure when more than this share of the final high-priority sources is new")
+
+
+def add_streaming_arguments(parser: argparse.ArgumentParser) -> None:
+    """Section writing options (also used by the benchmark)"""
+    parser.add_argument("--stream-sections", action="store_true",
+                        help="Stream the structure and start writing each section as soon as its outline is complete")
+    parser.add_argument("--writer-workers", type=int, default=DEFAULT_WRITER_WORKERS, help="Sections written in parallel")
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Article Flow: run the article pipeline in one process")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = subparsers.add_parser("run", help="Run phases 1-6 for a single request")
+    run_parser.add_argument("--params-file", required=True, help="Input parameters JSON file")
+    add_pipeline_arguments(run_parser)
+    run_parser.set_defaults(handler=command_run)
+    
+    batch_parser = subparsers.add_parser("batch", help="Run many requests from a CSV or JSONL file")
+    batch_parser.add_argument("--requests-file", required=True, help="CSV (with header) or JSONL article requests")
+    add_pipeline_arguments(batch_parser)
+    batch_parser.add_argument("--workers", type=int, default=8, help="Phases running at once across all articles")
+    batch_parser.add_argument("--anthropic-rpm", type=float, default=50, help="Claude requests per minute")
+    batch_parser.add_argument("--anthropic-itpm", type=float, default=40000,
+                              help="Claude input tokens per minute (estimated locally)")
+    batch_parser.add_argument("--search-rpm", type=float, default=120, help="Search API requests per minute")
+    batch_parser.set_defaults(handler=command_batch)
+    
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function"""
+    args = parse_arguments()
+    if args.trace:
+        configure_tracing(args.trace)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
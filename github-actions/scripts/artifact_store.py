@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Artifact store - Pack phase outputs into a content-addressed blob store
+フェーズ成果物を重複排除して保存・復元する
+
+    python scripts/artifact_store.py pack output/<article_id> --store .artifact-store
+    python scripts/artifact_store.py unpack .artifact-store/manifests/<article_id>.json --store .artifact-store --output-dir output/<article_id>
+    python scripts/artifact_store.py export .artifact-store/manifests/<article_id>.json --store .artifact-store --to transfer/ --have downloaded-store/
+
+`pack` stores each file once per unique content (JSON artifacts are split so
+inputs embedded in later phases are shared) and writes a run manifest.
+`export` copies only the blobs a manifest needs that `--have` stores lack, so
+a job can hand the next one just the bytes it produced.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.blob_store import BlobStore, pack_directory, unpack_manifest, export_blobs
+from utils.file_utils import read_json
+
+
+def format_bytes(size: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def command_pack(args: argparse.Namespace) -> None:
+    store = BlobStore(args.store)
+    manifest = pack_directory(store, args.directory, args.run_id, args.exclude)
+    stats = manifest["stats"]
+    print(f"📦 Packed {stats['files']} files ({format_bytes(stats['bytes_in'])}) from {args.directory}")
+    print(f"   New blobs: {stats['blobs_written']} ({format_bytes(stats['bytes_written'])}), reused: {stats['blobs_reused']}")
+    print(f"💾 Manifest: {store.manifests_dir / (manifest['run_id'] + '.json')}")
+
+
+def command_unpack(args: argparse.Namespace) -> None:
+    store = BlobStore(args.store)
+    written = unpack_manifest(store, args.manifest, args.output_dir)
+    print(f"📂 Restored {len(written)} files to {args.output_dir}")
+
+
+def command_export(args: argparse.Namespace) -> None:
+    store = BlobStore(args.store)
+    manifest = read_json(args.manifest)
+    have = set()
+    for other in args.have or []:
+        other_objects = Path(other) / "objects"
+        have.update(path.name for path in other_objects.glob("*/*") if not path.name.startswith("."))
+    copied = export_blobs(store, manifest, args.to, have)
+    print(f"📤 Exported {copied} blobs for {manifest['run_id']} to {args.to} (receiver already has {len(have)} blobs)")
+
+
+def command_stats(args: argparse.Namespace) -> None:
+    store = BlobStore(args.store)
+    usage = store.disk_usage()
+    manifests = sorted(store.manifests_dir.glob("*.json"))
+    logical = sum(read_json(path)["stats"]["bytes_in"] for path in manifests)
+    print(f"🗄️  {args.store}: {usage['blobs']} blobs, {format_bytes(usage['bytes'])} on disk, codec {store.codec}")
+    print(f"   {len(manifests)} runs totalling {format_bytes(logical)} of artifacts"
+          + (f" ({logical / usage['bytes']:.1f}x reduction)" if usage["bytes"] else ""))
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Content-addressed storage for phase artifacts")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    pack_parser = subparsers.add_parser("pack", help="Store an output directory and write its manifest")
+    pack_parser.add_argument("directory", help="Phase output directory")
+    pack_parser.add_argument("--store", required=True, help="Blob store directory")
+    pack_parser.add_argument("--run-id", help="Manifest name (default: the directory name)")
+    pack_parser.add_argument("--exclude", nargs="*", default=[], help="File names or relative paths to skip")
+    pack_parser.set_defaults(handler=command_pack)
+    
+    unpack_parser = subparsers.add_parser("unpack", help="Rebuild an output directory from a manifest")
+    unpack_parser.add_argument("manifest", help="Run manifest JSON")
+    unpack_parser.add_argument("--store", required=True, help="Blob store directory")
+    unpack_parser.add_argument("--output-dir", required=True, help="Directory to restore into")
+    unpack_parser.set_defaults(handler=command_unpack)
+    
+    export_parser = subparsers.add_parser("export", help="Copy the blobs of a manifest into another store")
+    export_parser.add_argument("manifest", help="Run manifest JSON")
+    export_parser.add_argument("--store", required=True, help="Blob store directory")
+    export_parser.add_argument("--to", required=True, help="Target store directory")
+    export_parser.add_argument("--have", nargs="*", help="Stores whose blobs the receiver already has")
+    export_parser.set_defaults(handler=command_export)
+    
+    stats_parser = subparsers.add_parser("stats", help="Show store size and deduplication")
+    stats_parser.add_argument("--store", required=True, help="Blob store directory")
+    stats_parser.set_defaults(handler=command_stats)
+    
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    try:
+        args.handler(args)
+    except Exception as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -7,7 +7,6 @@ Automatic HTML Output Fixer
 import os
 import sys
 import json
-import requests
 from typing import Dict, Optional
 
 class HTMLAutoFixer:
@@ -62,6 +61,7 @@ class HTMLAutoFixer:
 
     def fix_html_content(self, html_content: str) -> Optional[str]:
         """Claude APIを使用してHTML修正"""
+        import requests
         
         prompt = f"""以下のHTMLを修正してください：
 
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for github-actions scripts and utils
+スクリプト起動時間（import時間）のベンチマーク
+
+Each module is imported in a fresh interpreter with `python -X importtime`.
+The run fails when a module's cumulative import time exceeds the budget or
+when importing it pulls in a heavy provider SDK that should be lazy.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+GITHUB_ACTIONS_DIR = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = GITHUB_ACTIONS_DIR / "scripts"
+UTILS_DIR = GITHUB_ACTIONS_DIR / "utils"
+
+# Cumulative import budget per module in milliseconds
+DEFAULT_BUDGET_MS = 250
+
+# SDKs that must only be imported on first use
+HEAVY_MODULES = [
+    "anthropic",
+    "google.generativeai",
+    "google.genai",
+    "googleapiclient",
+    "vertexai",
+    "openai",
+    "PIL",
+    "bs4",
+    "markdown"
+]
+
+# Scripts whose only job needs the SDK, so importing it up front is expected
+HEAVY_IMPORT_EXEMPT = {
+    "research_batch_gemini": ["google.genai"]
+}
+
+# Helper scripts that are not Python entry points worth timing
+SKIPPED_SCRIPTS = {"benchmark_import_time", "run_integration_tests"}
+
+
+def default_targets() -> List[str]:
+    """utils modules plus every script, as importable module names"""
+    targets = [f"utils.{path.stem}" for path in sorted(UTILS_DIR.glob("*.py")) if path.stem != "__init__"]
+    targets += [path.stem for path in sorted(SCRIPTS_DIR.glob("*.py")) if path.stem not in SKIPPED_SCRIPTS]
+    return targets
+
+
+def _parse_line(line: str) -> Optional[tuple]:
+    """Parse one `-X importtime` line into (name, cumulative_us, depth)"""
+    if not line.startswith("import time:") or "[us]" in line:
+        return None
+    fields = line[len("import time:"):].split("|")
+    if len(fields) != 3:
+        return None
+    try:
+        cumulative_us = int(fields[1].strip())
+    except ValueError:
+        return None
+    raw_name = fields[2].rstrip()
+    depth = (len(raw_name) - len(raw_name.lstrip(" ")) - 1) // 2
+    return raw_name.strip(), cumulative_us, depth
+
+
+def measure_module(module: str, repeat: int = 3) -> Dict[str, Any]:
+    """Import a module in fresh interpreters and return its best cumulative time"""
+    code = (
+        "import sys; "
+        f"sys.path[:0] = [{str(GITHUB_ACTIONS_DIR)!r}, {str(SCRIPTS_DIR)!r}]; "
+        f"import {module}"
+    )
+    best_us = None
+    imported: List[str] = []
+    
+    for _ in range(max(1, repeat)):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            cwd=str(GITHUB_ACTIONS_DIR)
+        )
+        if completed.returncode != 0:
+            error_lines = [l for l in completed.stderr.splitlines() if not l.startswith("import time:")]
+            return {"module": module, "error": error_lines[-1] if error_lines else "import failed"}
+        
+        module_us = None
+        imported = []
+        for line in completed.stderr.splitlines():
+            parsed = _parse_line(line)
+            if parsed is None:
+                continue
+            name, cumulative_us, depth = parsed
+            imported.append(name)
+            if name == module and depth == 0:
+                module_us = cumulative_us
+        if module_us is not None and (best_us is None or module_us < best_us):
+            best_us = module_us
+    
+    exempt = HEAVY_IMPORT_EXEMPT.get(module, [])
+    heavy = sorted({
+        heavy_module
+        for heavy_module in HEAVY_MODULES
+        for name in imported
+        if (name == heavy_module or name.startswith(heavy_module + ".")) and heavy_module not in exempt
+    })
+    
+    return {
+        "module": module,
+        "import_ms": round((best_us or 0) / 1000, 1),
+        "modules_loaded": len(imported),
+        "heavy_imports": heavy
+    }
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Import-time benchmark (python -X importtime)")
+    parser.add_argument("modules", nargs="*", help="Modules to measure (default: all utils and scripts)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Cumulative import budget per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module (best time is kept)")
+    parser.add_argument("--allow-missing", action="store_true", help="Report modules with missing dependencies as skipped")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    targets = args.modules or default_targets()
+    
+    print(f"⏱️  Import-time benchmark: {len(targets)} modules, budget {args.budget_ms:.0f} ms")
+    print("-" * 80)
+    
+    results = []
+    failures = 0
+    for module in targets:
+        result = measure_module(module, args.repeat)
+        
+        if "error" in result:
+            missing = "ModuleNotFoundError" in result["error"]
+            result["status"] = "skipped" if missing and args.allow_missing else "error"
+            print(f"{'⏭️ ' if result['status'] == 'skipped' else '❌'} {module:<40} {result['error']}")
+        elif result["heavy_imports"]:
+            result["status"] = "heavy_import"
+            print(f"❌ {module:<40} {result['import_ms']:>8.1f} ms  eager SDK import: {', '.join(result['heavy_imports'])}")
+        elif result["import_ms"] > args.budget_ms:
+            result["status"] = "over_budget"
+            print(f"❌ {module:<40} {result['import_ms']:>8.1f} ms  over budget")
+        else:
+            result["status"] = "ok"
+            print(f"✅ {module:<40} {result['import_ms']:>8.1f} ms")
+        
+        if result["status"] not in ("ok", "skipped"):
+            failures += 1
+        results.append(result)
+    
+    print("-" * 80)
+    print(f"📊 {len(results) - failures}/{len(results)} modules within budget")
+    
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"budget_ms": args.budget_ms, "results": results}, f, indent=2, ensure_ascii=False)
+    
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark with offline mock providers
+モックプロバイダーによるパイプライン全体のベンチマーク（ネットワーク不要）
+
+Runs phases 1-4, HTML generation, HTML post-processing and the Drive upload
+for one or more articles against deterministic stand-ins for Claude, Bing,
+Gemini and Google Drive (utils/mock_providers.py). Reports wall time, calls,
+bytes and peak RSS, and compares them with a stored baseline.
+
+    python scripts/benchmark_pipeline.py --articles 4 --claude-latency 0.5
+    python scripts/benchmark_pipeline.py --research-provider gemini
+    python scripts/benchmark_pipeline.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.config import Config
+from utils.file_utils import write_json, write_text, ensure_dir
+from utils.logging_utils import setup_logging
+from utils.mock_providers import MockBehavior, MockClaudeAPI, MockSearchProvider, MockDriveUploader, MOCK_MODEL_TIERS
+from utils.model_routing import ModelRouter
+from utils.rate_limit import ProviderLimiter
+from utils.research_cache import ResearchCache
+from utils.tracing import configure_tracing
+
+from article_flow import PHASES, PipelineContext, run_pipelines, validate_pipeline_prompts, add_speculation_arguments, add_streaming_arguments
+from convert_markdown_lists_to_html import convert_numbered_lists_to_html
+from convert_shortcodes_to_html import convert_shortcodes_to_html
+from validate_html_output import HTMLValidator
+from upload_to_drive import collect_files_to_upload, upload_article_files
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent.parent / "benchmarks" / "pipeline_baseline.json"
+
+# Relative slowdown (wall time, peak RSS) tolerated before the run fails
+DEFAULT_TOLERANCE = 0.25
+
+TOPICS = ["ハイフ", "ヘッドスパ", "まつげパーマ", "ブライダルエステ", "小顔矯正", "脱毛", "ネイルケア", "ホワイトニング"]
+
+# Minimal templates with the placeholders each phase formats
+FIXTURE_PROMPTS = {
+    "00_parse_request": "トピック: {topic}\n店舗URL: {store_url}\n読者: {target_audience}\n文字数: {word_count}\n",
+    "00_parse_request_v3": "トピック: {topic}\n読者: {target_audience}\nキーワード: {keywords}\n文字数: {word_count}\n",
+    "01_research": "トピック: {topic}\nメインキーワード: {main_keyword}\n関連: {related_keywords}\n読者: {target_audience}\n既存クエリ:\n{existing_queries}\n",
+    "02_structure": "トピック: {topic}\nメインキーワード: {main_keyword}\n読者: {target_audience}\n文字数: {word_count}\n"
+                    "種類: {content_type}\n要点:\n{key_points}\nリサーチ:\n{research_summary}\n",
+    "03_writing": "見出し: {section_title}\n目的: {section_purpose}\n文字数: {word_count}\nキーワード: {keywords}\n"
+                  "メインキーワード: {main_keyword}\n読者: {target_audience}\n小見出し:\n{subsections}\n出典:\n{relevant_sources}\n"
+}
+
+FIXTURE_REQUIREMENTS = "article:\n  word_count: 3200\n  h2_sections: 6\n  faq_questions: 7\n"
+
+
+def prepare_workspace(workspace: Path) -> Config:
+    """Write fixture prompts and config; phase scripts resolve both from the working directory"""
+    for name, template in FIXTURE_PROMPTS.items():
+        write_text(template, workspace / "prompts" / f"{name}.md")
+    write_text(FIXTURE_REQUIREMENTS, workspace / "config" / "requirements.yaml")
+    return Config(base_path=workspace)
+
+
+def phase_postprocess(context: PipelineContext) -> dict:
+    """The workflow's HTML post-processing: list and shortcode conversion, then validation"""
+    html_path = context.output_dir / "article.html"
+    html = html_path.read_text(encoding="utf-8")
+    html, lists_converted = convert_numbered_lists_to_html(html)
+    html = convert_shortcodes_to_html(html)
+    html_path.write_text(html, encoding="utf-8")
+    
+    report = HTMLValidator().validate_file(str(html_path))
+    return {"lists_converted": lists_converted, "validation_issues": report.get("total_issues", 0)}
+
+
+def phase_upload(context: PipelineContext) -> dict:
+    files = collect_files_to_upload(context.output_dir)
+    folders = {"main": "mock-folder", "images": "mock-folder", "reports": "mock-folder"}
+    uploaded = upload_article_files(context.uploader, files, folders, article_id=context.output_dir.name)
+    return {"files": sum(len(group) for group in uploaded.values())}
+
+
+def benchmark_phases() -> List[Dict[str, Any]]:
+    """Phases 1-4 and HTML from article_flow (no image generation), then post-processing and upload"""
+    phases = [dict(phase) for phase in PHASES if phase["name"] in ("analysis", "research", "structure", "writing", "html")]
+    for phase in phases:
+        if phase["name"] == "html":
+            phase["requires"] = ["writing"]
+    phases.append({"name": "postprocess", "label": "HTML Post-processing", "requires": ["html"], "run": phase_postprocess})
+    phases.append({"name": "upload", "label": "Drive Upload", "requires": ["postprocess"], "run": phase_upload})
+    return phases
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def run_benchmark(args: argparse.Namespace, workspace: Path) -> Dict[str, Any]:
+    """Run the mocked pipeline once and collect metrics"""
+    logger = setup_logging("benchmark_pipeline", args.log_level)
+    config = prepare_workspace(workspace)
+    validate_pipeline_prompts()
+    
+    behaviors = {
+        "claude": MockBehavior(args.claude_latency, args.jitter, args.claude_error_rate, args.seed),
+        "bing": MockBehavior(args.search_latency, args.jitter, args.search_error_rate, args.seed),
+        "gemini": MockBehavior(args.search_latency, args.jitter, args.search_error_rate, args.seed + 1),
+        "drive": MockBehavior(args.drive_latency, args.jitter, 0.0, args.seed)
+    }
+    # The chosen provider takes the searches; the other one only takes failovers
+    providers = {
+        "bing": MockSearchProvider("bing", behaviors["bing"], max_concurrent=args.parallel_batches),
+        "gemini": MockSearchProvider("gemini_sdk:mock", behaviors["gemini"], max_concurrent=args.parallel_batches)
+    }
+    providers = [providers[args.research_provider]] + [
+        provider for name, provider in providers.items() if name != args.research_provider
+    ]
+    limiters = {"anthropic": ProviderLimiter("anthropic", args.anthropic_rpm)} if args.anthropic_rpm else {}
+    research_cache = ResearchCache(db_path=workspace / "research_cache.sqlite3", enabled=args.cache)
+    uploader = MockDriveUploader(behaviors["drive"])
+    router = ModelRouter(tiers=MOCK_MODEL_TIERS)
+    
+    contexts = []
+    for index in range(args.articles):
+        topic = TOPICS[index % len(TOPICS)]
+        params = {"topic": topic, "target_audience": "セルフケア志向の女性", "word_count": "3200"}
+        context = PipelineContext(
+            params,
+            workspace / "output" / f"article_{index + 1:03d}",
+            args,
+            logger,
+            config=config,
+            claude=MockClaudeAPI(topic, behaviors["claude"], limiters.get("anthropic"), args.fast_latency_factor, router),
+            research_cache=research_cache,
+            limiters=limiters,
+            research_providers=providers
+        )
+        context.uploader = uploader
+        contexts.append(context)
+    
+    start_time = time.time()
+    errors = run_pipelines(contexts, benchmark_phases(), max_workers=args.workers)
+    wall_time = time.time() - start_time
+    
+    phase_names = [phase["name"] for phase in benchmark_phases()]
+    phase_times = {}
+    for name in phase_names:
+        times = [context.timings[name] for context in contexts if name in context.timings]
+        if times:
+            phase_times[name] = round(sum(times) / len(times), 3)
+    
+    provider_stats = {name: behavior.stats() for name, behavior in behaviors.items()}
+    return {
+        "config": {
+            "articles": args.articles,
+            "workers": args.workers,
+            "claude_latency": args.claude_latency,
+            "fast_latency_factor": args.fast_latency_factor,
+            "search_latency": args.search_latency,
+            "drive_latency": args.drive_latency,
+            "jitter": args.jitter,
+            "claude_error_rate": args.claude_error_rate,
+            "search_error_rate": args.search_error_rate,
+            "research_provider": args.research_provider,
+            "cache": args.cache,
+            "speculative_structure": args.speculative_structure,
+            "seed": args.seed
+        },
+        "wall_time": round(wall_time, 3),
+        "articles_completed": sum(1 for error in errors if error is None),
+        "errors": [str(error) for error in errors if error is not None],
+        "phase_times": phase_times,
+        "providers": provider_stats,
+        "totals": {
+            key: sum(stats[key] for stats in provider_stats.values())
+            for key in ("calls", "errors", "bytes_sent", "bytes_received")
+        },
+        "research_cache": research_cache.stats(),
+        "models": router.stats(),
+        "peak_rss_mb": peak_rss_mb(),
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+
+def compare_with_baseline(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print the comparison and return regressions beyond the tolerance"""
+    regressions = []
+    
+    if baseline.get("config") != result["config"]:
+        print("⚠️  Baseline was recorded with different settings; comparison is indicative only")
+    
+    for metric in ("wall_time", "peak_rss_mb"):
+        current, previous = result[metric], baseline.get(metric)
+        if not previous:
+            continue
+        change = (current - previous) / previous
+        marker = "❌" if change > tolerance else "✅"
+        print(f"{marker} {metric:<16} {previous:>10} → {current:<10} ({change:+.1%})")
+        if change > tolerance:
+            regressions.append(f"{metric} {change:+.1%} (tolerance {tolerance:.0%})")
+    
+    # Calls and bytes are deterministic for fixed settings, so any change is a behaviour change
+    for metric, current in result["totals"].items():
+        previous = baseline.get("totals", {}).get(metric)
+        if previous is not None and previous != current:
+            print(f"ℹ️  {metric:<16} {previous:>10} → {current}")
+    
+    return regressions
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print("-" * 80)
+    print(f"⏱️  Wall time: {result['wall_time']:.2f}s for {result['articles_completed']}/{result['config']['articles']} articles")
+    for name, seconds in result["phase_times"].items():
+        print(f"   {name:<12} {seconds:>8.3f}s (mean per article)")
+    for name, stats in result["providers"].items():
+        print(f"📡 {name:<8} calls={stats['calls']:<5} errors={stats['errors']:<4} "
+              f"sent={stats['bytes_sent']:<9} received={stats['bytes_received']}")
+    for task, stats in result.get("models", {}).items():
+        print(f"🧠 {task:<26} {stats['model']:<18} calls={stats['calls']:<4} mean={stats['mean_latency']}s quality={stats['quality']}")
+    print(f"💾 Peak RSS: {result['peak_rss_mb']} MB")
+    for error in result["errors"]:
+        print(f"❌ {error}")
+    print("-" * 80)
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark with offline mock providers")
+    parser.add_argument("--articles", type=int, default=1, help="Articles to generate concurrently")
+    parser.add_argument("--workers", type=int, default=8, help="Phases running at once across all articles")
+    parser.add_argument("--parallel-batches", type=int, default=5, help="Concurrent searches per provider")
+    parser.add_argument("--structure-token-budget", type=int, default=3000)
+    parser.add_argument("--section-token-budget", type=int, default=1500)
+    parser.add_argument("--claude-latency", type=float, default=0.2, help="Seconds per mock Claude call")
+    parser.add_argument("--fast-latency-factor", type=float, default=1.0,
+                        help="Latency of calls routed to the fast model tier, relative to --claude-latency")
+    parser.add_argument("--search-latency", type=float, default=0.1, help="Seconds per mock search")
+    parser.add_argument("--drive-latency", type=float, default=0.02, help="Seconds per mock Drive request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± seconds added to every latency")
+    parser.add_argument("--claude-error-rate", type=float, default=0.0)
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--research-provider", choices=["bing", "gemini"], default="bing",
+                        help="Mock search provider taking the research queries (the other one is the failover)")
+    parser.add_argument("--anthropic-rpm", type=float, default=0, help="Shared Claude request quota (0 = unlimited)")
+    parser.add_argument("--cache", action="store_true", help="Use the research cache (persisted in --workspace)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workspace", help="Keep prompts, config, cache and outputs here instead of a temp dir")
+    parser.add_argument("--incremental", action="store_true", help="Reuse phase results stored in --workspace by the previous run")
+    parser.add_argument("--force", action="append", metavar="PHASE", help="Re-run this phase in incremental mode (repeatable)")
+    add_speculation_arguments(parser)
+    add_streaming_arguments(parser)
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", help="Write the result JSON here")
+    parser.add_argument("--log-level", default="WARNING", help="Logging level")
+    parser.add_argument("--trace", help="Write an OpenTelemetry (OTLP/JSON) trace of the run to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    if args.trace:
+        configure_tracing(args.trace)
+    
+    workspace = Path(args.workspace).resolve() if args.workspace else Path(tempfile.mkdtemp(prefix="article_flow_bench_"))
+    ensure_dir(workspace)
+    
+    print(f"🧪 Pipeline benchmark: {args.articles} article(s), workspace {workspace}")
+    
+    # The prompt registry and Config resolve fixtures relative to the working directory
+    original_cwd = Path.cwd()
+    try:
+        os.chdir(workspace)
+        result = run_benchmark(args, workspace)
+    finally:
+        os.chdir(original_cwd)
+        if not args.workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+    
+    print_result(result)
+    
+    if args.output:
+        write_json(result, args.output)
+    
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        write_json(result, baseline_path)
+        print(f"📌 Baseline updated: {baseline_path}")
+        sys.exit(0)
+    
+    regressions = []
+    if baseline_path.exists():
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(result, json.load(f), args.tolerance)
+    else:
+        print(f"ℹ️  No baseline at {baseline_path}; run with --update-baseline to record one")
+    
+    if result["errors"] or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
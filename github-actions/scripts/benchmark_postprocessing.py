@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the HTML post-processing hot paths
+HTML後処理（リスト変換・ショートコード変換・検証・画像挿入）のスケーリング計測
+
+Each function runs on generated documents from 10 KB to 10 MB that are heavy
+in headings, numbered lists and shortcodes. Time and peak memory are recorded
+per size, and the growth exponent (slope of log time over log size) is fitted.
+A function is flagged as superlinear when the exponent exceeds --max-exponent.
+
+    python scripts/benchmark_postprocessing.py
+    python scripts/benchmark_postprocessing.py --sizes 10,100,1000 --profile unclosed
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from convert_markdown_lists_to_html import convert_numbered_lists_to_html
+from convert_shortcodes_to_html import convert_shortcodes_to_html
+from validate_html_output import HTMLValidator
+from generate_html_article import insert_images_into_content
+
+# Document sizes in KB
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+# Fitted exponent above which growth counts as superlinear (1.0 = linear)
+DEFAULT_MAX_EXPONENT = 1.3
+
+# Timings below this are dominated by noise and are left out of the fit
+MIN_FIT_SECONDS = 0.002
+
+# Larger sizes are skipped when the fitted curve predicts more than this
+DEFAULT_TIME_LIMIT = 120.0
+
+
+def _article_block(i: int, fmt: str) -> str:
+    """One section: heading, paragraph, numbered list and shortcodes"""
+    if fmt == "markdown":
+        return (
+            f"## 見出し {i}: ハイフの効果\n\n"
+            f"施術の**ポイント**と*注意点*を解説します。詳しくは[公式サイト](https://example.com/{i})へ。\n\n"
+            f"1. カウンセリング {i}\n2. 施術 {i}\n3. アフターケア {i}\n\n"
+            f"[blog_card url=\"https://example.com/posts/{i}\"]\n\n"
+        )
+    return (
+        f"<h2>見出し {i}: ハイフの効果</h2>\n"
+        f"<p>施術の<strong>ポイント</strong>と注意点を解説します。</p>\n"
+        f"1. カウンセリング {i}\n2. 施術 {i}\n3. アフターケア {i}\n"
+        f"<p>[blog_card url=\"https://example.com/posts/{i}\"]</p>\n"
+        f"<p>[link_card url=\"https://example.com/links/{i}\" title=\"関連記事 {i}\"]</p>\n"
+        f"<h3>小見出し {i}</h3>\n<p>[video url=\"https://example.com/videos/{i}.mp4\"] 参考[注{i} 本文</p>\n"
+    )
+
+
+def _unclosed_block(i: int, fmt: str) -> str:
+    """Text with brackets that never close, the worst case for bracket regexes"""
+    return f"<p>注記[参照 {i} [ref note {i} ![図 {i} [blog_card url=\"https://example.com/{i}\" 続く</p>\n"
+
+
+PROFILES = {
+    "article": _article_block,
+    "unclosed": _unclosed_block
+}
+
+
+def generate_document(size_bytes: int, fmt: str = "html", profile: str = "article") -> str:
+    """Repeat profile blocks until the UTF-8 size reaches `size_bytes`"""
+    block = PROFILES[profile]
+    parts = []
+    total = 0
+    i = 0
+    while total < size_bytes:
+        i += 1
+        part = block(i, fmt)
+        parts.append(part)
+        total += len(part.encode("utf-8"))
+    body = "".join(parts)
+    if fmt == "markdown":
+        return f"# ベンチマーク記事\n\n{body}"
+    return f'<div class="article-content">\n<h1>ベンチマーク記事</h1>\n{body}</div>\n'
+
+
+def build_targets(workdir: Path) -> Dict[str, Dict[str, Any]]:
+    """Functions under test, each taking the generated document"""
+    images_dir = workdir / "images"
+    images_dir.mkdir(parents=True, exist_ok=True)
+    for name in ["hero_image.png"] + [f"section_{i}_image.png" for i in range(1, 5)]:
+        (images_dir / name).touch()
+    
+    validator = HTMLValidator()
+    html_path = workdir / "article.html"
+    
+    def validate_file(document: str):
+        html_path.write_text(document, encoding="utf-8")
+        return validator.validate_file(str(html_path))
+    
+    return {
+        "validate_file": {"format": "html", "run": validate_file},
+        "convert_numbered_lists_to_html": {"format": "html", "run": convert_numbered_lists_to_html},
+        "convert_shortcodes_to_html": {"format": "html", "run": convert_shortcodes_to_html},
+        "insert_images_into_content": {
+            "format": "markdown",
+            "run": lambda document: insert_images_into_content(document, str(images_dir))
+        }
+    }
+
+
+def measure(run: Callable[[str], Any], document: str, repeat: int) -> Dict[str, float]:
+    """Best wall time over `repeat` runs, then peak traced memory in one extra run"""
+    best = None
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            run(document)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        
+        tracemalloc.start()
+        try:
+            run(document)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    
+    return {"seconds": best, "peak_mb": peak / (1024 * 1024)}
+
+
+def fit_exponent(points: List[Dict[str, float]]) -> Optional[float]:
+    """Least-squares slope of log(seconds) over log(bytes)"""
+    usable = [(math.log(p["bytes"]), math.log(p["seconds"])) for p in points if p["seconds"] >= MIN_FIT_SECONDS]
+    if len(usable) < 2:
+        return None
+    mean_x = sum(x for x, _ in usable) / len(usable)
+    mean_y = sum(y for _, y in usable) / len(usable)
+    denominator = sum((x - mean_x) ** 2 for x, _ in usable)
+    if denominator == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in usable) / denominator
+
+
+def predict_seconds(points: List[Dict[str, float]], size_bytes: int) -> Optional[float]:
+    """Extrapolate the next run from the last point and the fitted (or worst-case quadratic) exponent"""
+    if not points:
+        return None
+    exponent = fit_exponent(points) or 2.0
+    last = points[-1]
+    return last["seconds"] * (size_bytes / last["bytes"]) ** max(1.0, exponent)
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    sizes = [int(size) * 1024 for size in args.sizes.split(",")]
+    results = {}
+    
+    with tempfile.TemporaryDirectory(prefix="postprocessing_bench_") as tmp:
+        targets = build_targets(Path(tmp))
+        selected = args.functions.split(",") if args.functions else list(targets)
+        
+        for name in selected:
+            target = targets[name]
+            points = []
+            skipped = []
+            for size in sizes:
+                predicted = predict_seconds(points, size)
+                if predicted is not None and predicted > args.time_limit:
+                    skipped.append(size)
+                    print(f"   ⏭️  {name} @ {size // 1024} KB skipped (predicted {predicted:.0f}s)")
+                    continue
+                
+                document = generate_document(size, target["format"], args.profile)
+                actual_bytes = len(document.encode("utf-8"))
+                sample = measure(target["run"], document, args.repeat if size <= 1024 * 1024 else 1)
+                points.append({
+                    "bytes": actual_bytes,
+                    "seconds": sample["seconds"],
+                    "peak_mb": round(sample["peak_mb"], 2),
+                    "mb_per_second": round(actual_bytes / (1024 * 1024) / max(sample["seconds"], 1e-9), 2)
+                })
+                print(f"   {name:<32} {actual_bytes / 1024:>9.0f} KB {sample['seconds']:>10.4f}s "
+                      f"{sample['peak_mb']:>9.1f} MB peak")
+                del document
+            
+            exponent = fit_exponent(points)
+            results[name] = {
+                "points": points,
+                "skipped_bytes": skipped,
+                "exponent": round(exponent, 2) if exponent is not None else None,
+                # Skipping sizes because the extrapolation blew the time limit is itself a sign of superlinear growth
+                "superlinear": bool(skipped) or (exponent is not None and exponent > args.max_exponent)
+            }
+    
+    return {"profile": args.profile, "max_exponent": args.max_exponent, "functions": results}
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Scaling benchmark for HTML post-processing functions")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), help="Document sizes in KB")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="article", help="Generated document shape")
+    parser.add_argument("--functions", help="Comma-separated subset of functions to measure")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size up to 1 MB (best time is kept)")
+    parser.add_argument("--max-exponent", type=float, default=DEFAULT_MAX_EXPONENT, help="Growth exponent treated as superlinear")
+    parser.add_argument("--time-limit", type=float, default=DEFAULT_TIME_LIMIT, help="Skip sizes predicted to take longer (seconds)")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    
+    print(f"📈 Post-processing scaling benchmark ({args.profile} documents, sizes {args.sizes} KB)")
+    print("-" * 80)
+    suite = run_suite(args)
+    print("-" * 80)
+    
+    failures = 0
+    for name, result in suite["functions"].items():
+        exponent = "n/a" if result["exponent"] is None else f"n^{result['exponent']}"
+        if result["superlinear"]:
+            failures += 1
+            print(f"❌ {name:<32} {exponent:<8} superlinear growth")
+        else:
+            print(f"✅ {name:<32} {exponent}")
+    
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(suite, f, indent=2, ensure_ascii=False)
+    
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
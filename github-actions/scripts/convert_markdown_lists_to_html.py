@@ -7,7 +7,6 @@ Markdown番号付きリスト記法をHTMLに自動変換するスクリプト
 import re
 import sys
 import os
-from bs4 import BeautifulSoup, NavigableString
 
 def detect_numbered_lists(content):
     """
@@ -51,7 +50,7 @@ def convert_numbered_lists_to_html(content):
     """
     Markdown番号付きリストをHTMLの<ol><li>タグに変換
     
-    シンプルな文字列置換アプローチを使用
+    検出したブロックを行位置から直接置換する（入力サイズに対して線形）
     除外条件はコンテキストで判断
     
     Args:
@@ -61,7 +60,6 @@ def convert_numbered_lists_to_html(content):
         tuple: (変換後のHTMLコンテンツ, 変換されたブロック数)
     """
     converted_count = 0
-    result_content = content
     
     # 番号付きリストブロックを検出
     list_blocks = detect_numbered_lists(content)
@@ -69,21 +67,30 @@ def convert_numbered_lists_to_html(content):
     if not list_blocks:
         return content, 0
     
-    # 各ブロックを<ol><li>に変換
-    for block in reversed(list_blocks):  # 後ろから処理して位置ずれを防ぐ
-        # 元のMarkdown記法
-        block_lines = [item['full_line'] for item in block]
-        block_text = '\n'.join(block_lines)
+    # 各行の開始位置（ブロックを行番号から直接切り出すため）
+    lines = content.split('\n')
+    line_offsets = []
+    offset = 0
+    for line in lines:
+        line_offsets.append(offset)
+        offset += len(line) + 1
+    
+    # 後ろから処理し、変換後の断片を逆順に積む
+    # （find/replaceで全体を毎回走査・再構築すると、ブロック数に対して二乗になる）
+    pieces = []
+    cursor = len(content)
+    converted_after = ''  # 直後に続く変換済みテキストの先頭100文字
+    
+    for block in reversed(list_blocks):
+        # 元のMarkdown記法の範囲
+        first_line = block[0]['line_number'] - 1
+        last_line = block[-1]['line_number'] - 1
+        block_start = line_offsets[first_line]
+        block_end = line_offsets[last_line] + len(lines[last_line])
         
-        # <pre>や<code>内に含まれているかチェック
-        # 簡単な方法：前後にタグがあるかチェック
-        block_start = result_content.find(block_text)
-        if block_start == -1:
-            continue
-            
         # ブロック前後のコンテキストを確認
-        context_before = result_content[max(0, block_start-100):block_start]
-        context_after = result_content[block_start+len(block_text):block_start+len(block_text)+100]
+        context_before = content[max(0, block_start-100):block_start]
+        context_after = (content[block_end:min(cursor, block_end+100)] + converted_after)[:100]
         
         # <pre>や<code>タグ内かチェック
         if ('<pre' in context_before and '</pre>' in context_after) or \
@@ -105,14 +112,23 @@ def convert_numbered_lists_to_html(content):
         ol_html = f"<ol>\n" + "\n".join(ol_content) + "\n</ol>"
         
         # 元のMarkdown記法を置換
-        result_content = result_content.replace(block_text, ol_html)
+        tail = content[block_end:cursor]
+        pieces.append(tail)
+        pieces.append(ol_html)
+        converted_after = (ol_html + tail[:100] + converted_after)[:100]
+        cursor = block_start
         converted_count += 1
         print(f"   ✅ Converted block with {len(block)} items")
     
+    pieces.append(content[:cursor])
+    result_content = ''.join(reversed(pieces))
+    
     return result_content, converted_count
 
 def validate_html_structure(content):
     """HTMLの基本構造をチェック"""
+    from bs4 import BeautifulSoup
+    
     issues = []
     
     try:
@@ -105,7 +105,7 @@ def detect_remaining_shortcodes(content):
     """残存するショートコードを検出"""
     
     # 汎用ショートコード検出パターン（ぽるか提案）
-    shortcode_pattern = r'\[[A-Za-z_][\w-]*(?:\s+[^\]]*)?\]'
+    shortcode_pattern = r'\[[A-Za-z_][\w-]*(?:\s[^\[\]]*)?\]'
     
     matches = re.findall(shortcode_pattern, content, re.MULTILINE)
     return matches
@@ -9,8 +9,6 @@ import re
 import sys
 from datetime import datetime
 from pathlib import Path
-import markdown
-from markdown.extensions import tables, fenced_code, nl2br, attr_list
 
 def generate_html_template(title, content, metadata, css_style):
     """HTMLテンプレートを生成"""
@@ -297,16 +295,23 @@ em {
     
     return css
 
+def find_image(images_dir, filenames):
+    """最初に存在する画像ファイル名を返す（ワークフロー版と generate_images.py の命名の両方に対応）"""
+    for filename in filenames:
+        if os.path.exists(os.path.join(images_dir, filename)):
+            return filename
+    return None
+
 def insert_images_into_content(content, images_dir):
-    """記事内容に画像を適切に挿入"""
+    """記事内容に画像を適切に挿入（生成済みの画像のみ）"""
     
     # ヒーロー画像の挿入（最初のh1の後）
-    hero_image_path = os.path.join(images_dir, 'hero_image.png')
-    if os.path.exists(hero_image_path):
+    hero_image = find_image(images_dir, ['hero_image.png', 'hero.png'])
+    if hero_image:
         # h1タグの後に画像を挿入
         content = re.sub(
             r'(^# [^\n]+\n)',
-            r'\1\n<img src="images/hero_image.png" alt="ヒーロー画像" class="hero-image">\n\n',
+            rf'\1\n<img src="images/{hero_image}" alt="ヒーロー画像" class="hero-image">\n\n',
             content,
             count=1,
             flags=re.MULTILINE
@@ -323,10 +328,10 @@ def insert_images_into_content(content, images_dir):
         # h2見出しの検出
         if line.startswith('## ') and section_count < 4:
             section_count += 1
-            section_image_path = os.path.join(images_dir, f'section_{section_count}_image.png')
+            section_image = find_image(images_dir, [f'section_{section_count}_image.png', f'section-{section_count}.png'])
             
             # 画像が存在する場合、次の段落の後に挿入
-            if os.path.exists(section_image_path):
+            if section_image:
                 # 次の空行を探す
                 for j in range(i + 1, len(lines)):
                     if lines[j].strip() == '':
@@ -334,7 +339,7 @@ def insert_images_into_content(content, images_dir):
                     elif j + 1 < len(lines) and lines[j + 1].strip() == '':
                         # 段落の終わりを見つけた
                         new_lines.append('')
-                        new_lines.append(f'<img src="images/section_{section_count}_image.png" alt="セクション{section_count}の画像" class="section-image">')
+                        new_lines.append(f'<img src="images/{section_image}" alt="セクション{section_count}の画像" class="section-image">')
                         break
     
     return '\n'.join(new_lines)
@@ -371,6 +376,7 @@ def convert_markdown_to_html(article_dir):
         markdown_content = insert_images_into_content(markdown_content, images_dir)
     
     # MarkdownをHTMLに変換
+    import markdown
     md = markdown.Markdown(extensions=[
         'tables',
         'fenced_code',
@@ -6,19 +6,19 @@ import sys
 import os
 import json
 import time
-import requests
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from PIL import Image
 import io
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
-from utils.file_utils import read_json, write_json, ensure_dir
+from utils.file_utils import write_json, ensure_dir
+from utils.artifacts import read_artifact, StructureArtifact
+from utils.tracing import span, bind_context
 
 
 class ImageGenerator:
@@ -50,6 +50,7 @@ class DallE3Generator(ImageGenerator):
         style: str = "natural"
     ) -> Dict[str, Any]:
         """Generate image using DALL-E 3"""
+        import requests
         
         try:
             response = self.client.images.generate(
@@ -88,6 +89,7 @@ class StableDiffusionGenerator(ImageGenerator):
     
     def generate(self, prompt: str, size: str = "1024x1024") -> Dict[str, Any]:
         """Generate image using Stable Diffusion"""
+        import requests
         
         width, height = map(int, size.split('x'))
         
@@ -133,7 +135,7 @@ class StableDiffusionGenerator(ImageGenerator):
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description="Generate images for article")
-    parser.add_argument("--article-file", required=True, help="Article HTML file")
+    parser.add_argument("--article-file", help="Unused (image prompts depend only on the structure); kept for old callers")
     parser.add_argument("--structure-file", required=True, help="Article structure JSON file")
     parser.add_argument("--output-dir", required=True, help="Output directory for images")
     parser.add_argument("--parallel", action="store_true", help="Generate images in parallel")
@@ -142,8 +144,12 @@ def parse_arguments():
     return parser.parse_args()
 
 
-def create_image_prompts(structure: dict, article_content: str) -> List[Dict[str, Any]]:
-    """Create prompts for all required images"""
+def create_image_prompts(structure: dict) -> List[Dict[str, Any]]:
+    """Create prompts for all required images
+    
+    Only the structure (title, sections, image requirements) is used, so
+    images can be generated while the article is still being written.
+    """
     
     prompts = []
     
@@ -205,54 +211,61 @@ def generate_single_image(
 ) -> Dict[str, Any]:
     """Generate a single image"""
     
-    try:
-        logger.info(f"Generating {prompt_data['type']} image...")
-        
-        # Generate image
-        result = generator.generate(
-            prompt=prompt_data["prompt"],
-            size=prompt_data["size"]
-        )
-        
-        # Save image
-        image_path = output_dir / prompt_data["filename"]
-        with open(image_path, "wb") as f:
-            f.write(result["image_data"])
-        
-        # Optimize image
-        optimize_image(image_path)
-        
-        # Create metadata
-        metadata = {
-            "type": prompt_data["type"],
-            "filename": prompt_data["filename"],
-            "path": str(image_path),
-            "size": prompt_data["size"],
-            "alt_text": prompt_data.get("alt_text", ""),
-            "prompt": prompt_data["prompt"],
-            "generator": result.get("generator", "unknown"),
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        if "revised_prompt" in result:
-            metadata["revised_prompt"] = result["revised_prompt"]
-        
-        logger.info(f"Successfully generated {prompt_data['type']} image")
-        return metadata
+    with span("image.generate", {
+        "image.type": prompt_data["type"],
+        "image.size": prompt_data["size"],
+        "image.generator": type(generator).__name__
+    }) as image_span:
+        try:
+            logger.info(f"Generating {prompt_data['type']} image...")
+            
+            # Generate image
+            result = generator.generate(
+                prompt=prompt_data["prompt"],
+                size=prompt_data["size"]
+            )
+            
+            # Save image
+            image_path = output_dir / prompt_data["filename"]
+            with open(image_path, "wb") as f:
+                f.write(result["image_data"])
+            
+            # Optimize image
+            optimize_image(image_path)
+            
+            # Create metadata
+            metadata = {
+                "type": prompt_data["type"],
+                "filename": prompt_data["filename"],
+                "path": str(image_path),
+                "size": prompt_data["size"],
+                "alt_text": prompt_data.get("alt_text", ""),
+                "prompt": prompt_data["prompt"],
+                "generator": result.get("generator", "unknown"),
+                "created_at": datetime.utcnow().isoformat()
+            }
+            
+            if "revised_prompt" in result:
+                metadata["revised_prompt"] = result["revised_prompt"]
+            
+            logger.info(f"Successfully generated {prompt_data['type']} image")
+            return metadata
         
-    except Exception as e:
-        log_error(logger, e, f"Image generation for {prompt_data['type']}")
-        return {
-            "type": prompt_data["type"],
-            "filename": prompt_data["filename"],
-            "error": str(e),
-            "created_at": datetime.utcnow().isoformat()
-        }
+        except Exception as e:
+            log_error(logger, e, f"Image generation for {prompt_data['type']}")
+            image_span.record_error(e)
+            return {
+                "type": prompt_data["type"],
+                "filename": prompt_data["filename"],
+                "error": str(e),
+                "created_at": datetime.utcnow().isoformat()
+            }
 
 
 def optimize_image(image_path: Path):
     """Optimize image file size and format"""
     try:
+        from PIL import Image
         img = Image.open(image_path)
         
         # Convert RGBA to RGB if necessary
@@ -289,7 +302,7 @@ def generate_images_parallel(
         # Submit all tasks
         future_to_prompt = {
             executor.submit(
-                generate_single_image,
+                bind_context(generate_single_image),
                 prompt,
                 generator,
                 output_dir,
@@ -315,6 +328,93 @@ def generate_images_parallel(
     return results
 
 
+def create_generator(name: str) -> ImageGenerator:
+    """Build the configured image generator from API keys in the environment"""
+    openai_key = os.environ.get("OPENAI_API_KEY")
+    stability_key = os.environ.get("STABILITY_API_KEY")
+    
+    if not openai_key and name in ["dalle3", "both"]:
+        raise ValueError("OPENAI_API_KEY not found in environment")
+    
+    if name == "stable":
+        return StableDiffusionGenerator(stability_key)
+    # Default to DALL-E 3
+    return DallE3Generator(openai_key)
+
+
+def run_image_generation(
+    structure: dict,
+    output_dir,
+    generator: ImageGenerator,
+    logger,
+    parallel: bool = True,
+    generator_name: str = "dalle3"
+) -> Dict[str, Any]:
+    """Generate all article images, write images_metadata.json and return it"""
+    # Create output directory
+    output_dir = ensure_dir(output_dir)
+    
+    # Create image prompts
+    prompts = create_image_prompts(structure)
+    logger.info(f"Created {len(prompts)} image prompts")
+    
+    # Generate images
+    start_time = time.time()
+    
+    if parallel:
+        results = generate_images_parallel(
+            prompts,
+            generator,
+            output_dir,
+            logger
+        )
+    else:
+        results = []
+        for prompt in prompts:
+            result = generate_single_image(
+                prompt,
+                generator,
+                output_dir,
+                logger
+            )
+            results.append(result)
+            # Rate limiting
+            time.sleep(1)
+    
+    elapsed_time = time.time() - start_time
+    
+    # Count successful generations
+    successful = len([r for r in results if "error" not in r])
+    failed = len(results) - successful
+    
+    # Save metadata
+    metadata = {
+        "generated_images": results,
+        "statistics": {
+            "total_requested": len(prompts),
+            "successful": successful,
+            "failed": failed,
+            "generator": generator_name,
+            "execution_time": elapsed_time
+        },
+        "created_at": datetime.utcnow().isoformat()
+    }
+    
+    metadata_file = output_dir / "images_metadata.json"
+    write_json(metadata, metadata_file)
+    
+    # Log metrics
+    log_metric(logger, "images_generated", successful)
+    log_metric(logger, "generation_time", elapsed_time, "seconds")
+    
+    if failed > 0:
+        logger.warning(f"{failed} images failed to generate")
+    
+    logger.info(f"Image generation completed: {successful}/{len(prompts)} images")
+    
+    return metadata
+
+
 def main():
     """Main execution function"""
     args = parse_arguments()
@@ -324,88 +424,20 @@ def main():
     log_phase_start(logger, "Image Generation")
     
     try:
-        # Check API keys
-        openai_key = os.environ.get("OPENAI_API_KEY")
-        stability_key = os.environ.get("STABILITY_API_KEY")
-        
-        if not openai_key and args.generator in ["dalle3", "both"]:
-            raise ValueError("OPENAI_API_KEY not found in environment")
-        
-        # Read input files
-        structure = read_json(args.structure_file)
-        
-        with open(args.article_file, 'r', encoding='utf-8') as f:
-            article_content = f.read()
-        
-        # Create output directory
-        output_dir = ensure_dir(args.output_dir)
-        
-        # Create image prompts
-        prompts = create_image_prompts(structure, article_content)
-        logger.info(f"Created {len(prompts)} image prompts")
-        
         # Initialize generator
-        if args.generator == "dalle3":
-            generator = DallE3Generator(openai_key)
-        elif args.generator == "stable":
-            generator = StableDiffusionGenerator(stability_key)
-        else:
-            # Default to DALL-E 3
-            generator = DallE3Generator(openai_key)
-        
-        # Generate images
-        start_time = time.time()
-        
-        if args.parallel:
-            results = generate_images_parallel(
-                prompts,
-                generator,
-                output_dir,
-                logger
-            )
-        else:
-            results = []
-            for prompt in prompts:
-                result = generate_single_image(
-                    prompt,
-                    generator,
-                    output_dir,
-                    logger
-                )
-                results.append(result)
-                # Rate limiting
-                time.sleep(1)
+        generator = create_generator(args.generator)
         
-        elapsed_time = time.time() - start_time
-        
-        # Count successful generations
-        successful = len([r for r in results if "error" not in r])
-        failed = len(results) - successful
-        
-        # Save metadata
-        metadata = {
-            "generated_images": results,
-            "statistics": {
-                "total_requested": len(prompts),
-                "successful": successful,
-                "failed": failed,
-                "generator": args.generator,
-                "execution_time": elapsed_time
-            },
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        metadata_file = output_dir / "images_metadata.json"
-        write_json(metadata, metadata_file)
-        
-        # Log metrics
-        log_metric(logger, "images_generated", successful)
-        log_metric(logger, "generation_time", elapsed_time, "seconds")
-        
-        if failed > 0:
-            logger.warning(f"{failed} images failed to generate")
-        
-        logger.info(f"Image generation completed: {successful}/{len(prompts)} images")
+        # Read input files
+        structure = read_artifact(args.structure_file, StructureArtifact)
+        
+        run_image_generation(
+            structure,
+            args.output_dir,
+            generator,
+            logger,
+            parallel=args.parallel,
+            generator_name=args.generator
+        )
         
         log_phase_end(logger, "Image Generation", success=True)
         
@@ -11,8 +11,6 @@ import base64
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-import google.generativeai as genai
-from PIL import Image
 import io
 
 # Add parent directory to path for imports
@@ -26,6 +24,7 @@ class GeminiImageGenerator:
     """Gemini API image generator"""
     
     def __init__(self, api_key: str):
+        import google.generativeai as genai
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-1.5-flash')
         
@@ -51,6 +50,7 @@ class GeminiImageGenerator:
             
             # For now, create a placeholder with the enhanced prompt
             # In production, this would call the actual Imagen API
+            from PIL import Image
             img = Image.new('RGB', (1024, 1024), color='#e0e0e0')
             
             # Convert to bytes
@@ -83,7 +83,7 @@ def parse_arguments():
     return parser.parse_args()
 
 
-def create_image_prompts(structure: dict, article_content: str) -> List[Dict[str, Any]]:
+def create_image_prompts(structure: dict) -> List[Dict[str, Any]]:
     """Create prompts for all required images"""
     
     prompts = []
@@ -170,25 +170,11 @@ def main():
                     "sections": [{"title": section, "content": f"Content about {section}"} for section in sections[:6]]
                 }
         
-        # Find HTML file
-        html_file = article_dir / "04_optimized_draft.html"
-        if not html_file.exists():
-            html_files = list(article_dir.glob("*.html"))
-            if html_files:
-                html_file = html_files[0]
-            else:
-                logger.warning("No HTML file found, creating minimal content")
-                article_content = f"<html><body><h1>Article about {args.article_dir}</h1></body></html>"
-        
-        if html_file and html_file.exists():
-            with open(html_file, 'r', encoding='utf-8') as f:
-                article_content = f.read()
-        
         # Create output directory
         output_dir = ensure_dir(args.output_dir)
         
         # Create image prompts
-        prompts = create_image_prompts(structure, article_content)
+        prompts = create_image_prompts(structure)
         logger.info(f"Created {len(prompts)} image prompts")
         
         # Initialize generator
@@ -11,8 +11,6 @@ import base64
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-import requests
-from PIL import Image
 import io
 
 # Add parent directory to path for imports
@@ -36,6 +34,7 @@ class DallEGenerator:
         quality: str = "high"
     ) -> Dict[str, Any]:
         """Generate image using gpt-image-1 API"""
+        import requests
         
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -120,7 +119,7 @@ def parse_arguments():
     return parser.parse_args()
 
 
-def create_image_prompts(structure: dict, article_content: str) -> List[Dict[str, Any]]:
+def create_image_prompts(structure: dict) -> List[Dict[str, Any]]:
     """Create prompts for all required images"""
     
     prompts = []
@@ -234,6 +233,7 @@ def generate_single_image(
 def optimize_image(image_path: Path):
     """Optimize image file size and format"""
     try:
+        from PIL import Image
         img = Image.open(image_path)
         
         # Convert RGBA to RGB if necessary
@@ -299,26 +299,11 @@ def main():
                     "sections": [{"title": section, "content": f"Content about {section}"} for section in sections[:6]]
                 }
         
-        # Find HTML file - look for optimized draft
-        html_file = article_dir / "04_optimized_draft.html"
-        if not html_file.exists():
-            # Try to find any HTML file
-            html_files = list(article_dir.glob("*.html"))
-            if html_files:
-                html_file = html_files[0]
-            else:
-                logger.warning("No HTML file found, creating minimal content")
-                article_content = f"<html><body><h1>Article about {args.article_dir}</h1></body></html>"
-        
-        if html_file and html_file.exists():
-            with open(html_file, 'r', encoding='utf-8') as f:
-                article_content = f.read()
-        
         # Create output directory
         output_dir = ensure_dir(args.output_dir)
         
         # Create image prompts
-        prompts = create_image_prompts(structure, article_content)
+        prompts = create_image_prompts(structure)
         logger.info(f"Created {len(prompts)} image prompts")
         
         # Initialize generator
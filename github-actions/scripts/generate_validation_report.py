@@ -2,13 +2,53 @@
 """
 Validation Report Generator
 段階的バリデーション処理の詳細レポートを生成
+
+Validation results are cached in `validation_reports/validation_cache.json`
+by the SHA-256 of the HTML content, so a step whose file is unchanged since an
+earlier step reuses that step's results instead of re-scanning the file. Each
+report carries an `issue_diff` against the closest earlier step: the issues it
+resolved and the ones it introduced.
 """
 
+import hashlib
 import json
 import os
+import re
 import sys
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+import validate_html_output
+from validate_html_output import HTMLValidator
+
+VALIDATION_CACHE_FILE = "validation_cache.json"
+VALIDATION_CACHE_VERSION = 1
+
+
+def validator_version() -> str:
+    """Hash of the validator and check code; cached results from other versions are discarded"""
+    digest = hashlib.sha256()
+    for module_file in (__file__, validate_html_output.__file__):
+        with open(module_file, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def collect_issues(validator_result: Dict[str, Any]) -> List[str]:
+    """Flatten HTMLValidator.validate_file output into comparable issue keys"""
+    issues = set()
+    for category in ("shortcodes", "markdown"):
+        for name, matches in (validator_result.get(category) or {}).items():
+            for match in matches:
+                text = match if isinstance(match, str) else " ".join(match)
+                issues.add(f"{category}/{name}: {text.strip()}")
+    for name, passed in (validator_result.get("html_structure") or {}).items():
+        if not passed:
+            issues.add(f"html_structure/{name}")
+    if validator_result.get("error"):
+        issues.add(f"error: {validator_result['error']}")
+    return sorted(issues)
+
 
 class ValidationReportGenerator:
     """バリデーションレポート生成クラス"""
@@ -21,6 +61,10 @@ class ValidationReportGenerator:
         # レポートディレクトリ作成
         os.makedirs(self.reports_dir, exist_ok=True)
         
+        self.cache_path = os.path.join(self.reports_dir, VALIDATION_CACHE_FILE)
+        self.cache = self._load_cache()
+        self.cache_stats = {"hits": 0, "misses": 0}
+    
     def generate_initial_report(self, html_file: str) -> str:
         """Step 1: 初期状態のバリデーションレポート生成"""
         report = {
@@ -31,15 +75,11 @@ class ValidationReportGenerator:
             "step": 1,
             "step_name": "Initial HTML Validation",
             "file_info": self._get_file_info(html_file),
-            "validation_results": self._run_validation_checks(html_file),
+            "validation_results": {},
             "issues_detected": [],
             "recommendations": []
         }
         
-        # バリデーション実行
-        from validate_html_output import HTMLValidator
-        validator = HTMLValidator()
-        
         try:
             # ファイルが存在するかチェック
             if not os.path.exists(html_file):
@@ -47,21 +87,19 @@ class ValidationReportGenerator:
                 report["error"] = f"HTML file not found: {html_file}"
                 return self._save_report(report, "report1_initial.json")
             
-            # バリデーション実行
-            validation_success = validator.validate_file(html_file)
+            # バリデーション実行（同じ内容の結果はキャッシュから再利用）
+            validation = self._attach_validation(report)
+            validation_success = validation["success"]
             report["validation_passed"] = validation_success
             
             if not validation_success:
-                # Markdown記法検出
-                markdown_issues = validator.detect_markdown_syntax(
-                    self._read_file_safe(html_file)
-                )
-                report["issues_detected"] = markdown_issues
+                # Markdown記法・ショートコード検出
+                report["issues_detected"] = {**validation["markdown"], **validation["shortcodes"]}
                 
                 # 推奨アクション
-                if any("numbered_lists" in issue for issue in markdown_issues.keys()):
+                if "numbered_lists" in validation["markdown"]:
                     report["recommendations"].append("markdown_lists_conversion")
-                if any("shortcode" in str(issue).lower() for issue in markdown_issues.keys()):
+                if validation["shortcodes"]:
                     report["recommendations"].append("shortcode_conversion")
                 
             report["status"] = "completed"
@@ -91,12 +129,14 @@ class ValidationReportGenerator:
             "step_name": step_info["name"],
             "file_info": self._get_file_info(html_file),
             "conversion_results": conversion_results,
-            "validation_results": self._run_validation_checks(html_file),
+            "validation_results": {},
             "improvements": [],
             "remaining_issues": []
         }
         
         try:
+            self._attach_validation(report)
+            
             # 変換前後の比較
             if "before" in conversion_results and "after" in conversion_results:
                 before_issues = conversion_results["before"]
@@ -130,16 +170,14 @@ class ValidationReportGenerator:
             "step": 4,
             "step_name": "Post-Conversion Validation",
             "file_info": self._get_file_info(html_file),
-            "validation_results": self._run_validation_checks(html_file),
+            "validation_results": {},
             "conversion_summary": {},
             "api_fix_needed": False
         }
         
         try:
-            # バリデーション実行
-            from validate_html_output import HTMLValidator
-            validator = HTMLValidator()
-            validation_success = validator.validate_file(html_file)
+            # バリデーション実行（変換で内容が変わっていなければキャッシュを再利用）
+            validation_success = self._attach_validation(report)["success"]
             
             report["validation_passed"] = validation_success
             report["api_fix_needed"] = not validation_success
@@ -167,20 +205,20 @@ class ValidationReportGenerator:
             "step_name": "Claude API Auto-Fix",
             "file_info": self._get_file_info(html_file),
             "api_fix_results": api_fix_results,
-            "validation_results": self._run_validation_checks(html_file),
+            "validation_results": {},
             "final_status": "pending"
         }
         
         try:
+            validation = self._attach_validation(report)
+            
             # API修正の成否を記録
             if "success" in api_fix_results:
                 report["api_fix_success"] = api_fix_results["success"]
                 
                 if api_fix_results["success"]:
                     # 修正後のバリデーション
-                    from validate_html_output import HTMLValidator
-                    validator = HTMLValidator()
-                    validation_success = validator.validate_file(html_file)
+                    validation_success = validation["success"]
                     report["post_fix_validation"] = validation_success
                     report["final_status"] = "fixed" if validation_success else "partial_fix"
                 else:
@@ -205,12 +243,14 @@ class ValidationReportGenerator:
             "step_name": "Final Strict Validation",
             "file_info": self._get_file_info(html_file),
             "final_validation_passed": final_validation,
-            "validation_results": self._run_validation_checks(html_file),
+            "validation_results": {},
             "overall_summary": {},
             "deployment_ready": final_validation
         }
         
         try:
+            self._attach_validation(report)
+            
             # 全体のサマリー作成
             overall_summary = self._create_overall_summary()
             report["overall_summary"] = overall_summary
@@ -247,13 +287,14 @@ class ValidationReportGenerator:
         except Exception as e:
             return {"exists": False, "error": str(e)}
     
-    def _run_validation_checks(self, file_path: str) -> Dict[str, Any]:
+    def _run_validation_checks(self, file_path: str, content: Optional[str] = None) -> Dict[str, Any]:
         """簡易バリデーションチェック実行"""
-        if not os.path.exists(file_path):
+        if content is None and not os.path.exists(file_path):
             return {"error": "File not found"}
             
         try:
-            content = self._read_file_safe(file_path)
+            if content is None:
+                content = self._read_file_safe(file_path)
             if not content:
                 return {"error": "Empty or unreadable file"}
                 
@@ -268,6 +309,104 @@ class ValidationReportGenerator:
         except Exception as e:
             return {"error": f"Validation check failed: {e}"}
     
+    def _load_cache(self) -> Dict[str, Any]:
+        """Load cached validation results; a cache from another validator version starts empty"""
+        empty = {"version": VALIDATION_CACHE_VERSION, "validator": validator_version(), "results": {}, "steps": {}}
+        if not os.path.exists(self.cache_path):
+            return empty
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable validation cache {self.cache_path}: {e}")
+            return empty
+        if cache.get("version") != empty["version"] or cache.get("validator") != empty["validator"]:
+            return empty
+        return cache
+    
+    def _save_cache(self) -> None:
+        # Only results some step still points at are worth keeping
+        referenced = set(self.cache["steps"].values())
+        self.cache["results"] = {
+            content_hash: entry for content_hash, entry in self.cache["results"].items() if content_hash in referenced
+        }
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cache, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️  Failed to save validation cache: {e}")
+    
+    def _validate(self, html_file: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Validation results for the file's current content, from the cache when the content was seen before"""
+        try:
+            with open(html_file, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None, {
+                "checks": self._run_validation_checks(html_file),
+                "validator": HTMLValidator().validate_file(html_file),
+                "issues": []
+            }
+        
+        content_hash = hashlib.sha256(data).hexdigest()
+        entry = self.cache["results"].get(content_hash)
+        if entry is not None:
+            self.cache_stats["hits"] += 1
+            return content_hash, entry
+        
+        self.cache_stats["misses"] += 1
+        try:
+            content = data.decode('utf-8')
+        except UnicodeDecodeError:
+            content = ""
+        validator_result = HTMLValidator().validate_file(html_file)
+        entry = {
+            "checks": self._run_validation_checks(html_file, content),
+            "validator": validator_result,
+            "issues": collect_issues(validator_result)
+        }
+        self.cache["results"][content_hash] = entry
+        return content_hash, entry
+    
+    def _attach_validation(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in the report's validation results and issue diff; returns the HTMLValidator result"""
+        hits = self.cache_stats["hits"]
+        content_hash, entry = self._validate(report["html_file"])
+        report["validation_results"] = entry["checks"]
+        report["content_hash"] = content_hash
+        report["validation_cache"] = "hit" if self.cache_stats["hits"] > hits else "miss"
+        report["issue_diff"] = self._issue_diff(report["step"], content_hash, entry["issues"])
+        
+        if report["step"] == 1:
+            # Step 1 starts a new run; later steps of the previous run are stale
+            self.cache["steps"] = {
+                step: previous_hash for step, previous_hash in self.cache["steps"].items() if int(step) <= 1
+            }
+        if content_hash is not None:
+            self.cache["steps"][str(report["step"])] = content_hash
+            self._save_cache()
+        return entry["validator"]
+    
+    def _issue_diff(self, step: int, content_hash: Optional[str], issues: List[str]) -> Dict[str, Any]:
+        """Issues resolved and introduced since the closest earlier step that was validated"""
+        earlier = [int(previous) for previous in self.cache["steps"] if int(previous) < step]
+        if not earlier:
+            return {"previous_step": None, "issue_count": len(issues)}
+        
+        previous_step = max(earlier)
+        previous_hash = self.cache["steps"][str(previous_step)]
+        previous_issues = self.cache["results"].get(previous_hash, {}).get("issues", [])
+        current, before = set(issues), set(previous_issues)
+        return {
+            "previous_step": previous_step,
+            "content_changed": previous_hash != content_hash,
+            "issue_count": len(issues),
+            "previous_issue_count": len(previous_issues),
+            "resolved": sorted(before - current),
+            "introduced": sorted(current - before),
+            "unchanged": len(current & before)
+        }
+    
     def _read_file_safe(self, file_path: str) -> Optional[str]:
         """安全なファイル読み込み"""
         try:
@@ -416,5 +555,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    import re
     main()
\ No newline at end of file
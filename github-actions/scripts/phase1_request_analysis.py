@@ -12,10 +12,18 @@ from datetime import datetime
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.claude_api import ClaudeAPI
-from utils.file_utils import read_json, write_json, read_prompt
+from utils.file_utils import read_json, write_json
+from utils.prompt_registry import PromptSpec, prompt_spec, validate_prompts
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error
 from utils.config import Config, validate_environment
 
+ANALYSIS_PROMPT = prompt_spec(
+    "00_parse_request", ["topic", "store_url", "target_audience", "word_count"], "phase1_request_analysis"
+)
+ANALYSIS_PROMPT_V3 = prompt_spec(
+    "00_parse_request_v3", ["topic", "target_audience", "keywords", "word_count"], "phase1_request_analysis"
+)
+
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -26,20 +34,20 @@ def parse_arguments():
     return parser.parse_args()
 
 
+def analysis_prompt() -> PromptSpec:
+    """V3の場合は新しいプロンプトテンプレートを使用"""
+    if os.environ.get("ENABLE_GEMINI_RESEARCH") == "true":
+        return ANALYSIS_PROMPT_V3
+    return ANALYSIS_PROMPT
+
+
 def analyze_request(params: dict, config: Config, claude: ClaudeAPI) -> dict:
     """Analyze and enhance the request parameters"""
     
-    # Read the prompt template
-    # V3の場合は新しいプロンプトテンプレートを使用
-    if os.environ.get("ENABLE_GEMINI_RESEARCH") == "true":
-        prompt_template = read_prompt("00_parse_request_v3")
-    else:
-        prompt_template = read_prompt("00_parse_request")
-    
     # Prepare the prompt
     if os.environ.get("ENABLE_GEMINI_RESEARCH") == "true":
         # V3: keywords パラメータを使用
-        prompt = prompt_template.format(
+        prompt = ANALYSIS_PROMPT_V3.render(
             topic=params["topic"],
             target_audience=params.get("target_audience", "セルフケア志向の女性"),
             keywords=params.get("keywords", ""),
@@ -47,7 +55,7 @@ def analyze_request(params: dict, config: Config, claude: ClaudeAPI) -> dict:
         )
     else:
         # V2: 既存のパラメータ
-        prompt = prompt_template.format(
+        prompt = ANALYSIS_PROMPT.render(
             topic=params["topic"],
             store_url=params.get("store_url", "なし"),
             target_audience=params.get("target_audience", "セルフケア志向の女性"),
@@ -71,7 +79,7 @@ def analyze_request(params: dict, config: Config, claude: ClaudeAPI) -> dict:
             "estimated_sections": "number"
         },
         temperature=0.1,
-        metadata={"phase": "request_analysis"}
+        metadata={"phase": "request_analysis", "prompt_version": analysis_prompt().version}
     )
     
     # Check if JSON parsing failed
@@ -124,6 +132,39 @@ def validate_parameters(params: dict) -> list:
     return errors
 
 
+def run_analysis(params: dict, config: Config, claude: ClaudeAPI, output_dir, logger) -> dict:
+    """Validate and analyze a request, write phase1_output.json and return it"""
+    logger.info(f"Processing request for topic: {params.get('topic')}")
+    
+    # Validate parameters
+    errors = validate_parameters(params)
+    if errors:
+        for error in errors:
+            log_error(logger, ValueError(error), "Parameter validation")
+        raise ValueError(f"Invalid parameters: {'; '.join(errors)}")
+    
+    # Analyze request
+    logger.info("Starting analysis request...")
+    logger.debug(f"Input params: {params}")
+    enhanced_params = analyze_request(params, config, claude)
+    logger.debug(f"Analysis result type: {type(enhanced_params.get('analysis'))}")
+    logger.debug(f"Analysis keys: {list(enhanced_params.get('analysis', {}).keys()) if isinstance(enhanced_params.get('analysis'), dict) else 'Not a dict'}")
+    
+    # Save output
+    output_file = Path(output_dir) / "phase1_output.json"
+    write_json(enhanced_params, output_file)
+    
+    # Log summary
+    analysis = enhanced_params.get('analysis', {})
+    if isinstance(analysis, dict):
+        logger.info(f"Main keyword identified: {analysis.get('main_keyword', 'Not available')}")
+        logger.info(f"Research queries generated: {len(analysis.get('research_queries', []))}")
+    else:
+        logger.warning(f"Analysis data is not in expected format: {type(analysis)}")
+    
+    return enhanced_params
+
+
 def main():
     """Main execution function"""
     args = parse_arguments()
@@ -135,6 +176,7 @@ def main():
     try:
         # Validate environment
         validate_environment()
+        validate_prompts([analysis_prompt().name])
         
         # Load configuration
         config = Config()
@@ -144,33 +186,8 @@ def main():
         
         # Read input parameters
         params = read_json(args.params_file)
-        logger.info(f"Processing request for topic: {params.get('topic')}")
-        
-        # Validate parameters
-        errors = validate_parameters(params)
-        if errors:
-            for error in errors:
-                log_error(logger, ValueError(error), "Parameter validation")
-            sys.exit(1)
-        
-        # Analyze request
-        logger.info("Starting analysis request...")
-        logger.debug(f"Input params: {params}")
-        enhanced_params = analyze_request(params, config, claude)
-        logger.debug(f"Analysis result type: {type(enhanced_params.get('analysis'))}")
-        logger.debug(f"Analysis keys: {list(enhanced_params.get('analysis', {}).keys()) if isinstance(enhanced_params.get('analysis'), dict) else 'Not a dict'}")
-        
-        # Save output
-        output_file = Path(args.output_dir) / "phase1_output.json"
-        write_json(enhanced_params, output_file)
         
-        # Log summary
-        analysis = enhanced_params.get('analysis', {})
-        if isinstance(analysis, dict):
-            logger.info(f"Main keyword identified: {analysis.get('main_keyword', 'Not available')}")
-            logger.info(f"Research queries generated: {len(analysis.get('research_queries', []))}")
-        else:
-            logger.warning(f"Analysis data is not in expected format: {type(analysis)}")
+        run_analysis(params, config, claude, args.output_dir, logger)
         
         log_phase_end(logger, "Phase 1: Request Analysis", success=True)
         
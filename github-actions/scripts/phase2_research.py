@@ -4,21 +4,30 @@
 import argparse
 import sys
 import asyncio
+import math
 import time
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Callable, Optional
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.claude_api import ClaudeAPI
-from utils.file_utils import read_json, write_json, read_prompt
+from utils.file_utils import write_json
+from utils.prompt_registry import prompt_spec, validate_prompts
+from utils.artifacts import read_artifact, RequestParams
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
 from utils.config import Config, validate_environment
-from utils.web_search import BingSearchAPI, ParallelSearcher
+from utils.research_cache import ResearchCache
+from utils.research_engine import ResearchEngine, ResearchProvider, PRIORITY_SOURCE_TYPE
+from utils.research_providers import BingProvider
+from utils.query_dedup import dedupe_queries
+
+RESEARCH_PROMPT = prompt_spec(
+    "01_research", ["topic", "main_keyword", "related_keywords", "target_audience", "existing_queries"], "phase2_research"
+)
 
 
 def parse_arguments():
@@ -26,8 +35,8 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description="Phase 2: Research")
     parser.add_argument("--params-file", required=True, help="Phase 1 output JSON file")
     parser.add_argument("--output-dir", required=True, help="Output directory")
-    parser.add_argument("--parallel-batches", type=int, default=5, help="Number of parallel search batches")
-    parser.add_argument("--searches-per-batch", type=int, default=5, help="Searches per batch")
+    parser.add_argument("--parallel-batches", type=int, default=5, help="Number of concurrent searches")
+    parser.add_argument("--searches-per-batch", type=int, default=5, help="Deprecated: searches are no longer batched")
     parser.add_argument("--log-level", default="INFO", help="Logging level")
     return parser.parse_args()
 
@@ -38,11 +47,8 @@ def generate_search_queries(params: dict, claude: ClaudeAPI) -> List[str]:
     # Start with queries from Phase 1
     base_queries = params.get("analysis", {}).get("research_queries", [])
     
-    # Read research prompt template
-    prompt_template = read_prompt("01_research")
-    
     # Generate additional queries
-    prompt = prompt_template.format(
+    prompt = RESEARCH_PROMPT.render(
         topic=params["topic"],
         main_keyword=params["analysis"].get("main_keyword", params["topic"]),
         related_keywords=", ".join(params["analysis"].get("related_keywords", [])),
@@ -63,7 +69,7 @@ def generate_search_queries(params: dict, claude: ClaudeAPI) -> List[str]:
             "statistics_queries": ["string"]
         },
         temperature=0.5,
-        metadata={"phase": "research_query_generation"}
+        metadata={"phase": "research_query_generation", "prompt_version": RESEARCH_PROMPT.version}
     )
     
     # Combine all queries
@@ -72,85 +78,33 @@ def generate_search_queries(params: dict, claude: ClaudeAPI) -> List[str]:
         if isinstance(queries, list):
             all_queries.extend(queries)
     
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_queries = []
-    for q in all_queries:
-        if q not in seen:
-            seen.add(q)
-            unique_queries.append(q)
-    
-    return unique_queries[:25]  # Limit to 25 queries as per requirements
-
-
-def process_search_batch(
-    queries: List[str], 
-    searcher: BingSearchAPI,
-    logger
-) -> List[Dict[str, Any]]:
-    """Process a batch of search queries"""
-    batch_results = []
-    
-    for query in queries:
-        try:
-            logger.info(f"Searching: {query}")
-            results = searcher.search_with_priority(query, count=10)
-            
-            batch_results.append({
-                "query": query,
-                "results": results,
-                "timestamp": datetime.utcnow().isoformat(),
-                "result_count": len(results)
-            })
-            
-            # Rate limiting
-            time.sleep(0.5)
-            
-        except Exception as e:
-            log_error(logger, e, f"Search query: {query}")
-            batch_results.append({
-                "query": query,
-                "results": [],
-                "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
-            })
-    
-    return batch_results
+    # Collapse paraphrases and spend the freed slots on diverse queries
+    deduped = dedupe_queries(
+        all_queries,
+        limit=25,  # Limit to 25 queries as per requirements
+        ignore_terms=[params["topic"], params["analysis"].get("main_keyword", "")],
+        priority=len(base_queries)
+    )
+    return deduped["queries"]
 
 
 def parallel_research(
     queries: List[str],
-    parallel_batches: int,
-    searches_per_batch: int,
-    logger
+    max_concurrent: int,
+    logger,
+    cache: Optional[ResearchCache] = None,
+    limiter=None,
+    providers: Optional[List[ResearchProvider]] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
 ) -> Dict[str, Any]:
-    """Execute research queries in parallel batches"""
+    """Execute research queries through the shared research engine (Bing unless providers are given)"""
     
-    searcher = BingSearchAPI()
-    all_results = []
-    
-    # Split queries into batches
-    batches = []
-    for i in range(0, len(queries), searches_per_batch):
-        batches.append(queries[i:i + searches_per_batch])
-    
-    # Process batches in parallel
-    with ThreadPoolExecutor(max_workers=parallel_batches) as executor:
-        # Submit all batches
-        future_to_batch = {
-            executor.submit(process_search_batch, batch, searcher, logger): batch
-            for batch in batches
-        }
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_batch):
-            batch = future_to_batch[future]
-            try:
-                batch_results = future.result()
-                all_results.extend(batch_results)
-                logger.info(f"Completed batch with {len(batch_results)} searches")
-            except Exception as e:
-                log_error(logger, e, f"Batch processing")
+    engine = ResearchEngine(
+        providers or [BingProvider(max_concurrent=max_concurrent, limiter=limiter)],
+        cache=cache or ResearchCache(),
+        log=logger
+    )
+    all_results = engine.run_sync(queries, on_result)
     
     # Analyze and summarize results
     total_results = sum(r.get("result_count", 0) for r in all_results)
@@ -163,6 +117,7 @@ def parallel_research(
             "successful_queries": len([r for r in all_results if "error" not in r]),
             "total_results": total_results,
             "priority_distribution": priority_distribution,
+            "providers": engine.stats(),
             "execution_time": datetime.utcnow().isoformat()
         }
     }
@@ -187,13 +142,11 @@ def analyze_priority_distribution(results: List[Dict[str, Any]]) -> Dict[str, in
     return distribution
 
 
-def extract_key_sources(research_data: Dict[str, Any], claude: ClaudeAPI) -> Dict[str, Any]:
-    """Extract and analyze key sources from research results"""
-    
-    # Collect high-priority sources
+def collect_high_priority_sources(search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The first 20 very high / high priority sources, in query order"""
     high_priority_sources = []
     
-    for search_result in research_data["search_results"]:
+    for search_result in search_results:
         for result in search_result.get("results", []):
             if result.get("priority") in ["very_high", "high"]:
                 high_priority_sources.append({
@@ -205,7 +158,62 @@ def extract_key_sources(research_data: Dict[str, Any], claude: ClaudeAPI) -> Dic
                 })
     
     # Limit to top 20 sources
-    high_priority_sources = high_priority_sources[:20]
+    return high_priority_sources[:20]
+
+
+def categorize_sources_locally(high_priority_sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Group sources by the category their priority implies, without asking Claude"""
+    categorized = {f"{category}_sources": [] for category in ("government", "academic", "medical", "industry", "media")}
+    for source in high_priority_sources:
+        category = PRIORITY_SOURCE_TYPE.get(source["priority"], "media")
+        categorized[f"{category}_sources"].append({
+            "url": source["url"],
+            "title": source["title"],
+            "key_info": source["snippet"]
+        })
+    return categorized
+
+
+def partial_research_artifact(params: dict, queries: List[str], records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """A phase 2 artifact built from the searches finished so far, for speculative structure planning
+    
+    Sources are categorized locally instead of by Claude, so the draft costs
+    no extra call; `metadata.partial` marks it as incomplete.
+    """
+    order = {query: index for index, query in enumerate(queries)}
+    records = sorted(records, key=lambda record: order.get(record["query"], len(order)))
+    high_priority_sources = collect_high_priority_sources(records)
+    return {
+        "phase1_params": params,
+        "research_queries": queries,
+        "research_data": {
+            "search_results": records,
+            "statistics": {
+                "total_queries": len(queries),
+                "successful_queries": len([r for r in records if "error" not in r]),
+                "total_results": sum(r.get("result_count", 0) for r in records),
+                "priority_distribution": analyze_priority_distribution(records)
+            }
+        },
+        "source_analysis": {
+            "high_priority_sources": high_priority_sources,
+            "categorized_sources": categorize_sources_locally(high_priority_sources),
+            "source_count": len(high_priority_sources)
+        },
+        "metadata": {
+            "phase": "research",
+            "partial": True,
+            "completed_queries": len(records),
+            "created_at": datetime.utcnow().isoformat()
+        }
+    }
+
+
+def extract_key_sources(research_data: Dict[str, Any], claude: ClaudeAPI) -> Dict[str, Any]:
+    """Extract and analyze key sources from research results"""
+    
+    # Collect high-priority sources
+    high_priority_sources = collect_high_priority_sources(research_data["search_results"])
     
     # Have Claude analyze and categorize sources
     analysis_prompt = f"""
@@ -237,6 +245,87 @@ def extract_key_sources(research_data: Dict[str, Any], claude: ClaudeAPI) -> Dic
     }
 
 
+def run_research(
+    params: dict,
+    claude: ClaudeAPI,
+    output_dir,
+    logger,
+    parallel_batches: int = 5,
+    cache: Optional[ResearchCache] = None,
+    limiter=None,
+    providers: Optional[List[ResearchProvider]] = None,
+    speculate_at: Optional[float] = None,
+    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """Research a phase 1 result, write phase2_research.json and return it
+    
+    With `on_partial`, it is called once (from the research event loop, so it
+    must return quickly) with `partial_research_artifact` as soon as the
+    `speculate_at` fraction of the queries has finished.
+    """
+    logger.info(f"Starting research for topic: {params.get('topic')}")
+    
+    # Generate search queries
+    queries = generate_search_queries(params, claude)
+    logger.info(f"Generated {len(queries)} search queries")
+    
+    on_result = None
+    if on_partial is not None and speculate_at is not None and queries:
+        landed = []
+        threshold = min(len(queries), max(1, math.ceil(len(queries) * speculate_at)))
+        
+        def collect_partial(record: Dict[str, Any]) -> None:
+            landed.append(record)
+            if len(landed) == threshold:
+                on_partial(partial_research_artifact(params, queries, landed))
+        
+        on_result = collect_partial
+    
+    # Execute parallel research
+    start_time = time.time()
+    research_data = parallel_research(
+        queries,
+        parallel_batches,
+        logger,
+        cache,
+        limiter,
+        providers,
+        on_result
+    )
+    elapsed_time = time.time() - start_time
+    
+    # Log metrics
+    log_metric(logger, "research_time", elapsed_time, "seconds")
+    log_metric(logger, "total_results", research_data["statistics"]["total_results"])
+    log_metric(logger, "high_priority_results", 
+              research_data["statistics"]["priority_distribution"]["very_high"] +
+              research_data["statistics"]["priority_distribution"]["high"])
+    
+    # Extract key sources
+    source_analysis = extract_key_sources(research_data, claude)
+    
+    # Combine all research data
+    final_output = {
+        "phase1_params": params,
+        "research_queries": queries,
+        "research_data": research_data,
+        "source_analysis": source_analysis,
+        "metadata": {
+            "phase": "research",
+            "completed_at": datetime.utcnow().isoformat(),
+            "execution_time": elapsed_time
+        }
+    }
+    
+    # Save output
+    output_file = Path(output_dir) / "phase2_research.json"
+    write_json(final_output, output_file)
+    
+    logger.info(f"Research completed with {research_data['statistics']['successful_queries']} successful queries")
+    
+    return final_output
+
+
 def main():
     """Main execution function"""
     args = parse_arguments()
@@ -248,6 +337,7 @@ def main():
     try:
         # Validate environment
         validate_environment()
+        validate_prompts([RESEARCH_PROMPT.name])
         
         # Load configuration
         config = Config()
@@ -256,51 +346,9 @@ def main():
         claude = ClaudeAPI()
         
         # Read Phase 1 output
-        params = read_json(args.params_file)
-        logger.info(f"Starting research for topic: {params.get('topic')}")
-        
-        # Generate search queries
-        queries = generate_search_queries(params, claude)
-        logger.info(f"Generated {len(queries)} search queries")
-        
-        # Execute parallel research
-        start_time = time.time()
-        research_data = parallel_research(
-            queries,
-            args.parallel_batches,
-            args.searches_per_batch,
-            logger
-        )
-        elapsed_time = time.time() - start_time
-        
-        # Log metrics
-        log_metric(logger, "research_time", elapsed_time, "seconds")
-        log_metric(logger, "total_results", research_data["statistics"]["total_results"])
-        log_metric(logger, "high_priority_results", 
-                  research_data["statistics"]["priority_distribution"]["very_high"] +
-                  research_data["statistics"]["priority_distribution"]["high"])
-        
-        # Extract key sources
-        source_analysis = extract_key_sources(research_data, claude)
-        
-        # Combine all research data
-        final_output = {
-            "phase1_params": params,
-            "research_queries": queries,
-            "research_data": research_data,
-            "source_analysis": source_analysis,
-            "metadata": {
-                "phase": "research",
-                "completed_at": datetime.utcnow().isoformat(),
-                "execution_time": elapsed_time
-            }
-        }
-        
-        # Save output
-        output_file = Path(args.output_dir) / "phase2_research.json"
-        write_json(final_output, output_file)
+        params = read_artifact(args.params_file, RequestParams)
         
-        logger.info(f"Research completed with {research_data['statistics']['successful_queries']} successful queries")
+        run_research(params, claude, args.output_dir, logger, args.parallel_batches)
         
         log_phase_end(logger, "Phase 2: Research", success=True)
         
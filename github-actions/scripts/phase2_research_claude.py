@@ -4,11 +4,9 @@
 import argparse
 import sys
 import time
-import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
@@ -18,6 +16,10 @@ from utils.claude_web_search import ClaudeWebSearch
 from utils.file_utils import read_json, write_json, read_prompt
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
 from utils.config import Config, validate_environment
+from utils.research_cache import ResearchCache
+from utils.research_engine import ResearchEngine
+from utils.research_providers import ClaudeWebSearchProvider
+from utils.query_dedup import dedupe_queries
 
 
 def parse_arguments():
@@ -25,8 +27,8 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description="Phase 2: Research with Claude")
     parser.add_argument("--params-file", required=True, help="Phase 1 output JSON file")
     parser.add_argument("--output-dir", required=True, help="Output directory")
-    parser.add_argument("--parallel-batches", type=int, default=3, help="Number of parallel search batches")
-    parser.add_argument("--searches-per-batch", type=int, default=5, help="Searches per batch")
+    parser.add_argument("--parallel-batches", type=int, default=3, help="Number of concurrent searches")
+    parser.add_argument("--searches-per-batch", type=int, default=5, help="Deprecated: searches are no longer batched")
     parser.add_argument("--log-level", default="INFO", help="Logging level")
     return parser.parse_args()
 
@@ -71,86 +73,30 @@ def generate_search_queries(params: dict, claude: ClaudeAPI) -> List[str]:
         if isinstance(queries, list):
             all_queries.extend(queries)
     
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_queries = []
-    for q in all_queries:
-        if q not in seen:
-            seen.add(q)
-            unique_queries.append(q)
-    
-    return unique_queries[:25]  # Limit to 25 queries as per requirements
-
-
-def process_search_batch(
-    queries: List[str],
-    searcher: ClaudeWebSearch,
-    logger
-) -> List[Dict[str, Any]]:
-    """Process a batch of search queries using Claude"""
-    
-    batch_results = []
-    
-    for query in queries:
-        try:
-            logger.info(f"Searching: {query}")
-            results = searcher.search_and_analyze(query, num_results=10)
-            
-            batch_results.append({
-                "query": query,
-                "results": results,
-                "timestamp": datetime.utcnow().isoformat(),
-                "result_count": len(results)
-            })
-            
-            # Small delay between searches
-            time.sleep(0.5)
-            
-        except Exception as e:
-            log_error(logger, e, f"Search query: {query}")
-            batch_results.append({
-                "query": query,
-                "results": [],
-                "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
-            })
-    
-    return batch_results
+    # Collapse paraphrases and spend the freed slots on diverse queries
+    deduped = dedupe_queries(
+        all_queries,
+        limit=25,  # Limit to 25 queries as per requirements
+        ignore_terms=[params["topic"], params["analysis"].get("main_keyword", "")],
+        priority=len(base_queries)
+    )
+    return deduped["queries"]
 
 
 def parallel_research_claude(
     queries: List[str],
-    parallel_batches: int,
-    searches_per_batch: int,
-    logger
+    max_concurrent: int,
+    logger,
+    searcher: Optional[ClaudeWebSearch] = None
 ) -> Dict[str, Any]:
-    """Execute research queries in parallel batches using Claude"""
-    
-    searcher = ClaudeWebSearch()
-    all_results = []
-    
-    # Split queries into batches
-    batches = []
-    for i in range(0, len(queries), searches_per_batch):
-        batches.append(queries[i:i + searches_per_batch])
+    """Execute research queries through the shared research engine (Claude)"""
     
-    # Process batches in parallel
-    with ThreadPoolExecutor(max_workers=parallel_batches) as executor:
-        # Submit all batches
-        future_to_batch = {
-            executor.submit(process_search_batch, batch, searcher, logger): batch
-            for batch in batches
-        }
-        
-        # Collect results as they complete
-        for future in as_completed(future_to_batch):
-            batch = future_to_batch[future]
-            try:
-                batch_results = future.result()
-                all_results.extend(batch_results)
-                logger.info(f"Completed batch with {len(batch_results)} searches")
-            except Exception as e:
-                log_error(logger, e, f"Batch processing")
+    engine = ResearchEngine(
+        [ClaudeWebSearchProvider(searcher, max_concurrent=max_concurrent)],
+        cache=ResearchCache(),
+        log=logger
+    )
+    all_results = engine.run_sync(queries)
     
     # Analyze and summarize results
     total_results = sum(r.get("result_count", 0) for r in all_results)
@@ -163,6 +109,7 @@ def parallel_research_claude(
             "successful_queries": len([r for r in all_results if "error" not in r]),
             "total_results": total_results,
             "priority_distribution": priority_distribution,
+            "providers": engine.stats(),
             "execution_time": datetime.utcnow().isoformat()
         }
     }
@@ -281,8 +228,8 @@ def main():
         research_data = parallel_research_claude(
             queries,
             args.parallel_batches,
-            args.searches_per_batch,
-            logger
+            logger,
+            claude_searcher
         )
         elapsed_time = time.time() - start_time
         
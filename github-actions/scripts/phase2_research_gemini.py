@@ -2,13 +2,14 @@
 """Phase 2: Research - Using Gemini CLI for web search"""
 
 import argparse
+import re
 import sys
 import json
 import subprocess
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import tempfile
 
 # Add parent directory to path for imports
@@ -18,6 +19,11 @@ from utils.claude_api import ClaudeAPI
 from utils.file_utils import read_json, write_json, read_prompt, write_text
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
 from utils.config import Config
+from utils.research_cache import ResearchCache, normalize_query
+from utils.query_dedup import dedupe_queries
+
+# Provider key for the cross-article research cache
+SEARCH_PROVIDER = "gemini_cli:gemini-pro"
 
 
 def parse_arguments():
@@ -87,15 +93,14 @@ def generate_search_queries(params: dict, claude: ClaudeAPI) -> List[str]:
         if isinstance(queries, list):
             all_queries.extend(queries)
     
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_queries = []
-    for q in all_queries:
-        if q not in seen:
-            seen.add(q)
-            unique_queries.append(q)
-    
-    return unique_queries[:25]  # Limit to 25 queries as per requirements
+    # Collapse paraphrases and spend the freed slots on diverse queries
+    deduped = dedupe_queries(
+        all_queries,
+        limit=25,  # Limit to 25 queries as per requirements
+        ignore_terms=[params["topic"], params["analysis"].get("main_keyword", "")],
+        priority=len(base_queries)
+    )
+    return deduped["queries"]
 
 
 def create_gemini_research_prompt(queries: List[str], topic: str, target_audience: str) -> str:
@@ -234,6 +239,26 @@ def execute_gemini_research(prompt: str, output_dir: Path, logger) -> Dict[str,
             Path(prompt_file).unlink()
 
 
+def match_sent_queries(search_results: List[Dict[str, Any]], queries: List[str]) -> List[Optional[str]]:
+    """The query that was sent for each search result, or None when it can't be told
+    
+    Gemini echoes the query back in its own words (sometimes with the list
+    number), so results are matched by normalized text first. When there is
+    one result per query, the rest are paired in order with the queries no
+    result matched.
+    """
+    by_key = {normalize_query(query): query for query in queries}
+    matched = []
+    for item in search_results:
+        echoed = re.sub(r'^\s*\d+[.)]\s*', '', str(item.get("query") or ""))
+        matched.append(by_key.get(normalize_query(echoed)))
+    
+    if len(search_results) == len(queries):
+        unmatched = iter([query for query in queries if query not in matched])
+        matched = [sent if sent is not None else next(unmatched, None) for sent in matched]
+    return matched
+
+
 def process_gemini_results(raw_results: Dict[str, Any]) -> Dict[str, Any]:
     """Process and validate Gemini research results"""
     
@@ -382,16 +407,35 @@ def main():
         queries = generate_search_queries(params, claude)
         logger.info(f"Generated {len(queries)} search queries")
         
-        # Create Gemini research prompt
-        gemini_prompt = create_gemini_research_prompt(
-            queries,
-            params.get("topic"),
-            params.get("target_audience", "")
-        )
+        # Serve previously researched queries from the local cache
+        cache = ResearchCache()
+        cached_results = []
+        pending_queries = []
+        for query in queries:
+            cached = cache.get(query, SEARCH_PROVIDER)
+            if cached is not None:
+                cached_results.append({"query": query, "results": cached})
+            else:
+                pending_queries.append(query)
+        logger.info(f"Research cache: {len(cached_results)} hits, {len(pending_queries)} queries to search")
         
         # Execute research with Gemini
         start_time = time.time()
-        raw_results = execute_gemini_research(gemini_prompt, Path(args.output_dir), logger)
+        raw_results = {"search_results": []}
+        if pending_queries:
+            # Create Gemini research prompt
+            gemini_prompt = create_gemini_research_prompt(
+                pending_queries,
+                params.get("topic"),
+                params.get("target_audience", "")
+            )
+            raw_results = execute_gemini_research(gemini_prompt, Path(args.output_dir), logger)
+            # Cache under the query that was sent, so the same query hits next time
+            search_items = raw_results.get("search_results", [])
+            for search_item, sent_query in zip(search_items, match_sent_queries(search_items, pending_queries)):
+                if sent_query and search_item.get("results"):
+                    cache.put(sent_query, SEARCH_PROVIDER, search_item["results"])
+        raw_results["search_results"] = cached_results + raw_results.get("search_results", [])
         elapsed_time = time.time() - start_time
         
         # Process results
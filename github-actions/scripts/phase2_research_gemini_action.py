@@ -4,13 +4,11 @@
 import argparse
 import sys
 import os
-import json
 import time
 import asyncio
-import aiohttp
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path for imports
@@ -20,108 +18,10 @@ from utils.claude_api import ClaudeAPI
 from utils.file_utils import read_json, write_json, read_prompt, write_text
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
 from utils.config import Config
-
-
-class GeminiSearchAPI:
-    """Direct Gemini API integration for web search"""
-    
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
-        self.model = "gemini-pro"
-        
-    async def search_and_analyze(self, query: str, session: aiohttp.ClientSession) -> Dict[str, Any]:
-        """Perform web search using Gemini with grounding"""
-        
-        prompt = f"""
-        Perform a web search for the following query and return accurate, up-to-date results from reliable sources:
-        
-        Query: {query}
-        
-        Requirements:
-        1. Use web grounding to find real, current information
-        2. Prioritize official sources (.gov, .edu, academic journals)
-        3. Include publication dates and source credibility
-        4. Return structured data with URLs, titles, and key findings
-        
-        Format the response as JSON:
-        {{
-            "results": [
-                {{
-                    "url": "actual URL",
-                    "title": "page title",
-                    "source_type": "government/academic/medical/industry/media",
-                    "date": "publication date if available",
-                    "reliability_score": 1-10,
-                    "key_findings": ["finding 1", "finding 2"],
-                    "relevant_quote": "exact quote if important"
-                }}
-            ]
-        }}
-        """
-        
-        headers = {
-            "Content-Type": "application/json",
-            "x-goog-api-key": self.api_key
-        }
-        
-        data = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
-            "generationConfig": {
-                "temperature": 0.3,
-                "maxOutputTokens": 2048,
-                "topP": 0.8,
-                "topK": 10
-            },
-            "tools": [{
-                "googleSearchRetrieval": {
-                    "dynamicRetrievalConfig": {
-                        "mode": "MODE_DYNAMIC",
-                        "dynamicThreshold": 0.3
-                    }
-                }
-            }]
-        }
-        
-        try:
-            async with session.post(
-                f"{self.base_url}/{self.model}:generateContent",
-                headers=headers,
-                json=data,
-                timeout=aiohttp.ClientTimeout(total=30)
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    
-                    # Extract text from response
-                    text_response = result['candidates'][0]['content']['parts'][0]['text']
-                    
-                    # Parse JSON from response
-                    json_start = text_response.find('{')
-                    json_end = text_response.rfind('}') + 1
-                    if json_start >= 0 and json_end > json_start:
-                        search_results = json.loads(text_response[json_start:json_end])
-                        return {
-                            "query": query,
-                            "results": search_results.get("results", []),
-                            "timestamp": datetime.utcnow().isoformat()
-                        }
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"Gemini API error {response.status}: {error_text}")
-                    
-        except Exception as e:
-            print(f"Search error for '{query}': {str(e)}")
-            return {
-                "query": query,
-                "results": [],
-                "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
-            }
+from utils.research_cache import ResearchCache
+from utils.research_engine import ResearchEngine
+from utils.research_providers import GeminiApiProvider
+from utils.query_dedup import dedupe_queries
 
 
 def parse_arguments():
@@ -130,6 +30,7 @@ def parse_arguments():
     parser.add_argument("--params-file", required=True, help="Phase 1 output JSON file")
     parser.add_argument("--output-dir", required=True, help="Output directory")
     parser.add_argument("--parallel-searches", type=int, default=5, help="Number of parallel searches")
+    parser.add_argument("--request-timeout", type=float, default=30, help="Per-request timeout in seconds")
     parser.add_argument("--log-level", default="INFO", help="Logging level")
     return parser.parse_args()
 
@@ -168,46 +69,36 @@ def generate_search_queries(params: dict, claude: ClaudeAPI) -> List[str]:
         if isinstance(queries, list):
             all_queries.extend(queries)
     
-    seen = set()
-    unique_queries = []
-    for q in all_queries:
-        if q not in seen:
-            seen.add(q)
-            unique_queries.append(q)
-    
-    return unique_queries[:25]
+    deduped = dedupe_queries(
+        all_queries,
+        limit=25,
+        ignore_terms=[params["topic"], params["analysis"].get("main_keyword", "")],
+        priority=len(base_queries)
+    )
+    return deduped["queries"]
 
 
 async def perform_parallel_searches(
     queries: List[str],
     api_key: str,
-    max_concurrent: int = 5
+    max_concurrent: int = 5,
+    request_timeout: float = 30,
+    hedge_after: Optional[float] = None,
+    max_attempts: int = 2
 ) -> List[Dict[str, Any]]:
-    """Perform searches in parallel using Gemini API"""
-    
-    gemini = GeminiSearchAPI(api_key)
-    results = []
+    """Perform searches using Gemini API through the shared research engine
     
-    async with aiohttp.ClientSession() as session:
-        # Process in batches
-        for i in range(0, len(queries), max_concurrent):
-            batch = queries[i:i + max_concurrent]
-            
-            # Create tasks for batch
-            tasks = [
-                gemini.search_and_analyze(query, session)
-                for query in batch
-            ]
-            
-            # Execute batch
-            batch_results = await asyncio.gather(*tasks)
-            results.extend(batch_results)
-            
-            # Small delay between batches
-            if i + max_concurrent < len(queries):
-                await asyncio.sleep(1)
-    
-    return results
+    At most `max_concurrent` requests are in flight; a new query starts as
+    soon as any slot frees up, and stragglers are hedged after `hedge_after`
+    seconds (half the timeout by default).
+    """
+    engine = ResearchEngine(
+        [GeminiApiProvider(api_key, max_concurrent=max_concurrent, timeout=request_timeout)],
+        cache=ResearchCache(),
+        max_attempts=max_attempts,
+        hedge_after=hedge_after if hedge_after is not None else request_timeout / 2
+    )
+    return await engine.run(queries)
 
 
 def process_search_results(raw_results: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -344,7 +235,8 @@ def main():
         raw_results = asyncio.run(perform_parallel_searches(
             queries,
             api_key,
-            args.parallel_searches
+            args.parallel_searches,
+            args.request_timeout
         ))
         elapsed_time = time.time() - start_time
         
@@ -2,8 +2,8 @@
 """Phase 2: Research - Using Gemini CLI for real web search"""
 
 import argparse
+import os
 import sys
-import json
 import subprocess
 import time
 from pathlib import Path
@@ -16,6 +16,10 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.file_utils import read_json, write_json, write_text
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
+from utils.research_cache import ResearchCache
+from utils.research_engine import ResearchEngine
+from utils.research_providers import GeminiCliProvider
+from utils.query_dedup import dedupe_queries
 
 
 def parse_arguments():
@@ -23,6 +27,9 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description="Phase 2: Research with Gemini CLI")
     parser.add_argument("--params-file", required=True, help="Phase 1 output JSON file")
     parser.add_argument("--output-dir", required=True, help="Output directory")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="Gemini CLI processes running at once")
+    parser.add_argument("--requests-per-minute", type=float, default=30, help="Global cap on CLI process starts")
+    parser.add_argument("--search-timeout", type=float, default=60, help="Timeout per CLI process in seconds")
     parser.add_argument("--log-level", default="INFO", help="Logging level")
     return parser.parse_args()
 
@@ -44,102 +51,25 @@ def setup_gemini_cli(logger):
         raise ValueError("GEMINI_API_KEY not found in environment")
 
 
-def execute_gemini_search(query: str, logger) -> Dict[str, Any]:
-    """Execute a single search using Gemini CLI"""
+def batch_search_with_gemini_cli(
+    queries: List[str],
+    logger,
+    max_in_flight: int = 4,
+    requests_per_minute: float = 30,
+    timeout: float = 60
+) -> List[Dict[str, Any]]:
+    """Execute searches through a pool of concurrent Gemini CLI processes
     
-    prompt = f"""
-    Web検索を実行してください: "{query}"
-    
-    以下の優先度で信頼性の高い情報源を重視してください：
-    - 政府機関（.go.jp, .gov）
-    - 学術機関（.ac.jp, .edu）
-    - 業界団体、専門協会
-    - 大手メディア
-    
-    各検索結果について以下の形式でJSONで返してください：
-    {{
-        "query": "{query}",
-        "results": [
-            {{
-                "url": "実際のURL",
-                "title": "ページタイトル",
-                "source_type": "government/academic/medical/industry/media",
-                "reliability_score": 1-10,
-                "key_findings": ["重要な発見"],
-                "publication_date": "公開日（分かれば）"
-            }}
-        ]
-    }}
+    The research engine keeps `max_in_flight` processes running under a
+    global start-rate cap and retries failed or timed-out queries.
     """
-    
-    try:
-        # Execute Gemini CLI with web search tool
-        cmd = [
-            "gemini", "chat",
-            "--model", "gemini-2.0-flash-exp",
-            "--tools", "web_search",
-            "--temperature", "1.0",  # Recommended for grounding
-            "--max-tokens", "2048",
-            "--format", "json",
-            "-p", prompt
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            timeout=60
-        )
-        
-        if result.returncode != 0:
-            raise Exception(f"Gemini CLI failed: {result.stderr}")
-        
-        # Parse JSON response
-        try:
-            response_data = json.loads(result.stdout)
-            return response_data
-        except json.JSONDecodeError:
-            # Try to extract JSON from output
-            output = result.stdout
-            json_start = output.find('{')
-            json_end = output.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                return json.loads(output[json_start:json_end])
-            else:
-                raise
-                
-    except subprocess.TimeoutExpired:
-        logger.error(f"Search timeout for query: {query}")
-        return {"query": query, "results": [], "error": "timeout"}
-    except Exception as e:
-        logger.error(f"Search failed for '{query}': {str(e)}")
-        return {"query": query, "results": [], "error": str(e)}
-
-
-def batch_search_with_gemini_cli(queries: List[str], logger, batch_size: int = 5) -> List[Dict[str, Any]]:
-    """Execute searches in batches using Gemini CLI"""
-    
-    all_results = []
-    total_queries = len(queries)
-    
-    for i in range(0, total_queries, batch_size):
-        batch = queries[i:i + batch_size]
-        batch_num = i // batch_size + 1
-        total_batches = (total_queries + batch_size - 1) // batch_size
-        
-        logger.info(f"Processing batch {batch_num}/{total_batches}")
-        
-        for j, query in enumerate(batch):
-            logger.info(f"Searching ({i+j+1}/{total_queries}): {query}")
-            result = execute_gemini_search(query, logger)
-            all_results.append(result)
-            
-            # Rate limiting
-            if j < len(batch) - 1:
-                time.sleep(2)  # 2 second delay between searches
-    
-    return all_results
+    provider = GeminiCliProvider(
+        max_concurrent=max_in_flight,
+        requests_per_minute=requests_per_minute,
+        timeout=timeout
+    )
+    engine = ResearchEngine([provider], cache=ResearchCache(), log=logger)
+    return engine.run_sync(queries)
 
 
 def process_search_results(raw_results: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -281,13 +211,24 @@ def main():
             f"{main_keyword} 注意点 リスク"
         ]
         
-        # Combine and deduplicate
-        all_queries = list(dict.fromkeys(queries + additional_queries))[:25]
+        # Combine and collapse near-duplicate queries
+        all_queries = dedupe_queries(
+            queries + additional_queries,
+            limit=25,
+            ignore_terms=[params["topic"], main_keyword],
+            priority=len(queries)
+        )["queries"]
         logger.info(f"Executing {len(all_queries)} search queries")
         
         # Execute searches
         start_time = time.time()
-        raw_results = batch_search_with_gemini_cli(all_queries, logger)
+        raw_results = batch_search_with_gemini_cli(
+            all_queries,
+            logger,
+            max_in_flight=args.max_in_flight,
+            requests_per_minute=args.requests_per_minute,
+            timeout=args.search_timeout
+        )
         elapsed_time = time.time() - start_time
         
         # Process results
@@ -370,5 +311,4 @@ def write_research_summary(data: Dict[str, Any], output_path: Path):
 
 
 if __name__ == "__main__":
-    import os
     main()
\ No newline at end of file
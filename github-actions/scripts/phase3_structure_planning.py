@@ -6,15 +6,36 @@ import sys
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.claude_api import ClaudeAPI
-from utils.file_utils import read_json, write_json, read_prompt
+from utils.file_utils import write_json
+from utils.prompt_registry import prompt_spec, validate_prompts
+from utils.artifacts import read_artifact, validate_artifact, ResearchArtifact, StructureArtifact
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
 from utils.config import Config, validate_environment
+from utils.json_stream import JsonArrayItemStream
+from utils.prompt_budget import (
+    DEFAULT_STRUCTURE_SOURCE_BUDGET,
+    budget_report,
+    pack_sources,
+    prioritize_categorized_sources
+)
+
+STRUCTURE_PROMPT = prompt_spec(
+    "02_structure",
+    ["topic", "main_keyword", "target_audience", "word_count", "research_summary", "key_points", "content_type"],
+    "phase3_structure_planning"
+)
+
+# Share of the final high-priority sources a speculative draft may not have seen before it is re-planned
+DEFAULT_RECONCILE_THRESHOLD = 0.25
+
+# The leading high-priority sources (from the phase 1 queries) a kept draft must have seen
+RECONCILE_TOP_SOURCES = 5
 
 
 def parse_arguments():
@@ -22,15 +43,25 @@ def parse_arguments():
     parser = argparse.ArgumentParser(description="Phase 3: Structure Planning")
     parser.add_argument("--research-file", required=True, help="Phase 2 research output JSON file")
     parser.add_argument("--output-dir", required=True, help="Output directory")
+    parser.add_argument("--source-token-budget", type=int, default=DEFAULT_STRUCTURE_SOURCE_BUDGET,
+                        help="Estimated token budget for research sources in the prompt")
     parser.add_argument("--log-level", default="INFO", help="Logging level")
     return parser.parse_args()
 
 
-def create_article_structure(research_data: dict, claude: ClaudeAPI, config: Config) -> dict:
-    """Create comprehensive article structure based on research"""
-    
-    # Read structure planning prompt
-    prompt_template = read_prompt("02_structure")
+def create_article_structure(
+    research_data: dict,
+    claude: ClaudeAPI,
+    config: Config,
+    source_token_budget: int = DEFAULT_STRUCTURE_SOURCE_BUDGET,
+    on_section: Optional[Callable[[dict], None]] = None
+) -> dict:
+    """Create comprehensive article structure based on research
+    
+    With `on_section`, the response is streamed and each `main_sections`
+    entry is passed to it as soon as it has been generated, before the rest
+    of the structure (FAQ, linking plan, ...) exists.
+    """
     
     # Extract key information from research
     params = research_data["phase1_params"]
@@ -47,11 +78,12 @@ def create_article_structure(research_data: dict, claude: ClaudeAPI, config: Con
     if isinstance(analysis, dict) and "parse_error" in analysis:
         raise ValueError(f"Phase1 analysis failed: {analysis.get('parse_error')}")
     
-    # Format sources for prompt
-    sources_summary = format_sources_for_prompt(sources)
+    # Format sources for prompt within the token budget
+    packed_sources = pack_sources_for_prompt(sources, source_token_budget)
+    sources_summary = packed_sources["text"]
     
     # Generate structure
-    prompt = prompt_template.format(
+    prompt = STRUCTURE_PROMPT.render(
         topic=params["topic"],
         main_keyword=analysis.get("main_keyword", params.get("topic", "")),
         target_audience=params.get("target_audience", "セルフケア志向の女性"),
@@ -61,7 +93,13 @@ def create_article_structure(research_data: dict, claude: ClaudeAPI, config: Con
         content_type=analysis.get("content_type", "informational")
     )
     
-    structure = claude.generate_with_structured_output(
+    structured_output = claude.generate_with_structured_output
+    stream_kwargs = {}
+    if on_section is not None:
+        structured_output = claude.stream_with_structured_output
+        stream_kwargs["on_text"] = JsonArrayItemStream("main_sections", on_section).feed
+    
+    structure = structured_output(
         prompt=prompt,
         system_prompt="You are an expert content strategist specializing in creating SEO-optimized article structures based on comprehensive research.",
         expected_format={
@@ -122,13 +160,17 @@ def create_article_structure(research_data: dict, claude: ClaudeAPI, config: Con
         },
         temperature=0.4,
         max_tokens=6000,
-        metadata={"phase": "structure_planning"}
+        metadata={"phase": "structure_planning", "prompt_version": STRUCTURE_PROMPT.version},
+        **stream_kwargs
     )
     
     # Check if structure generation failed
     if isinstance(structure, dict) and "parse_error" in structure:
         raise ValueError(f"Structure generation failed: {structure.get('parse_error')}")
     
+    # Fail here rather than in Phase 4 if Claude's JSON is missing sections or fields
+    validate_artifact(structure, StructureArtifact, "structure")
+    
     # Validate structure requirements
     validation_results = validate_structure(structure, config)
     
@@ -138,25 +180,44 @@ def create_article_structure(research_data: dict, claude: ClaudeAPI, config: Con
         "total_sections": len(structure.get("main_sections", [])),
         "total_faqs": len(structure.get("faq_section", {}).get("questions", [])),
         "validation": validation_results,
-        "source_distribution": analyze_source_usage(sources)
+        "source_distribution": analyze_source_usage(sources),
+        "prompt_budget": budget_report(packed_sources)
     }
     
     return structure
 
 
-def format_sources_for_prompt(sources: dict) -> str:
-    """Format categorized sources for the prompt"""
-    formatted = []
-    
-    for category, source_list in sources.items():
-        if source_list:
-            formatted.append(f"\n【{category.replace('_', ' ').title()}】")
-            for source in source_list[:3]:  # Limit to top 3 per category
-                formatted.append(f"- {source.get('title', 'No title')}")
-                if source.get('key_info'):
-                    formatted.append(f"  Key info: {source['key_info']}")
+def format_source_line(source: dict) -> str:
+    """Format a single source as a compact prompt line"""
+    line = f"- {source.get('title', 'No title')}"
+    if source.get('key_info'):
+        line += f" / {source['key_info']}"
+    return line
+
+
+def pack_sources_for_prompt(sources: dict, token_budget: int = DEFAULT_STRUCTURE_SOURCE_BUDGET) -> dict:
+    """Pack the highest-priority sources into the token budget, grouped by category"""
+    packed = pack_sources(
+        prioritize_categorized_sources(sources),
+        token_budget,
+        render=format_source_line
+    )
     
-    return "\n".join(formatted)
+    formatted = []
+    current_category = None
+    for source in sorted(packed["included"], key=lambda s: list(sources).index(s["category"])):
+        if source["category"] != current_category:
+            current_category = source["category"]
+            formatted.append(f"\n【{current_category.replace('_', ' ').title()}】")
+        formatted.append(format_source_line(source))
+    
+    packed["text"] = "\n".join(formatted)
+    return packed
+
+
+def format_sources_for_prompt(sources: dict, token_budget: int = DEFAULT_STRUCTURE_SOURCE_BUDGET) -> str:
+    """Format categorized sources for the prompt"""
+    return pack_sources_for_prompt(sources, token_budget)["text"]
 
 
 def validate_structure(structure: dict, config: Config) -> dict:
@@ -224,6 +285,43 @@ def analyze_source_usage(sources: dict) -> dict:
     return distribution
 
 
+def reconcile_speculative_structure(
+    draft_research: dict,
+    research_data: dict,
+    max_change: float = DEFAULT_RECONCILE_THRESHOLD
+) -> dict:
+    """Decide whether a structure planned on partial research still stands
+    
+    Compares the high-priority sources the draft was planned on with those of
+    the finished research. The draft is kept unless more than `max_change` of
+    the final high-priority sources are new to it, or one of the first
+    RECONCILE_TOP_SOURCES of them is.
+    """
+    draft_sources = {source["url"] for source in draft_research["source_analysis"]["high_priority_sources"]}
+    final_sources = research_data["source_analysis"]["high_priority_sources"]
+    new_sources = [source for source in final_sources if source["url"] not in draft_sources]
+    new_top = [source for source in final_sources[:RECONCILE_TOP_SOURCES] if source["url"] not in draft_sources]
+    change = len(new_sources) / len(final_sources) if final_sources else 0.0
+    
+    if new_top:
+        accepted, reason = False, f"{len(new_top)} of the top {RECONCILE_TOP_SOURCES} high-priority sources are new"
+    elif change > max_change:
+        accepted, reason = False, f"{change:.0%} of the high-priority sources are new (limit {max_change:.0%})"
+    else:
+        accepted, reason = True, f"{change:.0%} of the high-priority sources are new"
+    
+    return {
+        "accepted": accepted,
+        "reason": reason,
+        "draft_queries": draft_research["metadata"].get("completed_queries"),
+        "total_queries": len(research_data.get("research_queries", [])),
+        "draft_sources": len(draft_sources),
+        "final_sources": len(final_sources),
+        "new_sources": [source["url"] for source in new_sources],
+        "change": round(change, 3)
+    }
+
+
 def generate_section_keywords(structure: dict, claude: ClaudeAPI) -> dict:
     """Generate specific keywords for each section"""
     
@@ -248,6 +346,61 @@ def generate_section_keywords(structure: dict, claude: ClaudeAPI) -> dict:
     return section_keywords
 
 
+def run_structure_planning(
+    research_data: dict,
+    claude: ClaudeAPI,
+    config: Config,
+    output_dir,
+    logger,
+    source_token_budget: int = DEFAULT_STRUCTURE_SOURCE_BUDGET,
+    on_section: Optional[Callable[[dict], None]] = None,
+    write_outputs: bool = True
+) -> dict:
+    """Plan the article structure, write phase3_structure.json and the outline, and return it
+    
+    With `write_outputs=False` nothing is written; a speculative draft is only
+    saved (with `save_structure`) once it has been accepted.
+    """
+    logger.info(f"Creating structure for topic: {research_data['phase1_params']['topic']}")
+    
+    # Create article structure
+    structure = create_article_structure(research_data, claude, config, source_token_budget, on_section)
+    
+    prompt_budget = structure["metadata"]["prompt_budget"]
+    log_metric(logger, "prompt_source_tokens", prompt_budget["tokens"])
+    if prompt_budget["dropped"]:
+        logger.info(f"Dropped {len(prompt_budget['dropped'])} sources over the prompt budget: {prompt_budget['dropped']}")
+    
+    # Generate section-specific keywords
+    section_keywords = generate_section_keywords(structure, claude)
+    structure["section_keywords"] = section_keywords
+    
+    # Log metrics
+    log_metric(logger, "h2_sections", len(structure.get("main_sections", [])))
+    log_metric(logger, "faq_questions", len(structure.get("faq_section", {}).get("questions", [])))
+    log_metric(logger, "internal_links", len(structure.get("internal_linking_plan", [])))
+    log_metric(logger, "image_requirements", len(structure.get("image_requirements", [])))
+    
+    # Validation results
+    validation = structure["metadata"]["validation"]
+    if not validation["passed"]:
+        logger.warning(f"Structure validation issues: {validation['issues']}")
+    
+    # Save output
+    if write_outputs:
+        save_structure(structure, output_dir)
+    
+    logger.info(f"Structure planning completed successfully")
+    
+    return structure
+
+
+def save_structure(structure: dict, output_dir) -> None:
+    """Write phase3_structure.json and the human-readable outline"""
+    write_json(structure, Path(output_dir) / "phase3_structure.json")
+    write_outline_markdown(structure, Path(output_dir) / "article_outline.md")
+
+
 def main():
     """Main execution function"""
     args = parse_arguments()
@@ -259,6 +412,7 @@ def main():
     try:
         # Validate environment
         validate_environment()
+        validate_prompts([STRUCTURE_PROMPT.name])
         
         # Load configuration
         config = Config()
@@ -267,36 +421,9 @@ def main():
         claude = ClaudeAPI()
         
         # Read research data
-        research_data = read_json(args.research_file)
-        logger.info(f"Creating structure for topic: {research_data['phase1_params']['topic']}")
-        
-        # Create article structure
-        structure = create_article_structure(research_data, claude, config)
-        
-        # Generate section-specific keywords
-        section_keywords = generate_section_keywords(structure, claude)
-        structure["section_keywords"] = section_keywords
-        
-        # Log metrics
-        log_metric(logger, "h2_sections", len(structure.get("main_sections", [])))
-        log_metric(logger, "faq_questions", len(structure.get("faq_section", {}).get("questions", [])))
-        log_metric(logger, "internal_links", len(structure.get("internal_linking_plan", [])))
-        log_metric(logger, "image_requirements", len(structure.get("image_requirements", [])))
-        
-        # Validation results
-        validation = structure["metadata"]["validation"]
-        if not validation["passed"]:
-            logger.warning(f"Structure validation issues: {validation['issues']}")
-        
-        # Save output
-        output_file = Path(args.output_dir) / "phase3_structure.json"
-        write_json(structure, output_file)
-        
-        # Also save a human-readable outline
-        outline_file = Path(args.output_dir) / "article_outline.md"
-        write_outline_markdown(structure, outline_file)
+        research_data = read_artifact(args.research_file, ResearchArtifact)
         
-        logger.info(f"Structure planning completed successfully")
+        run_structure_planning(research_data, claude, config, args.output_dir, logger, args.source_token_budget)
         
         log_phase_end(logger, "Phase 3: Structure Planning", success=True)
         
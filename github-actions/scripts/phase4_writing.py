@@ -4,17 +4,37 @@
 import argparse
 import sys
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.claude_api import ClaudeAPI
-from utils.file_utils import read_json, write_json, write_text, read_prompt
+from utils.file_utils import write_json, write_text
+from utils.prompt_registry import prompt_spec, validate_prompts
+from utils.artifacts import read_artifact, ResearchArtifact, StructureArtifact
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
 from utils.config import Config, validate_environment
+from utils.keyword_index import KeywordIndex, build_density_heatmap, count_japanese_characters
+from utils.source_index import SourceIndex, build_source_index
+from utils.prompt_budget import DEFAULT_SECTION_SOURCE_BUDGET, budget_report, pack_sources
+from utils.tracing import bind_context
+
+WRITING_PROMPT = prompt_spec(
+    "03_writing",
+    ["section_title", "section_purpose", "word_count", "keywords", "subsections", "relevant_sources", "main_keyword", "target_audience"],
+    "phase4_writing"
+)
+
+# Sections written at once
+DEFAULT_WRITER_WORKERS = 4
+
+# Requested FAQ answer length (characters)
+FAQ_ANSWER_LENGTH = (150, 200)
 
 
 def parse_arguments():
@@ -23,6 +43,9 @@ def parse_arguments():
     parser.add_argument("--structure-file", required=True, help="Phase 3 structure JSON file")
     parser.add_argument("--research-file", required=True, help="Phase 2 research JSON file")
     parser.add_argument("--output-dir", required=True, help="Output directory")
+    parser.add_argument("--source-token-budget", type=int, default=DEFAULT_SECTION_SOURCE_BUDGET,
+                        help="Estimated token budget for research sources in each section prompt")
+    parser.add_argument("--writer-workers", type=int, default=DEFAULT_WRITER_WORKERS, help="Sections written in parallel")
     parser.add_argument("--log-level", default="INFO", help="Logging level")
     return parser.parse_args()
 
@@ -32,18 +55,17 @@ def write_section(
     structure: dict,
     research_data: dict,
     claude: ClaudeAPI,
-    config: Config
+    config: Config,
+    source_index: Optional[SourceIndex] = None,
+    source_token_budget: int = DEFAULT_SECTION_SOURCE_BUDGET
 ) -> dict:
     """Write a single section of the article"""
     
     # Get relevant sources for this section
-    relevant_sources = get_relevant_sources_for_section(
-        section,
-        research_data["source_analysis"]["categorized_sources"]
-    )
-    
-    # Read writing prompt template
-    prompt_template = read_prompt("03_writing")
+    if source_index is None:
+        source_index = build_source_index(research_data)
+    relevant_sources = get_relevant_sources_for_section(section, source_index)
+    packed_sources = pack_sources(relevant_sources, source_token_budget)
     
     # Prepare section context
     section_context = {
@@ -55,14 +77,14 @@ def write_section(
     }
     
     # Format the prompt
-    prompt = prompt_template.format(
+    prompt = WRITING_PROMPT.render(
         section_title=section["h2_title"],
         section_purpose=section["section_purpose"],
         word_count=section["word_count_target"],
         keywords=", ".join(section.get("target_keywords", [])),
         subsections=json.dumps(section.get("subsections", []), ensure_ascii=False, indent=2),
-        relevant_sources=json.dumps(relevant_sources, ensure_ascii=False, indent=2),
-        main_keyword=structure["metadata"].get("main_keyword", ""),
+        relevant_sources=packed_sources["text"],
+        main_keyword=structure.get("metadata", {}).get("main_keyword", ""),
         target_audience=research_data["phase1_params"].get("target_audience", "")
     )
     
@@ -82,7 +104,7 @@ def write_section(
         - Maintain consistent tone throughout""",
         temperature=0.7,
         max_tokens=4000,
-        metadata={"phase": "writing", "section": section["section_id"]}
+        metadata={"phase": "writing", "section": section["section_id"], "prompt_version": WRITING_PROMPT.version}
     )
     
     # Count words and validate
@@ -94,34 +116,87 @@ def write_section(
         "content": content,
         "word_count": word_count,
         "target_word_count": section["word_count_target"],
-        "keywords_used": extract_keywords_from_content(content, section.get("target_keywords", []))
+        "keywords_used": extract_keywords_from_content(content, section.get("target_keywords", [])),
+        "prompt_budget": budget_report(packed_sources)
     }
 
 
-def get_relevant_sources_for_section(section: dict, categorized_sources: dict) -> List[dict]:
-    """Get sources relevant to a specific section"""
-    relevant_sources = []
+class SectionWriter:
+    """Writes main sections on a thread pool as soon as they are known
+    
+    Sections can be submitted while the structure is still being generated
+    (see phase 3's `on_section`); `result` reuses a submitted draft only if
+    the final structure contains exactly the same section.
+    """
+    
+    def __init__(
+        self,
+        research_data: dict,
+        claude: ClaudeAPI,
+        config: Config,
+        source_token_budget: int = DEFAULT_SECTION_SOURCE_BUDGET,
+        max_workers: int = DEFAULT_WRITER_WORKERS,
+        logger=None
+    ):
+        self.research_data = research_data
+        self.claude = claude
+        self.config = config
+        self.source_token_budget = source_token_budget
+        self.logger = logger
+        self.source_index = build_source_index(research_data)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="section-writer")
+        self.drafts: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, section: dict, structure: Optional[dict] = None) -> Future:
+        """Start writing a section (a later submission with the same section_id replaces the draft)"""
+        future = self.executor.submit(
+            bind_context(write_section),
+            section,
+            structure or {},
+            self.research_data,
+            self.claude,
+            self.config,
+            self.source_index,
+            self.source_token_budget
+        )
+        with self._lock:
+            self.drafts[section.get("section_id")] = (section, future)
+        if self.logger is not None:
+            self.logger.info(f"Started writing section: {section.get('h2_title')}")
+        return future
+    
+    def ensure(self, section: dict, structure: dict) -> None:
+        """Submit a section unless a matching draft is already being written"""
+        with self._lock:
+            draft = self.drafts.get(section.get("section_id"))
+        if draft is None or draft[0] != section:
+            self.submit(section, structure)
+    
+    def result(self, section: dict, structure: dict) -> dict:
+        """The written section, rewritten in this thread if its draft failed"""
+        self.ensure(section, structure)
+        with self._lock:
+            _, future = self.drafts[section.get("section_id")]
+        try:
+            return future.result()
+        except Exception as e:
+            if self.logger is not None:
+                self.logger.warning(f"Writing section '{section.get('h2_title')}' failed, retrying: {e}")
+            return write_section(
+                section, structure, self.research_data, self.claude, self.config, self.source_index, self.source_token_budget
+            )
     
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_relevant_sources_for_section(section: dict, source_index: SourceIndex, limit: int = 5) -> List[dict]:
+    """Get the sources most relevant to a specific section"""
     # Keywords to search for in sources
     search_terms = [section["h2_title"]] + section.get("target_keywords", [])
     
-    for category, sources in categorized_sources.items():
-        for source in sources:
-            # Check if source is relevant to this section
-            source_text = f"{source.get('title', '')} {source.get('key_info', '')}".lower()
-            
-            for term in search_terms:
-                if term.lower() in source_text:
-                    relevant_sources.append({
-                        "category": category,
-                        "title": source.get("title"),
-                        "url": source.get("url"),
-                        "key_info": source.get("key_info")
-                    })
-                    break
-    
-    # Limit to most relevant sources
-    return relevant_sources[:5]
+    return source_index.search(search_terms, limit=limit)
 
 
 def write_introduction(structure: dict, research_data: dict, claude: ClaudeAPI) -> str:
@@ -172,17 +247,21 @@ def write_faq_section(structure: dict, research_data: dict, claude: ClaudeAPI) -
         エビデンスソース: {qa.get("evidence_source", "")}
         
         要件:
-        - 150-200文字
+        - {FAQ_ANSWER_LENGTH[0]}-{FAQ_ANSWER_LENGTH[1]}文字
         - 具体的で実用的な回答
         - 信頼性のある情報源に基づく
         """
         
+        metadata = {"phase": "writing", "task": "faq_answer", "section": f"faq_{i}"}
         answer = claude.generate_completion(
             prompt=prompt,
             temperature=0.6,
             max_tokens=500,
-            metadata={"phase": "writing", "section": f"faq_{i}"}
+            metadata=metadata
         )
+        # Quality signal for the model routing stats: did the answer keep to the requested length
+        answer_length = count_japanese_characters(answer)
+        claude.record_quality(metadata, 1.0 if FAQ_ANSWER_LENGTH[0] <= answer_length <= FAQ_ANSWER_LENGTH[1] else 0.0)
         
         faq_content.append(f"\n### Q{i}. {qa['question']}")
         faq_content.append(answer)
@@ -226,156 +305,196 @@ def write_conclusion(structure: dict, article_sections: List[dict], claude: Clau
     )
 
 
-def count_japanese_characters(text: str) -> int:
-    """Count characters in Japanese text (excluding spaces and punctuation)"""
-    # Simple character count - can be enhanced with proper Japanese text processing
-    import re
-    # Remove spaces, newlines, and common punctuation
-    cleaned = re.sub(r'[\s\n。、！？「」『』（）【】〈〉《》・…]', '', text)
-    return len(cleaned)
-
-
 def extract_keywords_from_content(content: str, target_keywords: List[str]) -> Dict[str, int]:
     """Extract and count keyword occurrences in content"""
-    keyword_counts = {}
-    content_lower = content.lower()
-    
-    for keyword in target_keywords:
-        count = content_lower.count(keyword.lower())
-        if count > 0:
-            keyword_counts[keyword] = count
-    
-    return keyword_counts
+    keyword_counts = KeywordIndex(target_keywords).count(content)
+    return {keyword: count for keyword, count in keyword_counts.items() if count > 0}
 
 
 def calculate_keyword_density(content: str, keyword: str) -> float:
     """Calculate keyword density percentage"""
-    word_count = count_japanese_characters(content)
-    if word_count == 0:
+    if not keyword:
         return 0.0
+    return KeywordIndex([keyword]).density(content)[keyword]
+
+
+def analyze_keywords(content: str, structure: dict, analysis: dict, heatmap_buckets: int = 20) -> Dict[str, Any]:
+    """Count main, related and section keywords in one pass over the article"""
+    keywords = [analysis.get("main_keyword", "")]
+    keywords.extend(analysis.get("related_keywords", []))
+    for section in structure.get("main_sections", []):
+        keywords.extend(section.get("target_keywords", []))
+    
+    index = KeywordIndex(keywords)
+    offsets = index.find_all(content)
+    densities = index.density(content, offsets)
+    heatmap = build_density_heatmap(offsets, len(content), heatmap_buckets)
     
-    keyword_count = content.lower().count(keyword.lower())
-    keyword_length = len(keyword)
-    
-    return (keyword_count * keyword_length / word_count) * 100
+    return {
+        keyword: {
+            "count": len(offsets[keyword]),
+            "density": round(densities[keyword], 2),
+            "offsets": offsets[keyword],
+            "heatmap": heatmap[keyword]
+        }
+        for keyword in index.keywords
+    }
 
 
-def main():
-    """Main execution function"""
-    args = parse_arguments()
+def run_writing(
+    structure: dict,
+    research_data: dict,
+    claude: ClaudeAPI,
+    config: Config,
+    output_dir,
+    logger,
+    source_token_budget: int = DEFAULT_SECTION_SOURCE_BUDGET,
+    writer: Optional[SectionWriter] = None,
+    max_workers: int = DEFAULT_WRITER_WORKERS
+) -> Dict[str, Any]:
+    """Write the article, save phase4_article.md and phase4_metadata.json
+    
+    Main sections are written in parallel on `writer` (a new SectionWriter
+    unless one that already started sections is passed in).
+    
+    Returns:
+        {"article": markdown text, "metadata": phase 4 metadata}
+    """
+    logger.info(f"Writing article: {structure['title']}")
     
-    # Setup logging
-    logger = setup_logging("phase4_writing", args.log_level)
-    log_phase_start(logger, "Phase 4: Writing")
+    # Index research sources once for all sections
+    owns_writer = writer is None
+    if owns_writer:
+        writer = SectionWriter(research_data, claude, config, source_token_budget, max_workers)
+    logger.info(f"Indexed {len(writer.source_index)} research sources")
     
     try:
-        # Validate environment
-        validate_environment()
-        
-        # Load configuration
-        config = Config()
-        
-        # Initialize Claude API
-        claude = ClaudeAPI()
-        
-        # Read input data
-        structure = read_json(args.structure_file)
-        research_data = read_json(args.research_file)
-        
-        logger.info(f"Writing article: {structure['title']}")
+        # Start every section not already being written, then write the introduction meanwhile
+        for section in structure["main_sections"]:
+            writer.ensure(section, structure)
         
-        # Write introduction
         logger.info("Writing introduction...")
         introduction = write_introduction(structure, research_data, claude)
         
-        # Write main sections
+        # Collect main sections in order
         article_sections = []
         total_word_count = count_japanese_characters(introduction)
         
         for i, section in enumerate(structure["main_sections"], 1):
-            logger.info(f"Writing section {i}/{len(structure['main_sections'])}: {section['h2_title']}")
-            
-            section_result = write_section(
-                section,
-                structure,
-                research_data,
-                claude,
-                config
-            )
-            
+            section_result = writer.result(section, structure)
+            logger.info(f"Wrote section {i}/{len(structure['main_sections'])}: {section['h2_title']}")
             article_sections.append(section_result)
             total_word_count += section_result["word_count"]
             
             # Log progress
             log_metric(logger, f"section_{i}_words", section_result["word_count"])
-        
-        # Write FAQ section
-        logger.info("Writing FAQ section...")
-        faq_content = write_faq_section(structure, research_data, claude)
-        total_word_count += count_japanese_characters(faq_content)
-        
-        # Write conclusion
-        logger.info("Writing conclusion...")
-        conclusion = write_conclusion(structure, article_sections, claude)
-        total_word_count += count_japanese_characters(conclusion)
-        
-        # Assemble full article
-        article_parts = [
-            f"# {structure['title']}",
-            "",
-            introduction,
-            ""
-        ]
-        
-        for section in article_sections:
-            article_parts.extend([
-                f"## {section['title']}",
-                "",
-                section['content'],
-                ""
-            ])
-        
+            if section_result["prompt_budget"]["dropped"]:
+                logger.info(f"Section {i}: dropped {len(section_result['prompt_budget']['dropped'])} sources over the prompt budget")
+    finally:
+        if owns_writer:
+            writer.shutdown()
+    
+    # Write FAQ section
+    logger.info("Writing FAQ section...")
+    faq_content = write_faq_section(structure, research_data, claude)
+    total_word_count += count_japanese_characters(faq_content)
+    
+    # Write conclusion
+    logger.info("Writing conclusion...")
+    conclusion = write_conclusion(structure, article_sections, claude)
+    total_word_count += count_japanese_characters(conclusion)
+    
+    # Assemble full article
+    article_parts = [
+        f"# {structure['title']}",
+        "",
+        introduction,
+        ""
+    ]
+    
+    for section in article_sections:
         article_parts.extend([
-            faq_content,
+            f"## {section['title']}",
             "",
-            "## まとめ",
-            "",
-            conclusion
+            section['content'],
+            ""
         ])
+    
+    article_parts.extend([
+        faq_content,
+        "",
+        "## まとめ",
+        "",
+        conclusion
+    ])
+    
+    full_article = "\n".join(article_parts)
+    
+    # Calculate final metrics
+    analysis = research_data["phase1_params"]["analysis"]
+    main_keyword = analysis["main_keyword"]
+    keyword_analysis = analyze_keywords(full_article, structure, analysis)
+    keyword_density = keyword_analysis.get(main_keyword, {}).get("density", 0.0)
+    
+    # Save outputs
+    output_file = Path(output_dir) / "phase4_article.md"
+    write_text(full_article, output_file)
+    
+    # Save metadata
+    metadata = {
+        "title": structure["title"],
+        "total_word_count": total_word_count,
+        "target_word_count": int(research_data["phase1_params"].get("word_count", 3200)),
+        "main_keyword": main_keyword,
+        "keyword_density": round(keyword_density, 2),
+        "keyword_analysis": keyword_analysis,
+        "sections": article_sections,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    
+    metadata_file = Path(output_dir) / "phase4_metadata.json"
+    write_json(metadata, metadata_file)
+    
+    # Log final metrics
+    log_metric(logger, "total_words", total_word_count)
+    log_metric(logger, "keyword_density", keyword_density, "%")
+    
+    # Check word count
+    if abs(total_word_count - 3200) > 300:
+        logger.warning(f"Word count {total_word_count} is outside target range (3200±300)")
+    
+    logger.info(f"Article writing completed: {total_word_count} characters")
+    
+    return {"article": full_article, "metadata": metadata}
+
+
+def main():
+    """Main execution function"""
+    args = parse_arguments()
+    
+    # Setup logging
+    logger = setup_logging("phase4_writing", args.log_level)
+    log_phase_start(logger, "Phase 4: Writing")
+    
+    try:
+        # Validate environment
+        validate_environment()
+        validate_prompts([WRITING_PROMPT.name])
         
-        full_article = "\n".join(article_parts)
-        
-        # Calculate final metrics
-        main_keyword = research_data["phase1_params"]["analysis"]["main_keyword"]
-        keyword_density = calculate_keyword_density(full_article, main_keyword)
-        
-        # Save outputs
-        output_file = Path(args.output_dir) / "phase4_article.md"
-        write_text(full_article, output_file)
-        
-        # Save metadata
-        metadata = {
-            "title": structure["title"],
-            "total_word_count": total_word_count,
-            "target_word_count": int(research_data["phase1_params"].get("word_count", 3200)),
-            "main_keyword": main_keyword,
-            "keyword_density": round(keyword_density, 2),
-            "sections": article_sections,
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        metadata_file = Path(args.output_dir) / "phase4_metadata.json"
-        write_json(metadata, metadata_file)
+        # Load configuration
+        config = Config()
         
-        # Log final metrics
-        log_metric(logger, "total_words", total_word_count)
-        log_metric(logger, "keyword_density", keyword_density, "%")
+        # Initialize Claude API
+        claude = ClaudeAPI()
         
-        # Check word count
-        if abs(total_word_count - 3200) > 300:
-            logger.warning(f"Word count {total_word_count} is outside target range (3200±300)")
+        # Read input data
+        structure = read_artifact(args.structure_file, StructureArtifact)
+        research_data = read_artifact(args.research_file, ResearchArtifact)
         
-        logger.info(f"Article writing completed: {total_word_count} characters")
+        run_writing(
+            structure, research_data, claude, config, args.output_dir, logger, args.source_token_budget,
+            max_workers=args.writer_workers
+        )
         
         log_phase_end(logger, "Phase 4: Writing", success=True)
         
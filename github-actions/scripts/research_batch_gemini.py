@@ -4,12 +4,18 @@
 import os
 import sys
 import json
-import time
 import traceback
+from pathlib import Path
 from google import genai
 from google.genai import types
 from datetime import datetime
 
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.research_cache import ResearchCache
+from utils.research_engine import ResearchEngine
+from utils.research_providers import GeminiSdkProvider
+
 def test_api_connection(client):
     """Test the API connection with a simple query"""
     print("\n🧪 Testing API connection...")
@@ -53,6 +59,24 @@ def test_api_connection(client):
         print(f"Traceback:\n{traceback.format_exc()}")
         return False
 
+def hedge_options(client) -> dict:
+    """Opt-in hedging configured through the environment
+    
+    RESEARCH_HEDGE_MODEL   second Gemini model that receives duplicates of slow queries
+    RESEARCH_HEDGE_AFTER   seconds before hedging until enough latencies are observed (default 20)
+    RESEARCH_HEDGE_BUDGET  hedged spend as a fraction of the batch's primary spend (default 0.1)
+    """
+    hedge_model = os.environ.get('RESEARCH_HEDGE_MODEL')
+    if not hedge_model:
+        return {}
+    
+    print(f"🪁 Hedging slow queries to {hedge_model}")
+    return {
+        'hedge_providers': [GeminiSdkProvider(client=client, model=hedge_model)],
+        'hedge_after': float(os.environ.get('RESEARCH_HEDGE_AFTER', 20)),
+        'hedge_budget': float(os.environ.get('RESEARCH_HEDGE_BUDGET', 0.1))
+    }
+
 def main():
     if len(sys.argv) != 2:
         print("Usage: python3 research_batch_gemini.py <batch_number>")
@@ -91,197 +115,27 @@ def main():
     
     print(f"🔍 Starting batch {batch_num} with {len(queries)} queries...")
     
-    for i, query in enumerate(queries):
-        print(f"Searching batch {batch_num} ({i+1}/{len(queries)}): {query}")
-        
-        # Add delay between requests to avoid rate limiting
-        if i > 0:
-            delay = 8  # 8 seconds as suggested by the API error
-            print(f"⏱️ Waiting {delay} seconds to avoid rate limit...")
-            time.sleep(delay)
-        
-        prompt = f"""
-Web検索を実行: "{query}"
-
-重要な指示：
-- 実際のウェブサイトのURL（ドメイン名を含む）を提供してください
-- リダイレクトURLではなく、元のソースのURLを記載してください
-- 一次情報（政府機関、学術機関）を最優先してください
-
-優先順位：
-1. 政府機関（.go.jp, .gov） - 厚生労働省、消費者庁、政府データベース等
-2. 学術機関（.ac.jp, .edu） - 大学、研究機関、学術論文等  
-3. 医学会・専門団体 - 日本皮膚科学会、医師会等
-4. 大手メディア - 信頼できる健康メディア
-
-以下の形式でJSONで返してください：
-{{
-  "query": "{query}",
-  "results": [
-    {{
-      "url": "実際のウェブサイトURL（例: https://www.mhlw.go.jp/...）",
-      "domain": "ドメイン名（例: mhlw.go.jp）",
-      "title": "タイトル", 
-      "source_type": "government/academic/medical/industry/media",
-      "reliability_score": 1-10,
-      "key_findings": ["重要な発見、具体的なデータや統計を含む"],
-      "publication_date": "YYYY-MM-DD",
-      "author": "著者名や組織名（わかる場合）"
-    }}
-  ]
-}}
-
-注意：
-- vertexaisearch.cloud.google.comのリダイレクトURLは使用しないでください
-- 実際の情報源のURLを提供してください
-- 政府・学術機関の情報を優先的に検索してください
-"""
-        
-        try:
-            # Define the grounding tool
-            grounding_tool = types.Tool(
-                google_search=types.GoogleSearch()
-            )
-            
-            # Configure generation settings
-            config = types.GenerateContentConfig(
-                tools=[grounding_tool],
-                temperature=1.0,
-                max_output_tokens=8192  # Increased to handle full JSON responses
-            )
-            
-            # Make the request
-            response = client.models.generate_content(
-                model=model_name,
-                contents=prompt,
-                config=config
-            )
-            
-            # Debug: Print raw response
-            print(f"\n=== DEBUG: Raw response for query '{query}' ===")
-            print(f"Response object: {response}")
-            print(f"Response type: {type(response)}")
-            
-            # Check if response has candidates
-            if hasattr(response, 'candidates') and response.candidates:
-                print(f"Number of candidates: {len(response.candidates)}")
-                for idx, candidate in enumerate(response.candidates):
-                    print(f"Candidate {idx}: {candidate}")
-                    if hasattr(candidate, 'content'):
-                        print(f"Candidate {idx} content: {candidate.content}")
-            
-            try:
-                text = response.text
-                print(f"Response text length: {len(text) if text else 'None'}")
-                print(f"Raw response text:\n{text[:500]}..." if text and len(text) > 500 else f"Raw response text:\n{text}")
-            except AttributeError as attr_error:
-                print(f"❌ Response has no 'text' attribute: {attr_error}")
-                print(f"Response attributes: {dir(response)}")
-                
-                # Try alternative ways to get content
-                if hasattr(response, 'candidates') and response.candidates:
-                    for candidate in response.candidates:
-                        if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                            for part in candidate.content.parts:
-                                if hasattr(part, 'text'):
-                                    text = part.text
-                                    print(f"Found text in candidate part: {text[:200]}...")
-                                    break
-                            if 'text' in locals():
-                                break
-                    else:
-                        raise ValueError("Could not extract text from response candidates")
-                else:
-                    raise
-            except Exception as text_error:
-                print(f"❌ Error accessing response content: {text_error}")
-                print(f"Response type: {type(response)}")
-                print(f"Response attributes: {dir(response)}")
-                raise
-            
-            # Try to extract JSON from response
-            # Check if JSON is inside a markdown code block
-            if '```json' in text:
-                # Extract JSON from markdown code block
-                json_block_start = text.find('```json') + 7  # Skip ```json
-                json_block_end = text.find('```', json_block_start)
-                if json_block_start > 6 and json_block_end > json_block_start:
-                    text = text[json_block_start:json_block_end].strip()
-            
-            json_start = text.find('{')
-            json_end = text.rfind('}') + 1
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = text[json_start:json_end]
-                print(f"\n=== DEBUG: Extracted JSON string ===")
-                print(f"JSON length: {len(json_str)}")
-                print(f"First 200 chars: {json_str[:200]}...")
-                
-                try:
-                    result = json.loads(json_str)
-                    results.append(result)
-                    print(f"✅ Successfully parsed JSON for query: {query}")
-                except json.JSONDecodeError as json_error:
-                    print(f"❌ JSON decode error: {json_error}")
-                    print(f"JSON string that failed: {json_str}")
-                    print(f"Error position: line {json_error.lineno}, column {json_error.colno}")
-                    
-                    # Create fallback result with raw text
-                    fallback_result = {
-                        "query": query,
-                        "results": [{
-                            "url": "error://json-parse-failed",
-                            "title": "JSON Parse Error",
-                            "source_type": "error",
-                            "reliability_score": 0,
-                            "key_findings": [f"Failed to parse response: {str(json_error)}"],
-                            "raw_response": text[:1000] if len(text) > 1000 else text,
-                            "publication_date": datetime.now().strftime("%Y-%m-%d")
-                        }]
-                    }
-                    results.append(fallback_result)
-            else:
-                print(f"⚠️ No valid JSON structure found in response")
-                print(f"JSON start position: {json_start}")
-                print(f"JSON end position: {json_end}")
-                print(f"Full response text:\n{text}")
-                
-                # Create fallback result for no JSON
-                fallback_result = {
-                    "query": query,
-                    "results": [{
-                        "url": "error://no-json-found",
-                        "title": "No JSON Found",
-                        "source_type": "error",
-                        "reliability_score": 0,
-                        "key_findings": ["No JSON structure found in response"],
-                        "raw_response": text[:1000] if len(text) > 1000 else text,
-                        "publication_date": datetime.now().strftime("%Y-%m-%d")
-                    }]
-                }
-                results.append(fallback_result)
-                
-        except Exception as e:
-            print(f"\n❌ Error searching '{query}':")
-            print(f"Error type: {type(e).__name__}")
-            print(f"Error message: {str(e)}")
-            
-            # Check if it's a rate limit error
-            if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
-                print("⚠️ Rate limit exceeded. Consider:")
-                print("   1. Using a model with higher quota")
-                print("   2. Reducing parallel execution")
-                print("   3. Adding longer delays between requests")
-                
-                # Try to extract retry delay from error
-                if "retryDelay" in str(e):
-                    import re
-                    match = re.search(r"retryDelay.*?(\d+)s", str(e))
-                    if match:
-                        retry_delay = int(match.group(1))
-                        print(f"   Suggested retry delay: {retry_delay} seconds")
-            
-            print(f"Full traceback:\n{traceback.format_exc()}")
+    # The provider's quota replaces the fixed 8 second sleep: requests start as
+    # soon as the rate limit allows and failed queries are retried
+    provider = GeminiSdkProvider(client=client, model=model_name)
+    engine = ResearchEngine([provider], cache=ResearchCache(), **hedge_options(client))
+    
+    def report(record):
+        if "error" in record:
+            print(f"❌ Error searching '{record['query']}' after {record.get('attempts')} attempts: {record['error']}")
+            if "429" in record['error'] or "RESOURCE_EXHAUSTED" in record['error']:
+                print("⚠️ Rate limit exceeded. Consider reducing parallel execution or using a model with higher quota")
+        elif record.get('cached'):
+            print(f"♻️ Cache hit: {record['query']}")
+        else:
+            print(f"✅ Successfully parsed JSON for query: {record['query']} ({record['result_count']} results)")
+    
+    # Failed queries keep an error record so batch consumers still see them
+    for record in engine.run_sync(queries, on_result=report):
+        if "error" in record:
+            results.append({"query": record["query"], "error": record["error"]})
+        else:
+            results.append({"query": record["query"], "results": record["results"]})
     
     # バッチ結果を保存
     os.makedirs(f'batch_{batch_num}', exist_ok=True)
@@ -292,13 +146,15 @@ Web検索を実行: "{query}"
         'key_findings': [finding for r in results for result in r.get('results', []) for finding in result.get('key_findings', [])],
         'timestamp': datetime.now().isoformat(),
         'total_queries': len(queries),
-        'successful_queries': len(results)
+        'successful_queries': len(results),
+        'providers': engine.stats()
     }
     
     with open(f'batch_{batch_num}/phase2_research.json', 'w') as f:
         json.dump(output_data, f, ensure_ascii=False, indent=2)
     
-    print(f"✅ Batch {batch_num} completed: {len(results)}/{len(queries)} successful")
+    failed = sum(1 for r in results if "error" in r)
+    print(f"✅ Batch {batch_num} completed: {len(results) - failed}/{len(queries)} successful, {failed} failed")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,9 +4,16 @@
 import os
 import sys
 import json
-import google.generativeai as genai
 from datetime import datetime
-import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.research_cache import ResearchCache
+from utils.research_engine import ResearchEngine
+from utils.research_providers import GeminiTextProvider
+
+MODEL_NAME = 'gemini-2.0-flash-exp'
 
 def main():
     print("🔍 Starting V4 simple research process...")
@@ -17,8 +24,7 @@ def main():
         print("❌ ERROR: GEMINI_API_KEY not found")
         sys.exit(1)
     
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.0-flash-exp')
+    provider = GeminiTextProvider(api_key=api_key, model=MODEL_NAME)
     
     # Load phase1 analysis
     try:
@@ -58,56 +64,32 @@ def main():
     search_results = []
     successful_searches = 0
     
-    for i, query in enumerate(queries):
-        print(f"🔍 Searching ({i+1}/{len(queries)}): {query}")
+    # Rate limiting (formerly a 3 second sleep per query) is handled by the provider quota
+    engine = ResearchEngine([provider], cache=ResearchCache())
+    
+    for record in engine.run_sync(queries):
+        query = record["query"]
+        content = record["results"][0].get("content", "") if record["results"] else ""
         
-        try:
-            # Use updated Gemini API syntax
-            response = model.generate_content(
-                query,
-                tools=['google_search'],
-                generation_config=genai.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=2048
-                )
-            )
-            
-            # Process the response
-            content = response.text if response.text else ""
-            
-            if content:
-                print(f"✅ Got response for '{query}': {len(content)} chars")
-                successful_searches += 1
-                
-                search_results.append({
-                    "query": query,
-                    "results": [content],
-                    "content": content,
-                    "success": True,
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-            else:
-                print(f"⚠️ Empty response for '{query}'")
-                search_results.append({
-                    "query": query,
-                    "results": [],
-                    "content": "",
-                    "success": False,
-                    "error": "Empty response",
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-            
-            # Add delay to avoid rate limiting (V2 style)
-            time.sleep(3)
-            
-        except Exception as e:
-            print(f"❌ Error searching '{query}': {e}")
+        if "error" not in record and content:
+            print(f"✅ Got response for '{query}': {len(content)} chars")
+            successful_searches += 1
+            search_results.append({
+                "query": query,
+                "results": [content],
+                "content": content,
+                "success": True,
+                "cached": record.get("cached", False),
+                "timestamp": datetime.utcnow().isoformat()
+            })
+        else:
+            print(f"❌ Error searching '{query}': {record.get('error', 'Empty response')}")
             search_results.append({
                 "query": query,
                 "results": [],
                 "content": "",
                 "success": False,
-                "error": str(e),
+                "error": record.get("error", "Empty response"),
                 "timestamp": datetime.utcnow().isoformat()
             })
     
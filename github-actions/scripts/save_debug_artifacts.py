@@ -2,6 +2,11 @@
 """
 Debug Artifacts Saver
 デバッグ用アーティファクト保存スクリプト
+
+HTML snapshots go to `debug_artifacts/html_snapshots/`, stored as a base plus
+compressed line deltas against the previous step (see utils.snapshot_store);
+`reconstruct` writes any snapshot back out as a file. `cleanup` keeps the
+debug directory under a size budget by removing the oldest artifacts first.
 """
 
 import os
@@ -9,8 +14,19 @@ import sys
 import shutil
 import json
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Optional
 
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.snapshot_store import SnapshotStore
+
+SNAPSHOT_DIR_NAME = "html_snapshots"
+
+# Default size budget for debug_artifacts/ enforced by cleanup
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
 class DebugArtifactsSaver:
     """デバッグアーティファクト保存クラス"""
     
@@ -18,6 +34,7 @@ class DebugArtifactsSaver:
         self.article_id = article_id
         self.article_dir = f"output/{article_id}"
         self.debug_dir = f"output/{article_id}/debug_artifacts"
+        self.snapshot_dir = f"{self.debug_dir}/{SNAPSHOT_DIR_NAME}"
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # デバッグディレクトリ作成
@@ -25,6 +42,9 @@ class DebugArtifactsSaver:
         
         print(f"🔍 Debug artifacts will be saved to: {self.debug_dir}")
     
+    def _snapshot_store(self) -> SnapshotStore:
+        return SnapshotStore(self.snapshot_dir)
+    
     def save_html_snapshot(self, step_name: str, description: str = "") -> bool:
         """HTML状態のスナップショット保存"""
         html_file = f"{self.article_dir}/final_article.html"
@@ -34,30 +54,20 @@ class DebugArtifactsSaver:
             return False
         
         try:
-            # スナップショットファイル名生成
             safe_step_name = step_name.lower().replace(" ", "_").replace("-", "_")
-            snapshot_file = f"{self.debug_dir}/html_snapshot_{safe_step_name}_{self.timestamp}.html"
-            
-            # HTMLファイルをコピー
-            shutil.copy2(html_file, snapshot_file)
+            with open(html_file, 'r', encoding='utf-8', newline='') as f:
+                html_content = f.read()
             
-            # メタデータファイル作成
-            metadata = {
-                "step_name": step_name,
+            # 前のスナップショットとの差分として保存（メタデータはindex.jsonに記録）
+            entry = self._snapshot_store().add(html_content, step_name, {
+                "safe_step_name": safe_step_name,
                 "description": description,
                 "timestamp": self.timestamp,
-                "original_file": html_file,
-                "snapshot_file": snapshot_file,
-                "file_size": os.path.getsize(snapshot_file),
-                "created_at": datetime.now().isoformat()
-            }
-            
-            metadata_file = f"{snapshot_file}.meta.json"
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+                "original_file": html_file
+            })
             
-            print(f"📸 HTML snapshot saved: {os.path.basename(snapshot_file)}")
-            print(f"📝 Metadata saved: {os.path.basename(metadata_file)}")
+            print(f"📸 HTML snapshot #{entry['id']} saved ({entry['kind']}): "
+                  f"{entry['stored_bytes']} bytes stored for {entry['size']} bytes of HTML")
             
             return True
             
@@ -194,7 +204,7 @@ Status: {'SUCCESS' if exit_code == 0 else 'FAILED'}
             # デバッグディレクトリ内のファイル一覧
             debug_files = []
             for file in os.listdir(self.debug_dir):
-                if file != os.path.basename(summary_file):
+                if file != os.path.basename(summary_file) and os.path.isfile(os.path.join(self.debug_dir, file)):
                     file_path = os.path.join(self.debug_dir, file)
                     file_info = {
                         "filename": file,
@@ -213,8 +223,9 @@ Status: {'SUCCESS' if exit_code == 0 else 'FAILED'}
                 "debug_files": debug_files,
                 "file_types": self._categorize_files(debug_files),
                 "total_size_bytes": sum(f["size"] for f in debug_files),
+                "html_snapshots": self._snapshot_store().summary() if os.path.exists(self.snapshot_dir) else None,
                 "instructions": {
-                    "html_snapshots": "Check *.html files for HTML content at different processing stages",
+                    "html_snapshots": "List with the 'snapshots' action and restore HTML at any processing stage with 'reconstruct <id|step_name>'",
                     "processing_logs": "Check *.log files for detailed processing information",
                     "script_outputs": "Check *_output*.json files for individual script execution results",
                     "validation_details": "Check *_details*.json files for validation specifics",
@@ -235,31 +246,89 @@ Status: {'SUCCESS' if exit_code == 0 else 'FAILED'}
             print(f"❌ Failed to create debug summary: {e}")
             return False
     
-    def cleanup_old_artifacts(self, keep_days: int = 7) -> bool:
-        """古いアーティファクトのクリーンアップ"""
+    def reconstruct_snapshot(self, snapshot_ref: str, output_file: Optional[str] = None) -> bool:
+        """スナップショット（IDまたはステップ名）をHTMLファイルとして復元"""
+        try:
+            store = self._snapshot_store()
+            entry = store.find(snapshot_ref)
+            if output_file is None:
+                output_file = f"{self.article_dir}/snapshot_{entry['id']}_{entry.get('safe_step_name', 'step')}.html"
+            
+            with open(output_file, 'w', encoding='utf-8', newline='') as f:
+                f.write(store.text(entry["id"]))
+            
+            print(f"🧩 Snapshot #{entry['id']} ({entry['step_name']}) reconstructed: {output_file}")
+            return True
+        
+        except Exception as e:
+            print(f"❌ Failed to reconstruct snapshot {snapshot_ref}: {e}")
+            return False
+    
+    def list_snapshots(self) -> bool:
+        """保存済みスナップショットの一覧表示"""
+        store = self._snapshot_store()
+        for entry in store.snapshots:
+            print(f"  #{entry['id']:<3} {entry['kind']:<5} {entry['stored_bytes']:>8} / {entry['size']:>8} bytes  "
+                  f"{entry['step_name']}  {entry.get('description', '')}")
+        summary = store.summary()
+        print(f"📸 {summary['snapshots']} snapshots: {summary['stored_bytes']} bytes stored "
+              f"for {summary['logical_bytes']} bytes of HTML")
+        return True
+    
+    def cleanup_old_artifacts(self, keep_days: Optional[int] = 7, max_bytes: int = DEFAULT_MAX_BYTES) -> bool:
+        """古いアーティファクトのクリーンアップ（期限切れを削除し、容量上限まで古い順に削除）"""
         try:
             if not os.path.exists(self.debug_dir):
                 return True
-                
-            cutoff_time = datetime.now().timestamp() - (keep_days * 24 * 60 * 60)
-            cleaned_count = 0
             
-            for file in os.listdir(self.debug_dir):
-                file_path = os.path.join(self.debug_dir, file)
+            store = self._snapshot_store() if os.path.exists(self.snapshot_dir) else None
+            
+            # スナップショット以外のファイル（errors/ を含む）を古い順に
+            files = []
+            for root, dirs, names in os.walk(self.debug_dir):
+                dirs[:] = [d for d in dirs if os.path.join(root, d) != self.snapshot_dir]
+                for name in names:
+                    file_path = os.path.join(root, name)
+                    files.append((os.path.getmtime(file_path), file_path, os.path.getsize(file_path)))
+            files.sort()
+            
+            cutoff_time = datetime.now().timestamp() - (keep_days * 24 * 60 * 60) if keep_days is not None else None
+            total_bytes = sum(size for _, _, size in files) + (store.disk_usage() if store else 0)
+            cleaned_count = 0
+            dropped_snapshots = 0
+            
+            while files or (store and len(store.snapshots) > 1):
+                oldest_file_time = files[0][0] if files else None
+                oldest_snapshot_time = (
+                    datetime.fromisoformat(store.snapshots[0]["created_at"]).timestamp()
+                    if store and len(store.snapshots) > 1 else None
+                )
+                # 最も古いアーティファクトが期限内かつ容量内なら終了（最新のスナップショットは常に残す）
+                oldest_time = min(t for t in (oldest_file_time, oldest_snapshot_time) if t is not None)
+                expired = cutoff_time is not None and oldest_time < cutoff_time
+                if not expired and total_bytes <= max_bytes:
+                    break
                 
-                if os.path.isfile(file_path):
-                    file_mtime = os.path.getmtime(file_path)
-                    if file_mtime < cutoff_time:
-                        try:
-                            os.remove(file_path)
-                            cleaned_count += 1
-                        except Exception as e:
-                            print(f"⚠️  Failed to remove old file {file}: {e}")
-            
-            if cleaned_count > 0:
-                print(f"🧹 Cleaned up {cleaned_count} old debug artifacts (older than {keep_days} days)")
+                if oldest_snapshot_time is None or (oldest_file_time is not None and oldest_file_time <= oldest_snapshot_time):
+                    _, file_path, size = files.pop(0)
+                    try:
+                        os.remove(file_path)
+                        cleaned_count += 1
+                        total_bytes -= size
+                    except Exception as e:
+                        print(f"⚠️  Failed to remove old file {file_path}: {e}")
+                else:
+                    before = store.disk_usage()
+                    store.drop_oldest()
+                    total_bytes -= before - store.disk_usage()
+                    dropped_snapshots += 1
+            
+            if cleaned_count or dropped_snapshots:
+                print(f"🧹 Cleaned up {cleaned_count} debug artifacts and {dropped_snapshots} HTML snapshots "
+                      f"(older than {keep_days} days or over {max_bytes} bytes)")
             else:
                 print(f"✅ No old debug artifacts to clean up")
+            print(f"💾 Debug artifacts size: {total_bytes} bytes (budget {max_bytes} bytes)")
             
             return True
             
@@ -337,7 +406,9 @@ def main():
         print("  script <script_name> <stdout_file>  - Save script output")
         print("  validation <results_file> [type]   - Save validation details")
         print("  summary                             - Create debug summary")
-        print("  cleanup [days]                      - Cleanup old artifacts (default: 7 days)")
+        print("  snapshots                           - List HTML snapshots")
+        print("  reconstruct <id|step_name> [output] - Restore an HTML snapshot to a file")
+        print("  cleanup [days] [max_mb]             - Cleanup old artifacts (default: 7 days, 10 MB)")
         sys.exit(1)
     
     article_id = sys.argv[1]
@@ -390,9 +461,20 @@ def main():
         elif action == "summary":
             success = saver.create_debug_summary()
             
+        elif action == "snapshots":
+            success = saver.list_snapshots()
+        
+        elif action == "reconstruct":
+            if len(sys.argv) < 4:
+                print("❌ reconstruct needs a snapshot id or step name")
+                sys.exit(1)
+            output_file = sys.argv[4] if len(sys.argv) > 4 else None
+            success = saver.reconstruct_snapshot(sys.argv[3], output_file)
+        
         elif action == "cleanup":
             keep_days = int(sys.argv[3]) if len(sys.argv) > 3 else 7
-            success = saver.cleanup_old_artifacts(keep_days)
+            max_bytes = int(float(sys.argv[4]) * 1024 * 1024) if len(sys.argv) > 4 else DEFAULT_MAX_BYTES
+            success = saver.cleanup_old_artifacts(keep_days, max_bytes)
             
         else:
             print(f"❌ Unknown action: {action}")
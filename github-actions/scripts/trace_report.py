@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Trace report - Render an article_flow trace file as a timeline
+トレースファイル（OTLP/JSON）をタイムライン表示・Chromeトレース形式に変換する
+
+    python scripts/trace_report.py trace.json
+    python scripts/trace_report.py trace.json --chrome trace_chrome.json
+
+Traces are written by `article_flow.py --trace FILE` or, for the workflow's
+separate phase scripts, by setting ARTICLE_FLOW_TRACE=FILE. The Chrome file
+opens in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from typing import Dict, List, Any, Optional
+
+BAR_WIDTH = 50
+
+
+def _attribute_value(value: Dict[str, Any]) -> Any:
+    """Decode an OTLP AnyValue"""
+    if "stringValue" in value:
+        return value["stringValue"]
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return value["doubleValue"]
+    if "boolValue" in value:
+        return value["boolValue"]
+    if "arrayValue" in value:
+        return [_attribute_value(item) for item in value["arrayValue"].get("values", [])]
+    return None
+
+
+def load_spans(trace_file: str) -> List[Dict[str, Any]]:
+    """Flatten every resource's spans into dicts with times in seconds"""
+    with open(trace_file, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    
+    spans = []
+    for resource_index, resource_spans in enumerate(document.get("resourceSpans", [])):
+        resource = {
+            attribute["key"]: _attribute_value(attribute["value"])
+            for attribute in resource_spans.get("resource", {}).get("attributes", [])
+        }
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                spans.append({
+                    "trace_id": span["traceId"],
+                    "span_id": span["spanId"],
+                    "parent_id": span.get("parentSpanId") or None,
+                    "name": span["name"],
+                    "start": int(span["startTimeUnixNano"]) / 1e9,
+                    "end": int(span["endTimeUnixNano"]) / 1e9,
+                    "attributes": {
+                        attribute["key"]: _attribute_value(attribute["value"])
+                        for attribute in span.get("attributes", [])
+                    },
+                    "error": span.get("status", {}).get("code") == 2,
+                    "status_message": span.get("status", {}).get("message", ""),
+                    "process": resource.get("process.command") or f"process {resource_index}",
+                    "pid": resource.get("process.pid", resource_index)
+                })
+    return spans
+
+
+def build_tree(spans: List[Dict[str, Any]]) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    """Children by parent span id; spans whose parent is missing become roots"""
+    known = {span["span_id"] for span in spans}
+    children = defaultdict(list)
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in known else None
+        children[parent].append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span["start"])
+    return children
+
+
+def span_label(span: Dict[str, Any]) -> str:
+    """Name plus the most telling attribute"""
+    attributes = span["attributes"]
+    for key in ("article.id", "article.topic", "research.query", "image.type", "file.name", "article_flow.phase"):
+        if attributes.get(key):
+            return f"{span['name']} [{attributes[key]}]"
+    return span["name"]
+
+
+def render_timeline(
+    children: Dict[Optional[str], List[Dict[str, Any]]],
+    start: float,
+    total: float,
+    min_duration: float,
+    max_children: int
+) -> List[str]:
+    """Indented span tree with a bar showing when each span ran"""
+    lines = []
+    
+    def bar(span: Dict[str, Any]) -> str:
+        scale = BAR_WIDTH / total if total else 0
+        offset = int((span["start"] - start) * scale)
+        length = max(1, int((span["end"] - span["start"]) * scale))
+        return (" " * offset + "█" * length)[:BAR_WIDTH].ljust(BAR_WIDTH)
+    
+    def visit(span: Dict[str, Any], depth: int) -> None:
+        duration = span["end"] - span["start"]
+        marker = "❌" if span["error"] else "  "
+        lines.append(f"{marker} {bar(span)} {duration:>8.2f}s {'  ' * depth}{span_label(span)}")
+        
+        all_children = children.get(span["span_id"], [])
+        shown = [child for child in all_children if child["end"] - child["start"] >= min_duration][:max_children]
+        shown_ids = {child["span_id"] for child in shown}
+        hidden = [child for child in all_children if child["span_id"] not in shown_ids]
+        for child in shown:
+            visit(child, depth + 1)
+        if hidden:
+            counts = defaultdict(lambda: [0, 0.0])
+            for child in hidden:
+                counts[child["name"]][0] += 1
+                counts[child["name"]][1] += child["end"] - child["start"]
+            summary = ", ".join(f"{count} {name} ({seconds:.2f}s)" for name, (count, seconds) in counts.items())
+            lines.append(f"   {' ' * BAR_WIDTH} {'':>9} {'  ' * (depth + 1)}… {summary}")
+    
+    for root in children.get(None, []):
+        visit(root, 0)
+    return lines
+
+
+def summarize(spans: List[Dict[str, Any]], children: Dict[Optional[str], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Per span name: count, total time and self time (time not covered by child spans)"""
+    totals = defaultdict(lambda: {"count": 0, "total": 0.0, "self": 0.0, "errors": 0})
+    for span in spans:
+        duration = span["end"] - span["start"]
+        # Children may overlap (concurrent searches), so subtract their union rather than their sum
+        covered = 0.0
+        cursor = span["start"]
+        for child in sorted(children.get(span["span_id"], []), key=lambda child: child["start"]):
+            child_start, child_end = max(child["start"], cursor), min(child["end"], span["end"])
+            if child_end > child_start:
+                covered += child_end - child_start
+                cursor = child_end
+        entry = totals[span["name"]]
+        entry["count"] += 1
+        entry["total"] += duration
+        entry["self"] += max(0.0, duration - covered)
+        entry["errors"] += int(span["error"])
+    
+    return sorted(
+        ({"name": name, **values} for name, values in totals.items()),
+        key=lambda entry: entry["self"],
+        reverse=True
+    )
+
+
+def to_chrome_trace(spans: List[Dict[str, Any]], children: Dict[Optional[str], List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Chrome trace events: one process per trace (article), one row per thread
+    
+    Concurrent asyncio spans share a thread but don't nest, so they are spread
+    over extra rows wherever they would overlap.
+    """
+    origin = min(span["start"] for span in spans)
+    roots = {}
+    for root in children.get(None, []):
+        roots.setdefault(root["trace_id"], root)
+    process_ids = {trace_id: index + 1 for index, trace_id in enumerate(roots)}
+    
+    events = []
+    for trace_id, pid in process_ids.items():
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": span_label(roots[trace_id])}})
+    
+    lanes: Dict[tuple, List[List[float]]] = defaultdict(list)
+    row_ids: Dict[tuple, int] = {}
+    for span in sorted(spans, key=lambda span: (span["start"], -(span["end"] - span["start"]))):
+        pid = process_ids.get(span["trace_id"], 0)
+        thread = span["attributes"].get("thread.id", 0)
+        stacks = lanes[(pid, thread)]
+        # Each lane is a stack of end times; a span fits where it nests inside the open span
+        for lane, stack in enumerate(stacks):
+            while stack and stack[-1] <= span["start"]:
+                stack.pop()
+            if not stack or span["end"] <= stack[-1]:
+                stack.append(span["end"])
+                break
+        else:
+            stacks.append([span["end"]])
+            lane = len(stacks) - 1
+        
+        row = (pid, thread, lane)
+        if row not in row_ids:
+            row_ids[row] = len(row_ids) + 1
+            thread_name = span["attributes"].get("thread.name", "thread")
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": row_ids[row],
+                "args": {"name": thread_name if lane == 0 else f"{thread_name} ({lane + 1})"}
+            })
+        
+        events.append({
+            "name": span_label(span),
+            "cat": span["name"],
+            "ph": "X",
+            "ts": round((span["start"] - origin) * 1e6),
+            "dur": round((span["end"] - span["start"]) * 1e6),
+            "pid": pid,
+            "tid": row_ids[row],
+            "args": {**span["attributes"], **({"error": span["status_message"]} if span["error"] else {})}
+        })
+    
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Render an article_flow trace (OTLP/JSON) as a timeline")
+    parser.add_argument("trace_file", help="Trace written by --trace or ARTICLE_FLOW_TRACE")
+    parser.add_argument("--chrome", help="Also write a Chrome trace event file here")
+    parser.add_argument("--min-ms", type=float, default=0, help="Fold spans shorter than this into a summary line")
+    parser.add_argument("--max-children", type=int, default=20, help="Children shown per span before folding the rest")
+    parser.add_argument("--top", type=int, default=15, help="Span names listed in the self-time summary")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    
+    spans = load_spans(args.trace_file)
+    if not spans:
+        print(f"❌ No spans in {args.trace_file}")
+        sys.exit(1)
+    
+    children = build_tree(spans)
+    start = min(span["start"] for span in spans)
+    total = max(span["end"] for span in spans) - start
+    
+    print(f"🧭 {len(spans)} spans, {len(children.get(None, []))} root(s), {total:.2f}s wall time")
+    print("-" * 100)
+    for line in render_timeline(children, start, total, args.min_ms / 1000, args.max_children):
+        print(line)
+    print("-" * 100)
+    
+    print(f"{'span':<32} {'count':>7} {'total':>10} {'self':>10} {'self %':>7} {'errors':>7}")
+    summary = summarize(spans, children)
+    all_self = sum(entry["self"] for entry in summary) or 1
+    for entry in summary[:args.top]:
+        print(f"{entry['name'][:32]:<32} {entry['count']:>7} {entry['total']:>9.2f}s {entry['self']:>9.2f}s "
+              f"{entry['self'] / all_self:>7.1%} {entry['errors']:>7}")
+    
+    if args.chrome:
+        with open(args.chrome, 'w', encoding='utf-8') as f:
+            json.dump(to_chrome_trace(spans, children), f, ensure_ascii=False)
+        print(f"💾 Chrome trace written to {args.chrome}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -15,17 +15,27 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from utils.logging_utils import setup_logging, log_phase_start, log_phase_end, log_error, log_metric
 from utils.file_utils import read_json, write_json
+from utils.tracing import span
 
-# Google Drive imports
-try:
-    from google.oauth2.service_account import Credentials
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaFileUpload
-    from googleapiclient.errors import HttpError
-except ImportError:
-    print("Error: Google API client libraries not installed")
-    print("Run: pip install google-api-python-client google-auth")
-    sys.exit(1)
+# Google Drive client libraries, imported on first use by load_google_api()
+Credentials = build = MediaFileUpload = HttpError = None
+
+
+def load_google_api():
+    """Import the Google API client libraries (slow to import) when first needed"""
+    global Credentials, build, MediaFileUpload, HttpError
+    if HttpError is not None:
+        return
+    
+    try:
+        from google.oauth2.service_account import Credentials
+        from googleapiclient.discovery import build
+        from googleapiclient.http import MediaFileUpload
+        from googleapiclient.errors import HttpError
+    except ImportError:
+        print("Error: Google API client libraries not installed")
+        print("Run: pip install google-api-python-client google-auth")
+        sys.exit(1)
 
 
 class GoogleDriveUploader:
@@ -33,6 +43,8 @@ class GoogleDriveUploader:
     
     def __init__(self, credentials_json: str):
         """Initialize with service account credentials"""
+        load_google_api()
+        
         try:
             # Parse credentials from JSON string
             creds_data = json.loads(credentials_json)
@@ -110,30 +122,35 @@ class GoogleDriveUploader:
             resumable=True
         )
         
-        try:
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id,name,webViewLink,webContentLink',
-                supportsAllDrives=True
-            ).execute()
-            
-            return {
-                'id': file.get('id'),
-                'name': file.get('name'),
-                'webViewLink': file.get('webViewLink'),
-                'webContentLink': file.get('webContentLink')
-            }
+        with span("drive.upload", {
+            "file.name": file_name,
+            "file.size": file_path.stat().st_size,
+            "file.mime_type": mime_type
+        }):
+            try:
+                file = self.service.files().create(
+                    body=file_metadata,
+                    media_body=media,
+                    fields='id,name,webViewLink,webContentLink',
+                    supportsAllDrives=True
+                ).execute()
+                
+                return {
+                    'id': file.get('id'),
+                    'name': file.get('name'),
+                    'webViewLink': file.get('webViewLink'),
+                    'webContentLink': file.get('webContentLink')
+                }
             
-        except HttpError as e:
-            print(f"HttpError details: {e}")
-            print(f"File: {file_name}")
-            print(f"Folder ID: {folder_id}")
-            print(f"File metadata: {file_metadata}")
-            if hasattr(e, 'resp'):
-                print(f"Response status: {e.resp.status}")
-                print(f"Response reason: {e.resp.reason}")
-            raise Exception(f"Failed to upload file {file_name} to folder {folder_id}: {e}")
+            except HttpError as e:
+                print(f"HttpError details: {e}")
+                print(f"File: {file_name}")
+                print(f"Folder ID: {folder_id}")
+                print(f"File metadata: {file_metadata}")
+                if hasattr(e, 'resp'):
+                    print(f"Response status: {e.resp.status}")
+                    print(f"Response reason: {e.resp.reason}")
+                raise Exception(f"Failed to upload file {file_name} to folder {folder_id}: {e}")
     
     def set_permissions(
         self,
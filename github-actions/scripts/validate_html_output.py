@@ -41,14 +41,15 @@ class HTMLValidator:
     
     def __init__(self):
         # ぽるか提案：汎用ショートコード検出パターン
+        # 括弧内に '[' を含めないことで、閉じていない '[' ごとに末尾まで走査する二乗の探索を防ぐ
         self.shortcode_patterns = {
-            'generic_shortcode': r'\[[A-Za-z_][\w-]*(?:\s+[^\]]*)?\]',
-            'blog_card': r'\[blog_card\s+[^\]]*\]',
-            'link_card': r'\[link_card\s+[^\]]*\]',
-            'video': r'\[video\s+[^\]]*\]',
-            'embed': r'\[embed\s+[^\]]*\]',
-            'gallery': r'\[gallery\s+[^\]]*\]',
-            'button': r'\[button\s+[^\]]*\]'
+            'generic_shortcode': r'\[[A-Za-z_][\w-]*(?:\s[^\[\]]*)?\]',
+            'blog_card': r'\[blog_card\s[^\[\]]*\]',
+            'link_card': r'\[link_card\s[^\[\]]*\]',
+            'video': r'\[video\s[^\[\]]*\]',
+            'embed': r'\[embed\s[^\[\]]*\]',
+            'gallery': r'\[gallery\s[^\[\]]*\]',
+            'button': r'\[button\s[^\[\]]*\]'
         }
         
         # 厳密なMarkdown記法パターン
@@ -58,8 +59,8 @@ class HTMLValidator:
             'numbered_lists': r'^\s{0,3}\d+\.\s+.+$',
             'code_fences': r'^```[\w]*$',
             'code_inline': r'`[^`]+`',
-            'markdown_links': r'\[[^\]]+\]\([^)]+\)',
-            'markdown_images': r'!\[[^\]]*\]\([^)]+\)',
+            'markdown_links': r'\[[^\[\]]+\]\([^)]+\)',
+            'markdown_images': r'!\[[^\[\]]*\]\([^)]+\)',
             'bold_markdown': r'\*\*[^*]+\*\*',
             'italic_markdown': r'(?<!\*)\*[^*\s][^*]*[^*\s]\*(?!\*)',
             'strikethrough': r'~~[^~]+~~',
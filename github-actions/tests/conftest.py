@@ -0,0 +1,6 @@
+"""Make `utils` and the phase scripts importable the way the scripts import them"""
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Unit tests for artifact validation"""
+import pytest
+
+from utils.artifacts import (
+    ArtifactValidationError,
+    ResearchArtifact,
+    StructureArtifact,
+    read_artifact,
+    validate_artifact,
+    write_artifact
+)
+from utils.file_utils import write_json
+from phase2_research_gemini import process_gemini_results
+
+
+def structure(**overrides):
+    data = {
+        "title": "T",
+        "introduction": {"hook": "h"},
+        "main_sections": [{"section_id": 1, "h2_title": "H2", "section_purpose": "p", "word_count_target": 500}],
+        "faq_section": {"questions": []},
+        "conclusion": {},
+        "custom_field": "kept"
+    }
+    data.update(overrides)
+    return data
+
+
+def test_valid_structure_round_trips_with_unknown_fields():
+    artifact = StructureArtifact.from_dict(structure())
+    
+    assert artifact.main_sections[0].h2_title == "H2"
+    data = artifact.to_dict()
+    
+    assert data["custom_field"] == "kept"
+    assert StructureArtifact.from_dict(data).to_dict() == data
+
+
+def test_missing_required_field_names_its_path():
+    data = structure()
+    del data["main_sections"][0]["h2_title"]
+    
+    with pytest.raises(ArtifactValidationError) as error:
+        validate_artifact(data, StructureArtifact, "structure")
+    assert error.value.path == "structure.main_sections[0].h2_title"
+
+
+def test_wrong_types_are_rejected():
+    with pytest.raises(ArtifactValidationError, match="expected int, got bool"):
+        StructureArtifact.from_dict(structure(main_sections=[
+            {"section_id": 1, "h2_title": "H2", "section_purpose": "p", "word_count_target": True}
+        ]))
+
+
+def test_read_and_write(tmp_path):
+    path = tmp_path / "phase3_structure.json"
+    write_artifact(StructureArtifact.from_dict(structure()), path)
+    
+    assert read_artifact(path, StructureArtifact)["title"] == "T"
+    assert isinstance(read_artifact(path, StructureArtifact, typed=True), StructureArtifact)
+
+
+def research_artifact(research_data):
+    return {
+        "phase1_params": {"topic": "爪", "analysis": {"main_keyword": "爪 薄い"}},
+        "research_data": research_data,
+        "source_analysis": {"categorized_sources": {}, "high_priority_sources": []}
+    }
+
+
+def test_gemini_research_artifact_is_accepted(tmp_path):
+    # Gemini's own JSON, passed through process_gemini_results: records have no
+    # provider, and the LLM wrote a numeric string score and a null URL
+    research_data = process_gemini_results({"search_results": [
+        {"query": "爪 薄い 原因", "results": [
+            {"url": "https://www.mhlw.go.jp/a", "title": "厚労省", "source_type": "government", "reliability_score": "9"},
+            {"url": None, "title": "出典不明", "key_findings": ["乾燥"], "reliability_score": None}
+        ]},
+        {"query": "爪 保湿", "results": []}
+    ]})
+    path = tmp_path / "phase2_research.json"
+    write_json(research_artifact(research_data), path)
+    
+    artifact = read_artifact(path, ResearchArtifact, typed=True)
+    
+    [first, second] = artifact.research_data.search_results
+    assert first.provider == ""
+    assert first.results[0].reliability_score == "9"
+    assert first.results[1].url is None
+    assert second.results == []
+    assert artifact.to_dict()["research_data"]["search_results"][0]["results"][1]["url"] is None
+
+
+def test_research_engine_records_keep_their_provider():
+    record = {"query": "q", "provider": "bing", "results": [{"url": "https://a.example", "title": "t"}], "result_count": 1}
+    
+    artifact = ResearchArtifact.from_dict(research_artifact({"search_results": [record]}))
+    
+    assert artifact.research_data.search_results[0].provider == "bing"
+
+
+def test_research_records_still_need_a_query():
+    with pytest.raises(ArtifactValidationError) as error:
+        ResearchArtifact.from_dict(research_artifact({"search_results": [{"results": []}]}))
+    assert error.value.path == "ResearchArtifact.research_data.search_results[0].query"
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""Unit tests for the content-addressed artifact store"""
+import pytest
+
+from utils.blob_store import BLOB_REF_KEY, LITERAL_KEY, BlobStore, pack_directory, unpack_manifest
+from utils.file_utils import read_json, write_json
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    
+    first = store.put_bytes(b"same content")
+    second = store.put_bytes(b"same content")
+    
+    assert first == second
+    assert store.get_bytes(first) == b"same content"
+    assert store.stats()["blobs_written"] == 1
+    assert store.stats()["blobs_reused"] == 1
+
+
+def test_json_round_trips_through_chunked_blobs(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    value = {"sections": [{"content": "本文" * 400, "index": i} for i in range(3)], "title": "T"}
+    
+    digest = store.put_json(value)
+    
+    assert store.get_json(digest) == value
+    # Large children are split into their own blobs
+    assert len(store.references(digest)) > 1
+
+
+def test_shared_subtrees_are_deduplicated(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    shared = {"content": "x" * 2000}
+    store.put_json({"a": shared, "title": "one"})
+    written = store.stats()["blobs_written"]
+    
+    store.put_json({"a": shared, "title": "two"})
+    
+    # Only the new root is written
+    assert store.stats()["blobs_written"] == written + 1
+
+
+def test_missing_blob_raises_key_error(tmp_path):
+    with pytest.raises(KeyError):
+        BlobStore(tmp_path / "store").get_bytes("0" * 64)
+
+
+def test_remove_frees_the_blob(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    digest = store.put_bytes(b"data" * 100)
+    
+    assert store.remove(digest) > 0
+    assert not store.has(digest)
+    assert store.remove(digest) == 0
+
+
+def test_pack_and_unpack_directory(tmp_path):
+    source = tmp_path / "article"
+    (source / "images").mkdir(parents=True)
+    write_json({"title": "T", "items": list(range(100))}, source / "phase3_structure.json")
+    (source / "images" / "hero.png").write_bytes(b"\x89PNG data")
+    (source / "skip.txt").write_text("excluded")
+    store = BlobStore(tmp_path / "store")
+    
+    manifest = pack_directory(store, source, "run-1", exclude=["skip.txt"])
+    written = unpack_manifest(store, manifest, tmp_path / "restored")
+    
+    assert set(manifest["files"]) == {"phase3_structure.json", "images/hero.png"}
+    assert manifest["files"]["phase3_structure.json"]["kind"] == "json"
+    assert len(written) == 2
+    assert read_json(tmp_path / "restored" / "phase3_structure.json") == read_json(source / "phase3_structure.json")
+    assert (tmp_path / "restored" / "images" / "hero.png").read_bytes() == b"\x89PNG data"
+
+
+def test_reference_key_is_not_confused_with_data(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    value = {"note": BLOB_REF_KEY, "items": ["a", "b"]}
+    
+    assert store.get_json(store.put_json(value)) == value
+
+
+def test_objects_shaped_like_references_round_trip(tmp_path):
+    store = BlobStore(tmp_path / "store")
+    value = {
+        "ref_like": {BLOB_REF_KEY: "not a hash"},
+        "literal_like": {LITERAL_KEY: {BLOB_REF_KEY: "nested"}},
+        "large": {BLOB_REF_KEY: ["x" * 100] * 10},
+        "items": [{BLOB_REF_KEY: 1}]
+    }
+    
+    digest = store.put_json(value)
+    
+    assert store.get_json(digest) == value
+    assert store.get_json(store.put_json({BLOB_REF_KEY: "top level"})) == {BLOB_REF_KEY: "top level"}
+    # Only real blobs are reported as references
+    assert all(store.has(reference) for reference in store.references(digest))
\ No newline at end of file
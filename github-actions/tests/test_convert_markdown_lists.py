@@ -0,0 +1,79 @@
+"""Regression tests for the linear Markdown list converter against the find/replace version"""
+import pytest
+
+from convert_markdown_lists_to_html import convert_numbered_lists_to_html, detect_numbered_lists
+
+
+def legacy_convert(content):
+    """convert_numbered_lists_to_html before the linear rewrite (find/replace per block)"""
+    converted_count = 0
+    result_content = content
+    list_blocks = detect_numbered_lists(content)
+    if not list_blocks:
+        return content, 0
+    for block in reversed(list_blocks):
+        block_text = '\n'.join(item['full_line'] for item in block)
+        block_start = result_content.find(block_text)
+        if block_start == -1:
+            continue
+        context_before = result_content[max(0, block_start-100):block_start]
+        context_after = result_content[block_start+len(block_text):block_start+len(block_text)+100]
+        if ('<pre' in context_before and '</pre>' in context_after) or \
+           ('<code' in context_before and '</code>' in context_after):
+            continue
+        if ('<ol' in context_before and '</ol>' in context_after):
+            continue
+        items = [f"  <li>{item['text'].replace('<', '&lt;').replace('>', '&gt;')}</li>" for item in block]
+        result_content = result_content.replace(block_text, "<ol>\n" + "\n".join(items) + "\n</ol>")
+        converted_count += 1
+    return result_content, converted_count
+
+
+FIXTURES = {
+    "no_lists": "<h2>見出し</h2>\n<p>本文</p>\n1. 一行だけのリスト\n",
+    "single_block": "<p>手順</p>\n1. 洗顔する\n2. 化粧水をつける\n3. 乳液で<b>保湿</b>する\n<p>以上</p>",
+    "several_blocks": "\n".join(
+        f"<h2>見出し{i}</h2>\n1. 項目{i}-1\n2. 項目{i}-2\n  3. 字下げ{i}\n<p>段落{i}</p>" for i in range(5)
+    ),
+    "inside_pre": "<pre>\n1. コード\n2. サンプル\n</pre>\n<p>後</p>\n1. 本物\n2. リスト",
+    "inside_code": "<code>1. a\n2. b</code>\n\n1. c\n2. d",
+    "inside_existing_ol": "<ol>\n1. 既存\n2. リスト\n</ol>\n<p>次</p>\n1. 新規\n2. リスト",
+    "block_at_end_without_newline": "<p>前</p>\n1. 最後\n2. ブロック",
+    "adjacent_blocks_share_context": "1. a\n2. b\n<pre>\n1. c\n2. d\n</pre>\n1. e\n2. f\n",
+    "long_gap_between_blocks": "1. a\n2. b\n" + "<p>" + "x" * 300 + "</p>\n1. c\n2. d"
+}
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_output_matches_the_find_replace_converter(name):
+    assert convert_numbered_lists_to_html(FIXTURES[name]) == legacy_convert(FIXTURES[name])
+
+
+def test_identical_blocks_are_checked_against_their_own_context():
+    # The old converter found the copy inside <pre> for both blocks and skipped them both
+    content = "<pre>\n1. 同じ\n2. ブロック\n</pre>\n<p>本文</p>\n1. 同じ\n2. ブロック\n"
+    
+    converted, count = convert_numbered_lists_to_html(content)
+    
+    assert legacy_convert(content) == (content, 0)
+    assert count == 1
+    assert converted == "<pre>\n1. 同じ\n2. ブロック\n</pre>\n<p>本文</p>\n<ol>\n  <li>同じ</li>\n  <li>ブロック</li>\n</ol>\n"
+
+
+def test_identical_blocks_are_counted_separately():
+    # The old converter replaced every copy on the first match and counted one block
+    content = "1. 同じ\n2. ブロック\n<p>間</p>\n1. 同じ\n2. ブロック"
+    
+    converted, count = convert_numbered_lists_to_html(content)
+    
+    assert converted == legacy_convert(content)[0]
+    assert legacy_convert(content)[1] == 1
+    assert count == 2
+
+@pytest.mark.parametrize("fmt", ["html", "markdown"])
+def test_benchmark_documents_match_the_find_replace_converter(fmt):
+    from benchmark_postprocessing import generate_document
+    
+    document = generate_document(20_000, fmt)
+    
+    assert convert_numbered_lists_to_html(document) == legacy_convert(document)
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""Unit tests for JSON artifact reading and writing"""
+import math
+
+from utils.file_utils import read_json, write_json
+
+
+def test_round_trip(tmp_path):
+    data = {"title": "タイトル", "score": 1e-05, "items": [1, 2, {"nested": None}]}
+    path = tmp_path / "out" / "data.json"
+    
+    write_json(data, path)
+    
+    assert read_json(path) == data
+
+
+def test_non_finite_floats_are_not_written_as_null(tmp_path):
+    path = tmp_path / "data.json"
+    
+    write_json({"scores": [1.0, float("nan")], "limit": {"max": float("inf")}}, path)
+    data = read_json(path)
+    
+    assert math.isnan(data["scores"][1])
+    assert data["limit"]["max"] == math.inf
+
+
+def test_compact_output_has_no_indentation(tmp_path):
+    path = tmp_path / "data.json"
+    
+    write_json({"a": [1, 2]}, path, compact=True)
+    
+    assert path.read_text(encoding="utf-8") == '{"a":[1,2]}'
\ No newline at end of file
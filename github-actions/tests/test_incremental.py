@@ -0,0 +1,35 @@
+"""Unit tests for incremental-mode phase state"""
+from utils.incremental import PhaseState, hash_value
+
+
+def test_hash_value_ignores_key_order():
+    assert hash_value({"a": 1, "b": [1, 2]}) == hash_value({"b": [1, 2], "a": 1})
+    assert hash_value({"a": 1}) != hash_value({"a": 2})
+
+
+def test_result_is_reused_only_while_inputs_and_outputs_are_unchanged(tmp_path):
+    (tmp_path / "phase3_structure.json").write_text("{}")
+    state = PhaseState(tmp_path)
+    inputs = {"upstream.research": "abc", "prompt.02_structure": "def"}
+    
+    assert state.lookup("structure", inputs) == (False, "no stored result")
+    
+    state.record("structure", inputs, {"title": "T"}, ["phase3_structure.json", "article_outline.md"])
+    reloaded = PhaseState(tmp_path)
+    
+    assert reloaded.lookup("structure", inputs) == (True, "inputs unchanged")
+    assert reloaded.load_result("structure") == {"title": "T"}
+    assert reloaded.lookup("structure", dict(inputs, **{"prompt.02_structure": "xyz"})) == (
+        False, "changed: prompt.02_structure"
+    )
+    assert reloaded.lookup("structure", dict(inputs, **{"upstream.research": None}))[0] is False
+    
+    (tmp_path / "phase3_structure.json").unlink()
+    assert reloaded.lookup("structure", inputs) == (False, "missing outputs: phase3_structure.json")
+
+
+def test_unserializable_results_are_not_stored(tmp_path):
+    state = PhaseState(tmp_path)
+    
+    assert state.record("images", {}, {"generator": object()}, []) is None
+    assert state.lookup("images", {}) == (False, "no stored result")
\ No newline at end of file
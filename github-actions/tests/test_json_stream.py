@@ -0,0 +1,58 @@
+"""Unit tests for incremental array item extraction from streamed JSON"""
+import json
+
+from utils.json_stream import JsonArrayItemStream
+
+
+STRUCTURE = {
+    "title": "タイトル {not an item}",
+    "introduction": {"main_sections": [{"nested": True}]},
+    "main_sections": [
+        {"section_id": 1, "h2_title": "見出し \"1\" }", "subsections": [{"h3": "a"}]},
+        {"section_id": 2, "h2_title": "見出し2", "subsections": []}
+    ],
+    "faq_section": {"questions": [{"question": "q"}]}
+}
+
+
+def feed_in_chunks(stream: JsonArrayItemStream, text: str, size: int) -> None:
+    for start in range(0, len(text), size):
+        stream.feed(text[start:start + size])
+
+
+def test_items_are_emitted_as_soon_as_they_are_complete():
+    text = json.dumps(STRUCTURE, ensure_ascii=False)
+    seen = []
+    stream = JsonArrayItemStream("main_sections", lambda item: seen.append((item["section_id"], len(stream.items))))
+    
+    first_done = text.index('"section_id": 2')
+    stream.feed(text[:first_done])
+    assert [section_id for section_id, _ in seen] == [1]
+    
+    stream.feed(text[first_done:])
+    assert stream.items == STRUCTURE["main_sections"]
+
+
+def test_chunk_boundaries_do_not_matter():
+    text = json.dumps(STRUCTURE, ensure_ascii=False, indent=2)
+    for size in (1, 3, 7, 64):
+        stream = JsonArrayItemStream("main_sections", lambda item: None)
+        feed_in_chunks(stream, text, size)
+        assert stream.items == STRUCTURE["main_sections"]
+
+
+def test_text_before_the_object_is_skipped():
+    text = "```json\n" + json.dumps(STRUCTURE, ensure_ascii=False) + "\n```"
+    stream = JsonArrayItemStream("main_sections", lambda item: None)
+    
+    stream.feed(text)
+    
+    assert [item["section_id"] for item in stream.items] == [1, 2]
+
+
+def test_nested_arrays_with_the_same_key_are_ignored():
+    stream = JsonArrayItemStream("questions", lambda item: None)
+    
+    stream.feed(json.dumps(STRUCTURE, ensure_ascii=False))
+    
+    assert stream.items == []
\ No newline at end of file
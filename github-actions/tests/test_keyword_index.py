@@ -0,0 +1,53 @@
+"""Unit tests for the Aho-Corasick keyword counter"""
+import random
+
+from utils.keyword_index import KeywordIndex, build_density_heatmap, count_japanese_characters
+
+
+def str_count(text, keywords):
+    """The per-keyword str.count loop KeywordIndex replaces"""
+    return {keyword: text.lower().count(keyword.lower()) for keyword in keywords}
+
+
+def test_counts_match_str_count_for_overlapping_keywords():
+    text = "aaaa abab ababab"
+    keywords = ["a", "aa", "aaa", "ab", "aba", "bab"]
+    
+    assert KeywordIndex(keywords).count(text) == str_count(text, keywords)
+
+
+def test_counts_match_str_count_for_japanese_keywords():
+    text = "爪ケアの基本。爪ケアとハンドケア、ケアケアケア。爪が薄い原因と爪が薄い人のケア。"
+    keywords = ["爪ケア", "ケア", "ケアケア", "爪が薄い", "薄い", "ハンドケア"]
+    
+    assert KeywordIndex(keywords).count(text) == str_count(text, keywords)
+
+
+def test_counts_match_str_count_on_random_text():
+    rng = random.Random(0)
+    keywords = ["ab", "aba", "b", "bb", "ケア", "アケ", "ケアケ"]
+    for _ in range(200):
+        text = "".join(rng.choice("abケア") for _ in range(rng.randint(0, 40)))
+        assert KeywordIndex(keywords).count(text) == str_count(text, keywords)
+
+
+def test_matching_is_case_insensitive_and_keeps_the_callers_spelling():
+    index = KeywordIndex(["HIFU", "hifu", "", "Spa"])
+    
+    assert index.keywords == ["HIFU", "Spa"]
+    assert index.count("hifu HIFU Hifu spa") == {"HIFU": 3, "Spa": 1}
+
+
+def test_offsets_and_density():
+    text = "爪ケア。爪ケア"
+    index = KeywordIndex(["爪ケア"])
+    
+    assert index.find_all(text) == {"爪ケア": [0, 4]}
+    # 6 counted characters, 2 matches of 3 characters each
+    assert count_japanese_characters(text) == 6
+    assert index.density(text) == {"爪ケア": 100.0}
+
+
+def test_heatmap_buckets_offsets():
+    assert build_density_heatmap({"k": [0, 5, 9]}, 10, buckets=2) == {"k": [1, 2]}
+    assert build_density_heatmap({"k": [0]}, 0) == {"k": []}
\ No newline at end of file
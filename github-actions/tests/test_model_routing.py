@@ -0,0 +1,62 @@
+"""Unit tests for the model tiering policy"""
+import pytest
+
+from utils.model_routing import DEFAULT_TIERS, ModelRouter
+
+
+class FakeConfig:
+    def __init__(self, settings=None):
+        self.settings = settings
+    
+    def load_config(self, name):
+        if self.settings is None:
+            raise FileNotFoundError(name)
+        return self.settings
+
+
+def test_small_tasks_use_the_fast_tier_by_default():
+    router = ModelRouter()
+    
+    assert router.route({"phase": "request_analysis"}) == ("request_analysis", "fast", DEFAULT_TIERS["fast"])
+    assert router.route({"phase": "writing", "task": "faq_answer"})[1] == "fast"
+    assert router.route({"phase": "writing"}) == ("writing", "strong", DEFAULT_TIERS["strong"])
+    assert router.route(None) == ("default", "strong", DEFAULT_TIERS["strong"])
+    assert router.default_model == DEFAULT_TIERS["strong"]
+
+
+def test_config_changes_tiers_tasks_and_overrides():
+    router = ModelRouter.from_config(FakeConfig({
+        "tiers": {"fast": "fast-model"},
+        "tasks": {"structure_planning": "fast", "request_analysis": "strong"},
+        "overrides": {"writing": "special-model"}
+    }))
+    
+    assert router.route({"phase": "structure_planning"})[2] == "fast-model"
+    assert router.route({"phase": "request_analysis"})[1] == "strong"
+    assert router.route({"phase": "writing"}) == ("writing", "override", "special-model")
+
+
+def test_missing_config_file_keeps_the_defaults():
+    assert ModelRouter.from_config(FakeConfig()).policy() == ModelRouter().policy()
+
+
+def test_unknown_tiers_are_rejected():
+    with pytest.raises(ValueError):
+        ModelRouter(task_tiers={"writing": "medium"})
+
+
+def test_stats_aggregate_latency_errors_and_quality():
+    router = ModelRouter()
+    router.record_call("faq_answer", "m", 0.2)
+    router.record_call("faq_answer", "m", 0.4)
+    router.record_call("faq_answer", "m", 1.0, error=True)
+    router.record_quality("faq_answer", "m", 1.0)
+    router.record_quality("faq_answer", "m", 0.0)
+    
+    stats = router.stats()["faq_answer"]
+    
+    assert stats["calls"] == 3
+    assert stats["errors"] == 1
+    assert stats["mean_latency"] == pytest.approx(0.533, abs=0.001)
+    assert stats["max_latency"] == 1.0
+    assert stats["quality"] == 0.5
\ No newline at end of file
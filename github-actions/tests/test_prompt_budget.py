@@ -0,0 +1,67 @@
+"""Unit tests for packing research sources into a token budget"""
+from utils.prompt_budget import (
+    budget_report,
+    compact_source,
+    estimate_tokens,
+    pack_sources,
+    prioritize_categorized_sources
+)
+
+
+def test_estimate_counts_ascii_runs_and_japanese_separately():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+    assert estimate_tokens("爪ケア") == 3
+    assert estimate_tokens("爪abcd") == 2
+
+
+def test_compact_source_keeps_only_non_empty_fields():
+    source = {"title": "爪", "url": "https://a.example", "key_info": "", "snippet": "long snippet", "category": None}
+    
+    assert compact_source(source) == '{"title":"爪","url":"https://a.example"}'
+
+
+def test_pack_stops_at_the_budget():
+    sources = [{"title": "a" * 40, "url": f"https://a.example/{i}"} for i in range(10)]
+    cost = estimate_tokens(compact_source(sources[0])) + 1
+    
+    packed = pack_sources(sources, cost * 3)
+    
+    assert packed["included"] == sources[:3]
+    assert packed["tokens"] == cost * 3
+    assert packed["dropped"] == [f"https://a.example/{i}" for i in range(3, 10)]
+    assert packed["text"].count("\n") == 2
+
+
+def test_oversized_sources_are_skipped_without_ending_the_pack():
+    big = {"title": "長" * 500, "url": "https://big.example"}
+    small = {"title": "短い", "url": "https://small.example"}
+    
+    packed = pack_sources([big, small], 50)
+    
+    assert packed["included"] == [small]
+    assert packed["dropped"] == ["https://big.example"]
+    assert budget_report(packed) == {"budget": 50, "tokens": packed["tokens"], "included": 1, "dropped": ["https://big.example"]}
+
+
+def test_sources_keep_their_priority_order():
+    sources = [{"title": f"t{i}"} for i in range(5)]
+    
+    packed = pack_sources(sources, 1000)
+    
+    assert [source["title"] for source in packed["included"]] == ["t0", "t1", "t2", "t3", "t4"]
+
+
+def test_categories_are_interleaved_by_priority():
+    categorized = {
+        "media_sources": [{"title": "m1"}, {"title": "m2"}],
+        "custom_sources": [{"title": "c1"}],
+        "government_sources": [{"title": "g1"}, {"title": "g2"}, {"title": "g3"}],
+        "academic_sources": {"parse_error": "not a list"}
+    }
+    
+    flattened = prioritize_categorized_sources(categorized)
+    
+    assert [source["title"] for source in flattened] == ["g1", "m1", "c1", "g2", "m2", "g3"]
+    assert flattened[0]["category"] == "government_sources"
\ No newline at end of file
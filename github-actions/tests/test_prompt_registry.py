@@ -0,0 +1,68 @@
+"""Unit tests for the prompt template registry"""
+import pytest
+
+from utils.prompt_registry import PromptRegistry, PromptTemplate, PromptTemplateError
+
+
+def make_registry(tmp_path, **templates):
+    prompt_dir = tmp_path / "prompts"
+    prompt_dir.mkdir()
+    for name, text in templates.items():
+        (prompt_dir / f"{name}.md").write_text(text, encoding="utf-8")
+    return PromptRegistry([prompt_dir], [])
+
+
+def test_render_fills_named_placeholders():
+    template = PromptTemplate("t", "{topic}について {count:>3}件 {{literal}}")
+    
+    assert template.placeholders == ("topic", "count")
+    assert template.render(topic="ハイフ", count=5, unused=1) == "ハイフについて   5件 {literal}"
+
+
+def test_render_requires_every_placeholder():
+    with pytest.raises(PromptTemplateError, match="topic"):
+        PromptTemplate("t", "{topic}").render()
+
+
+def test_positional_placeholders_are_rejected():
+    with pytest.raises(PromptTemplateError):
+        PromptTemplate("t", "{} and {0}")
+
+
+def test_chat_templates_use_japanese_placeholders():
+    template = PromptTemplate("chat", "記事: 【ここにテーマを入力（例: 美容）】", syntax="chat")
+    
+    assert template.placeholders == ("テーマ",)
+    assert template.render(テーマ="ハイフ") == "記事: ハイフ"
+
+
+def test_version_changes_with_the_text():
+    assert PromptTemplate("t", "a").version != PromptTemplate("t", "b").version
+
+
+def test_validate_reports_fields_the_code_does_not_supply(tmp_path):
+    registry = make_registry(tmp_path, structure="{topic} {keyword}")
+    registry.spec("structure", ["topic"], owner="phase3")
+    
+    with pytest.raises(PromptTemplateError, match="keyword"):
+        registry.validate()
+
+
+def test_validate_reports_missing_and_broken_templates(tmp_path):
+    registry = make_registry(tmp_path, broken="{unclosed")
+    registry.spec("broken", [], owner="a")
+    registry.spec("missing", [], owner="b")
+    
+    problems = registry.problems()
+    
+    assert len(problems) == 2
+    assert "used by b" in problems[1]
+
+
+def test_declared_call_sites_matching_templates_validate(tmp_path):
+    registry = make_registry(tmp_path, writing="{section}")
+    spec = registry.spec("writing", ["section", "extra"])
+    
+    registry.validate()
+    assert spec.render(section="S", extra="E") == "S"
+    assert registry.versions() == {"writing": spec.version}
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""Unit tests for near-duplicate query collapsing"""
+from utils.query_dedup import MinHasher, char_shingles, dedupe_queries, normalize_for_shingles
+
+
+def test_particles_and_spacing_do_not_change_the_shingles():
+    assert normalize_for_shingles("爪が薄い 原因") == normalize_for_shingles("爪 薄い 原因") == "爪薄い原因"
+    assert normalize_for_shingles("ケアの方法") == "ケア方法"
+    # Particles inside hiragana words are kept
+    assert normalize_for_shingles("きのこ") == "きのこ"
+
+
+def test_shared_terms_are_ignored_unless_nothing_else_is_left():
+    assert normalize_for_shingles("ハイフ 効果", ["ハイフ"]) == "効果"
+    assert normalize_for_shingles("ハイフ", ["ハイフ"]) == "ハイフ"
+
+
+def test_signatures_are_stable_and_estimate_jaccard():
+    hasher = MinHasher()
+    first = hasher.signature(char_shingles("爪薄い原因"))
+    
+    assert first == MinHasher().signature(char_shingles("爪薄い原因"))
+    assert hasher.similarity(first, first) == 1.0
+    assert hasher.similarity(first, hasher.signature(char_shingles("保湿方法"))) < 0.2
+
+
+def test_paraphrases_are_merged_into_the_first_spelling():
+    result = dedupe_queries(["爪 薄い 原因", "爪が薄い 原因", "爪 薄い 原因", "ハイフの効果", "ハイフ 効果"], ignore_terms=["爪"])
+    
+    assert result["queries"] == ["爪 薄い 原因", "ハイフの効果"]
+    assert result["merged"] == {"爪 薄い 原因": ["爪が薄い 原因"], "ハイフの効果": ["ハイフ 効果"]}
+    assert result["candidates"] == 2
+
+
+def test_different_aspects_of_the_same_keyword_stay_apart():
+    queries = ["ハイフ 効果", "ハイフ 注意点", "ハイフ 料金 相場", "ハイフ 頻度"]
+    
+    result = dedupe_queries(queries, ignore_terms=["ハイフ"])
+    
+    assert result["queries"] == queries
+    assert result["merged"] == {}
+
+
+def test_priority_queries_are_always_kept():
+    queries = ["効果 持続", "効果 持続期間", "副作用", "料金", "口コミ"]
+    
+    result = dedupe_queries(queries, limit=3, priority=2, threshold=1.1)
+    
+    assert result["queries"][:2] == ["効果 持続", "効果 持続期間"]
+    assert len(result["queries"]) == 3
+
+
+def test_remaining_slots_go_to_the_most_different_candidates():
+    queries = ["効果 持続", "効果 持続 期間 目安", "副作用 リスク"]
+    
+    result = dedupe_queries(queries, limit=2, priority=1, threshold=1.1)
+    
+    assert result["queries"] == ["効果 持続", "副作用 リスク"]
+
+
+def test_blank_and_non_string_queries_are_skipped():
+    assert dedupe_queries(["", "  ", None, "料金"])["queries"] == ["料金"]
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""Unit tests for the shared token buckets"""
+import asyncio
+
+import pytest
+
+from utils.rate_limit import ProviderLimiter, TokenBucket
+
+
+def test_bucket_starts_full_and_reports_wait_when_empty():
+    bucket = TokenBucket(60)
+    
+    assert bucket.try_acquire(60) == 0
+    assert bucket.try_acquire(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_oversized_requests_are_clamped_to_capacity():
+    bucket = TokenBucket(60, capacity=10)
+    
+    assert bucket.try_acquire(1000) == 0
+    assert bucket.tokens == pytest.approx(0, abs=0.01)
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_limiter_without_limits_never_waits():
+    limiter = ProviderLimiter("unlimited")
+    
+    assert limiter.acquire(tokens=10_000) == 0
+    assert asyncio.run(limiter.acquire_async(tokens=10_000)) == 0
+    assert limiter.stats()["calls"] == 2
+    assert limiter.stats()["tokens_charged"] == 20_000
+
+
+def test_limiter_waits_once_request_quota_is_spent():
+    # 600 per minute: a burst of 600, then one request every 0.1s
+    limiter = ProviderLimiter("provider", requests_per_minute=600)
+    for _ in range(600):
+        limiter.acquire()
+    
+    waited = limiter.acquire()
+    
+    assert waited == pytest.approx(0.1, abs=0.05)
+    assert limiter.stats()["wait_seconds"] > 0
\ No newline at end of file
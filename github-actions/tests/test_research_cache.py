@@ -0,0 +1,85 @@
+"""Unit tests for the cross-article research cache"""
+import time
+
+import pytest
+
+from utils import research_cache
+from utils.research_cache import ResearchCache, normalize_query
+from phase2_research_gemini import match_sent_queries
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResearchCache(db_path=tmp_path / "cache.sqlite3", ttl_hours=1, enabled=True)
+    yield cache
+    cache.close()
+
+
+def test_normalize_query_folds_width_case_and_punctuation():
+    assert normalize_query("ＨＩＦＵ　効果、「比較」") == "hifu 効果 比較"
+    assert normalize_query(" 爪が薄い  原因！ ") == "爪が薄い 原因"
+    assert normalize_query(None) == ""
+
+
+def test_normalized_spellings_share_an_entry(cache):
+    cache.put("HIFU 効果", "bing", [{"url": "https://a.example"}])
+    
+    assert cache.get("ｈｉｆｕ　効果。", "bing") == [{"url": "https://a.example"}]
+    assert cache.get("HIFU 効果", "gemini") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_the_ttl(cache, monkeypatch):
+    cache.put("query", "bing", ["result"])
+    now = time.time()
+    
+    monkeypatch.setattr(research_cache.time, "time", lambda: now + 3500)
+    assert cache.get("query", "bing") == ["result"]
+    
+    monkeypatch.setattr(research_cache.time, "time", lambda: now + 3700)
+    assert cache.get("query", "bing") is None
+
+
+def test_provider_ttl_overrides_the_default(cache, monkeypatch):
+    monkeypatch.setitem(research_cache.PROVIDER_TTL_HOURS, "news", 0.01)
+    cache.put("query", "news", ["result"])
+    cache.put("query", "bing", ["result"])
+    now = time.time()
+    
+    monkeypatch.setattr(research_cache.time, "time", lambda: now + 60)
+    
+    assert cache.get("query", "news") is None
+    assert cache.get("query", "bing") == ["result"]
+
+
+def test_purge_expired_deletes_old_entries(cache, monkeypatch):
+    cache.put("query", "bing", ["result"])
+    now = time.time()
+    
+    monkeypatch.setattr(research_cache.time, "time", lambda: now + 7200)
+    
+    assert cache.purge_expired() == 1
+    assert cache.get("query", "bing") is None
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ResearchCache(db_path=tmp_path / "cache.sqlite3", enabled=False)
+    cache.put("query", "bing", ["result"])
+    
+    assert cache.get("query", "bing") is None
+    assert not (tmp_path / "cache.sqlite3").exists()
+
+
+def test_gemini_results_are_keyed_by_the_sent_query():
+    sent = ["爪が薄い 原因", "爪 保湿 方法"]
+    echoed = [{"query": "2. 爪 保湿 方法"}, {"query": "爪が薄くなる原因"}]
+    
+    assert match_sent_queries(echoed, sent) == ["爪 保湿 方法", "爪が薄い 原因"]
+
+
+def test_unmatched_gemini_results_are_not_cached_when_counts_differ():
+    sent = ["爪が薄い 原因", "爪 保湿 方法", "爪 割れる"]
+    echoed = [{"query": "爪が薄い　原因"}, {"query": "別のクエリ"}]
+    
+    assert match_sent_queries(echoed, sent) == ["爪が薄い 原因", None]
\ No newline at end of file
@@ -0,0 +1,232 @@
+"""Unit tests for the async research engine: cache, retries, quotas and hedging"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from utils.rate_limit import ProviderLimiter
+from utils.research_cache import ResearchCache
+from utils.research_engine import MODE_RACE, ResearchEngine, ResearchProvider, SearchError
+
+
+class FakeProvider(ResearchProvider):
+    """Provider answering after `delay` seconds, failing its first `failures` calls"""
+    
+    def __init__(self, name: str, delay: float = 0.0, failures: int = 0, **quota):
+        super().__init__(**quota)
+        self.name = name
+        self.delay = delay
+        self.failures = failures
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+    
+    async def search(self, query):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.calls <= self.failures:
+                raise SearchError(f"{self.name} failure {self.calls}")
+            return [{"url": f"https://{self.name}.example/{query}", "title": query, "priority": "high"}]
+        finally:
+            self.running -= 1
+
+
+class FailingWriteCache:
+    """Cache whose reads miss and whose writes fail like a locked database"""
+    
+    def get(self, query, provider):
+        return None
+    
+    def put(self, query, provider, payload):
+        raise sqlite3.OperationalError("database is locked")
+    
+    def stats(self):
+        return {}
+
+
+def assert_slots_released(engine):
+    assert {key: quota.in_flight for key, quota in engine.quotas.items()} == {key: 0 for key in engine.quotas}
+
+
+def test_success_normalizes_results():
+    engine = ResearchEngine([FakeProvider("primary")])
+    
+    [record] = engine.run_sync(["query"])
+    
+    assert "error" not in record
+    assert record["provider"] == "primary"
+    assert record["attempts"] == 1
+    assert record["results"][0]["source_type"] == "academic"
+    assert_slots_released(engine)
+
+
+def test_duplicate_queries_are_searched_once():
+    provider = FakeProvider("primary")
+    engine = ResearchEngine([provider])
+    
+    records = engine.run_sync(["a", "b", "a"])
+    
+    assert [record["query"] for record in records] == ["a", "b"]
+    assert provider.calls == 2
+
+
+def test_failover_retries_on_next_provider():
+    primary = FakeProvider("primary", failures=1)
+    secondary = FakeProvider("secondary")
+    engine = ResearchEngine([primary, secondary], retry_delay=0.01)
+    
+    [record] = engine.run_sync(["query"])
+    
+    assert record["provider"] == "secondary"
+    assert record["attempts"] == 2
+    assert engine.provider_stats["primary"]["failures"] == 1
+
+
+def test_gives_up_after_max_attempts():
+    provider = FakeProvider("primary", failures=10)
+    engine = ResearchEngine([provider], max_attempts=3, retry_delay=0.01)
+    
+    [record] = engine.run_sync(["query"])
+    
+    assert "error" in record
+    assert record["attempts"] == 3
+    assert provider.calls == 3
+    assert_slots_released(engine)
+
+
+def test_timeout_counts_as_failure():
+    engine = ResearchEngine([FakeProvider("primary", delay=1.0, timeout=0.05)], max_attempts=1)
+    
+    [record] = engine.run_sync(["query"])
+    
+    assert record["error"].startswith("Timed out")
+    assert engine.provider_stats["primary"]["timeouts"] == 1
+    assert_slots_released(engine)
+
+
+def test_concurrency_is_capped_per_provider():
+    provider = FakeProvider("primary", delay=0.02, max_concurrent=2)
+    engine = ResearchEngine([provider])
+    
+    engine.run_sync([f"q{i}" for i in range(6)])
+    
+    assert provider.max_running == 2
+    assert_slots_released(engine)
+
+
+def test_race_mode_spreads_queries_across_providers():
+    first = FakeProvider("first", delay=0.02, max_concurrent=1)
+    second = FakeProvider("second", delay=0.02, max_concurrent=1)
+    engine = ResearchEngine([first, second], mode=MODE_RACE)
+    
+    records = engine.run_sync([f"q{i}" for i in range(4)])
+    
+    assert {record["provider"] for record in records} == {"first", "second"}
+
+
+def test_cached_results_skip_the_provider(tmp_path):
+    cache = ResearchCache(db_path=tmp_path / "cache.sqlite3", enabled=True)
+    provider = FakeProvider("primary")
+    ResearchEngine([provider], cache=cache).run_sync(["query"])
+    
+    [record] = ResearchEngine([provider], cache=cache).run_sync(["query"])
+    
+    assert record["cached"] is True
+    assert provider.calls == 1
+
+
+def test_cache_write_failure_does_not_fail_the_search():
+    engine = ResearchEngine([FakeProvider("primary")], cache=FailingWriteCache())
+    
+    [record] = engine.run_sync(["query"])
+    
+    assert "error" not in record
+    assert record["result_count"] == 1
+
+
+def test_hedge_wins_over_straggler():
+    engine = ResearchEngine(
+        [FakeProvider("primary", delay=0.5)],
+        hedge_after=0.05,
+        hedge_providers=[FakeProvider("hedge", delay=0.01)]
+    )
+    
+    [record] = engine.run_sync(["query"])
+    
+    assert record["provider"] == "hedge"
+    assert record["hedged"] is True
+    assert engine.hedge_stats["hedges"] == 1
+    assert engine.hedge_stats["wins"] == 1
+    assert_slots_released(engine)
+
+
+def test_hedge_budget_caps_concurrent_stragglers():
+    hedge = FakeProvider("hedge", delay=0.3, max_concurrent=20)
+    engine = ResearchEngine(
+        [FakeProvider("primary", delay=0.2, max_concurrent=20)],
+        hedge_after=0.05,
+        hedge_budget=0.1,
+        hedge_providers=[hedge]
+    )
+    
+    engine.run_sync([f"q{i}" for i in range(20)])
+    
+    assert engine.hedge_stats["budget"] == pytest.approx(2.0)
+    assert engine.hedge_stats["spend"] <= engine.hedge_stats["budget"]
+    assert engine.hedge_stats["hedges"] == hedge.calls == 2
+
+
+def test_hedges_cancelled_before_starting_are_not_counted_or_charged():
+    # One request per minute: only the first hedge gets past the limiter before the primaries finish
+    hedge = FakeProvider("hedge", delay=0.01, max_concurrent=2, limiter=ProviderLimiter("hedge", 1))
+    engine = ResearchEngine(
+        [FakeProvider("primary", delay=0.3, max_concurrent=4)],
+        hedge_after=0.05,
+        hedge_providers=[hedge]
+    )
+    
+    engine.run_sync([f"q{i}" for i in range(4)])
+    
+    assert engine.hedge_stats["hedges"] == hedge.calls == 1
+    assert engine.hedge_stats["spend"] == pytest.approx(1.0)
+    assert_slots_released(engine)
+
+
+def test_providers_need_distinct_cache_keys():
+    with pytest.raises(ValueError):
+        ResearchEngine([FakeProvider("same"), FakeProvider("same")])
+
+class QueryFailingProvider(FakeProvider):
+    """Provider failing only the queries in `failing`"""
+    
+    def __init__(self, name: str, failing=(), **kwargs):
+        super().__init__(name, **kwargs)
+        self.failing = set(failing)
+    
+    async def search(self, query):
+        if query in self.failing:
+            self.calls += 1
+            raise SearchError(f"{self.name} failed {query}")
+        return await super().search(query)
+
+
+def test_hedge_delay_after_failover_uses_the_provider_now_running():
+    # The primary's latency history gives it a long (1s) hedge delay; the
+    # failover provider has no history, so its attempt is hedged after 0.05s
+    primary = QueryFailingProvider("primary", failing={"flaky"})
+    engine = ResearchEngine(
+        [primary, FakeProvider("failover", delay=0.5)],
+        hedge_after=0.05,
+        retry_delay=0.01,
+        hedge_providers=[FakeProvider("hedge", delay=0.01)]
+    )
+    engine.run_sync(["w1", "w2", "w3"])
+    
+    [record] = engine.run_sync(["flaky"])
+    
+    assert record["provider"] == "hedge"
+    assert record["hedged"] is True
+    assert_slots_released(engine)
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""Unit tests for the delta-compressed snapshot history"""
+import pytest
+
+from utils.snapshot_store import SnapshotStore, apply_delta, line_delta
+
+
+def html(step: int) -> str:
+    return "".join(f"<p>line {i}{' changed' if i == step else ''}</p>\n" for i in range(200))
+
+
+def test_line_delta_round_trips():
+    old, new = html(0), html(5)
+    
+    assert apply_delta(old, line_delta(old, new)) == new
+
+
+def test_later_snapshots_are_stored_as_small_deltas(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots")
+    
+    first = store.add(html(0), "step 1")
+    second = store.add(html(1), "step 2")
+    
+    assert first["kind"] == "base"
+    assert second["kind"] == "delta"
+    assert second["stored_bytes"] < first["stored_bytes"]
+    assert store.text(second["id"]) == html(1)
+
+
+def test_index_is_reloaded_from_disk(tmp_path):
+    SnapshotStore(tmp_path / "snapshots").add(html(0), "step 1")
+    SnapshotStore(tmp_path / "snapshots").add(html(1), "step 2")
+    
+    store = SnapshotStore(tmp_path / "snapshots")
+    
+    assert [entry["id"] for entry in store.snapshots] == [1, 2]
+    assert store.text(store.find("step 2")["id"]) == html(1)
+
+
+def test_find_by_id_or_step(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots")
+    store.add(html(0), "step 1")
+    store.add(html(1), "step 2")
+    
+    assert store.find("1")["step_name"] == "step 1"
+    assert store.find("step 2")["id"] == 2
+    with pytest.raises(KeyError):
+        store.find("step 3")
+
+
+def test_drop_oldest_rebases_the_successor(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots")
+    for step in range(3):
+        store.add(html(step), f"step {step}")
+    
+    store.drop_oldest()
+    
+    assert store.snapshots[0]["kind"] == "base"
+    assert [store.text(entry["id"]) for entry in store.snapshots] == [html(1), html(2)]
+
+
+def test_corrupted_snapshot_is_detected(tmp_path):
+    store = SnapshotStore(tmp_path / "snapshots")
+    entry = store.add(html(0), "step 1")
+    entry["sha256"] = "0" * 64
+    
+    with pytest.raises(ValueError):
+        store.text(entry["id"])
\ No newline at end of file
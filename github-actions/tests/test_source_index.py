@@ -0,0 +1,55 @@
+"""Unit tests for BM25 source ranking over character bigrams"""
+from utils.source_index import SourceIndex, build_source_index, char_ngrams
+
+
+SOURCES = {
+    "academic": [
+        {"title": "爪が薄くなる原因と対策", "url": "https://a.example/1", "key_info": "栄養不足と乾燥"},
+        {"title": "髪のダメージケア", "url": "https://a.example/2", "key_info": "ヘアオイルの選び方"}
+    ],
+    "media": [
+        {"title": "爪の健康", "url": "https://b.example/1", "snippet": "薄い爪は乾燥しやすい"},
+        {"title": "爪が薄くなる原因と対策", "url": "https://a.example/1", "key_info": "転載記事"}
+    ],
+    "fallback": {"raw_response": "not a list", "parse_error": "ignored"}
+}
+
+
+def test_char_ngrams_normalize_width_and_skip_punctuation():
+    assert char_ngrams("ＡＢＣ、爪") == ["ab", "bc", "爪"]
+    assert char_ngrams("") == []
+
+
+def test_ranking_prefers_title_matches():
+    index = SourceIndex(SOURCES)
+    
+    results = index.search(["爪が薄い", "原因"])
+    
+    assert len(index) == 4
+    assert results[0]["title"] == "爪が薄くなる原因と対策"
+    assert results[0]["score"] > results[1]["score"]
+    assert "https://a.example/2" not in [result["url"] for result in results]
+
+
+def test_duplicate_urls_are_returned_once():
+    results = SourceIndex(SOURCES).search(["爪が薄くなる原因"])
+    
+    urls = [result["url"] for result in results]
+    assert len(urls) == len(set(urls))
+
+
+def test_limit_caps_the_results():
+    assert len(SourceIndex(SOURCES).search(["薄い爪"], limit=1)) == 1
+
+
+def test_empty_query_and_empty_index_return_nothing():
+    assert SourceIndex(SOURCES).search([]) == []
+    assert SourceIndex(SOURCES).search([""]) == []
+    assert SourceIndex({}).search(["爪"]) == []
+
+
+def test_build_from_research_payload():
+    index = build_source_index({"source_analysis": {"categorized_sources": SOURCES}})
+    
+    assert len(index) == 4
+    assert len(build_source_index({})) == 0
\ No newline at end of file
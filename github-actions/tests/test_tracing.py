@@ -0,0 +1,129 @@
+"""Unit tests for span tracing and its OTLP/JSON export"""
+import json
+import threading
+
+import pytest
+
+from utils import tracing
+from utils.tracing import NON_RECORDING_SPAN, STATUS_ERROR, STATUS_OK, Tracer, bind_context, span, traced
+from trace_report import build_tree, load_spans, summarize, to_chrome_trace
+
+
+@pytest.fixture
+def tracer(monkeypatch, tmp_path):
+    tracer = Tracer()
+    tracer.configure(tmp_path / "trace.json")
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+    return tracer
+
+
+def test_disabled_tracing_hands_out_the_no_op_span(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", Tracer())
+    
+    with span("phase") as active:
+        active.set_attribute("ignored", 1)
+    
+    assert active is NON_RECORDING_SPAN
+    assert tracing.get_tracer().export() is None
+
+
+def test_spans_nest_under_the_current_span(tracer):
+    with span("article", {"article.id": "a1"}) as root:
+        with span("phase") as phase:
+            with span("call"):
+                pass
+        with span("upload"):
+            pass
+    
+    by_name = {item.name: item for item in tracer.spans}
+    assert by_name["phase"].parent_span_id == root.span_id
+    assert by_name["call"].parent_span_id == phase.span_id
+    assert by_name["upload"].parent_span_id == root.span_id
+    assert root.parent_span_id is None
+    assert {item.trace_id for item in tracer.spans} == {root.trace_id}
+    assert tracing.current_span() is NON_RECORDING_SPAN
+
+
+def test_worker_threads_keep_their_parent_with_bind_context(tracer):
+    with span("article") as root:
+        thread = threading.Thread(target=bind_context(traced("threaded")(lambda: None)))
+        thread.start()
+        thread.join()
+    
+    threaded = next(item for item in tracer.spans if item.name == "threaded")
+    assert threaded.parent_span_id == root.span_id
+    assert threaded.attributes["thread.name"] == thread.name
+
+
+def test_errors_mark_the_span_and_propagate(tracer):
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError("boom")
+    
+    [failed] = tracer.spans
+    assert failed.status_code == STATUS_ERROR
+    assert failed.status_message == "ValueError: boom"
+
+
+def test_export_writes_the_otlp_json_layout(tracer, tmp_path):
+    with span("article", {"article.id": "a1", "count": 3, "ratio": 0.5, "ok": True, "tags": ["x", 1], "none": None}):
+        with span("phase"):
+            pass
+    
+    path = tracer.export()
+    document = json.loads(path.read_text(encoding="utf-8"))
+    
+    [resource] = document["resourceSpans"]
+    resource_attributes = {item["key"]: item["value"] for item in resource["resource"]["attributes"]}
+    assert resource_attributes["service.name"] == {"stringValue": "article-flow"}
+    [scope] = resource["scopeSpans"]
+    assert scope["scope"] == {"name": "article_flow.tracing"}
+    spans = {item["name"]: item for item in scope["spans"]}
+    article, phase = spans["article"], spans["phase"]
+    assert set(article) == {"traceId", "spanId", "name", "kind", "startTimeUnixNano", "endTimeUnixNano", "attributes", "status"}
+    assert len(article["traceId"]) == 32 and len(article["spanId"]) == 16
+    assert phase["parentSpanId"] == article["spanId"]
+    assert article["status"] == {"code": STATUS_OK}
+    assert int(article["endTimeUnixNano"]) >= int(phase["endTimeUnixNano"]) >= int(phase["startTimeUnixNano"])
+    attributes = {item["key"]: item["value"] for item in article["attributes"]}
+    assert attributes["article.id"] == {"stringValue": "a1"}
+    assert attributes["count"] == {"intValue": "3"}
+    assert attributes["ratio"] == {"doubleValue": 0.5}
+    assert attributes["ok"] == {"boolValue": True}
+    assert attributes["tags"] == {"arrayValue": {"values": [{"stringValue": "x"}, {"intValue": "1"}]}}
+    assert "none" not in attributes
+    # Exported spans are not written twice
+    assert tracer.export() is None
+
+
+def test_append_mode_adds_a_resource_per_process(tmp_path, monkeypatch):
+    path = tmp_path / "trace.json"
+    for _ in range(2):
+        tracer = Tracer()
+        tracer.configure(path, append=True)
+        monkeypatch.setattr(tracing, "_tracer", tracer)
+        with span("phase"):
+            pass
+        tracer.export()
+    
+    assert len(json.loads(path.read_text(encoding="utf-8"))["resourceSpans"]) == 2
+
+
+def test_trace_report_reads_the_export_back(tracer):
+    with span("article", {"article.id": "a1"}):
+        with pytest.raises(RuntimeError):
+            with span("phase"):
+                raise RuntimeError("failed")
+    
+    spans = load_spans(str(tracer.export()))
+    children = build_tree(spans)
+    
+    [root] = children[None]
+    assert root["attributes"]["article.id"] == "a1"
+    [child] = children[root["span_id"]]
+    assert child["name"] == "phase" and child["error"] and child["status_message"] == "RuntimeError: failed"
+    summary = {entry["name"]: entry for entry in summarize(spans, children)}
+    assert summary["phase"]["errors"] == 1
+    assert summary["article"]["self"] <= summary["article"]["total"]
+    events = [event for event in to_chrome_trace(spans, children)["traceEvents"] if event["ph"] == "X"]
+    assert [event["cat"] for event in events] == ["article", "phase"]
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""Unit tests for the validation report cache"""
+from generate_validation_report import ValidationReportGenerator
+
+
+def write_html(path, body):
+    path.write_text(f'<div class="article-content">{body}</div>', encoding="utf-8")
+
+
+def test_unchanged_content_reuses_cached_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    html_file = tmp_path / "final_article.html"
+    write_html(html_file, "<p>本文</p>")
+    generator = ValidationReportGenerator("article")
+    
+    generator.generate_initial_report(str(html_file))
+    generator.generate_post_conversion_report(str(html_file))
+    
+    assert generator.cache_stats == {"hits": 1, "misses": 1}
+
+
+def test_initial_step_forgets_later_steps_of_the_previous_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    html_file = tmp_path / "final_article.html"
+    write_html(html_file, "<p>first run</p>")
+    first = ValidationReportGenerator("article")
+    first.generate_initial_report(str(html_file))
+    first.generate_post_conversion_report(str(html_file))
+    
+    write_html(html_file, "<p>second run</p>")
+    second = ValidationReportGenerator("article")
+    second.generate_initial_report(str(html_file))
+    
+    assert list(second.cache["steps"]) == ["1"]
+    assert len(second.cache["results"]) == 1
\ No newline at end of file
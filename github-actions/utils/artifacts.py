@@ -0,0 +1,309 @@
+"""Typed models for the phase artifacts passed between scripts
+
+Each model is a slots dataclass covering the fields later phases rely on.
+Unknown keys are kept in `extra`, so `from_dict(...).to_dict()` round-trips
+an artifact without losing provider- or prompt-specific fields.
+
+`read_artifact` validates a file against its model as it is loaded, so a
+malformed artifact fails in the phase that reads it, with the offending path
+(e.g. `phase3_structure.json.main_sections[2].word_count_target`), instead of
+as a KeyError deep inside a later phase.
+"""
+from dataclasses import dataclass, field, fields, is_dataclass, MISSING
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union, get_args, get_origin, get_type_hints
+import logging
+
+from .file_utils import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactValidationError(ValueError):
+    """An artifact does not match its model"""
+    
+    def __init__(self, path: str, message: str):
+        self.path = path
+        super().__init__(f"{path}: {message}")
+
+
+_type_hints_cache: Dict[type, Dict[str, Any]] = {}
+
+
+def _type_name(hint: Any) -> str:
+    if get_origin(hint) is Union:
+        return " or ".join(_type_name(arg) for arg in get_args(hint) if arg is not type(None))
+    if get_origin(hint) is not None:
+        return get_origin(hint).__name__
+    return getattr(hint, "__name__", str(hint))
+
+
+def _convert(value: Any, hint: Any, path: str) -> Any:
+    """Check `value` against a type hint, building nested models"""
+    if hint is Any:
+        return value
+    
+    origin = get_origin(hint)
+    if origin is Union:
+        args = get_args(hint)
+        if value is None and type(None) in args:
+            return None
+        for arg in args:
+            if arg is type(None):
+                continue
+            try:
+                return _convert(value, arg, path)
+            except ArtifactValidationError:
+                continue
+        raise ArtifactValidationError(path, f"expected {_type_name(hint)}, got {type(value).__name__}")
+    
+    if origin is list:
+        if not isinstance(value, list):
+            raise ArtifactValidationError(path, f"expected list, got {type(value).__name__}")
+        item_hint = (get_args(hint) or (Any,))[0]
+        if item_hint is Any:
+            return value
+        return [_convert(item, item_hint, f"{path}[{index}]") for index, item in enumerate(value)]
+    
+    if origin is dict or hint is dict:
+        if not isinstance(value, dict):
+            raise ArtifactValidationError(path, f"expected object, got {type(value).__name__}")
+        return value
+    
+    if is_dataclass(hint):
+        return hint.from_dict(value, path)
+    
+    # bool is an int subclass, but True is never a valid count
+    if hint in (int, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or (hint is int and not isinstance(value, int)):
+            raise ArtifactValidationError(path, f"expected {hint.__name__}, got {type(value).__name__}")
+        return value
+    
+    if not isinstance(value, hint):
+        raise ArtifactValidationError(path, f"expected {_type_name(hint)}, got {type(value).__name__}")
+    return value
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, Artifact):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    return value
+
+
+class Artifact:
+    """Base class for artifact models; subclasses are `@dataclass(slots=True)` with an `extra` field"""
+    
+    __slots__ = ()
+    
+    @classmethod
+    def _hints(cls) -> Dict[str, Any]:
+        hints = _type_hints_cache.get(cls)
+        if hints is None:
+            hints = _type_hints_cache[cls] = get_type_hints(cls)
+        return hints
+    
+    @classmethod
+    def from_dict(cls, data: Any, path: Optional[str] = None):
+        """Validate a parsed JSON object and build the model"""
+        path = path or cls.__name__
+        if not isinstance(data, dict):
+            raise ArtifactValidationError(path, f"expected object, got {type(data).__name__}")
+        
+        hints = cls._hints()
+        known = set()
+        values = {}
+        for model_field in fields(cls):
+            if model_field.name == "extra":
+                continue
+            known.add(model_field.name)
+            if model_field.name in data:
+                values[model_field.name] = _convert(data[model_field.name], hints[model_field.name], f"{path}.{model_field.name}")
+            elif model_field.default is MISSING and model_field.default_factory is MISSING:
+                raise ArtifactValidationError(f"{path}.{model_field.name}", "missing required field")
+        
+        return cls(**values, extra={key: value for key, value in data.items() if key not in known})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain JSON-ready dict; optional fields left as None are omitted, as in the original artifact"""
+        data = {}
+        for model_field in fields(self):
+            if model_field.name == "extra":
+                continue
+            value = getattr(self, model_field.name)
+            if value is None and model_field.default is None:
+                continue
+            data[model_field.name] = _dump(value)
+        data.update(self.extra)
+        return data
+
+
+# Phase 1
+
+@dataclass(slots=True)
+class Analysis(Artifact):
+    """Claude's request analysis inside phase1_output.json"""
+    main_keyword: str
+    related_keywords: List[Any] = field(default_factory=list)
+    research_queries: List[Any] = field(default_factory=list)
+    key_points: List[Any] = field(default_factory=list)
+    content_type: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class RequestParams(Artifact):
+    """phase1_output.json: the request parameters plus the analysis"""
+    topic: str
+    analysis: Analysis
+    target_audience: Optional[str] = None
+    word_count: Optional[Union[int, str]] = None
+    store_url: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+# Phase 2
+
+@dataclass(slots=True)
+class SearchResult(Artifact):
+    """One search result (see research_engine.normalize_result_item)
+    
+    Some phase 2 scripts copy the LLM's JSON as is, so fields may be null and
+    `reliability_score` may be a numeric string. Later phases don't read these
+    fields, so they are not held to stricter types than the producers write.
+    """
+    url: Optional[str] = ""
+    title: Optional[str] = ""
+    snippet: Optional[str] = ""
+    source_type: Optional[str] = "media"
+    priority: Optional[str] = "medium"
+    reliability_score: Optional[Union[int, float, str]] = 5
+    key_findings: Optional[List[Any]] = field(default_factory=list)
+    publication_date: Optional[str] = ""
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class SearchRecord(Artifact):
+    """Results of one research query; failed queries carry `error`
+    
+    `provider` is only recorded by the research engine; the single-prompt
+    Gemini script has no per-query provider.
+    """
+    query: Optional[str]
+    provider: str = ""
+    results: List[SearchResult] = field(default_factory=list)
+    result_count: int = 0
+    timestamp: str = ""
+    error: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ResearchData(Artifact):
+    search_results: List[SearchRecord]
+    statistics: Dict[str, Any] = field(default_factory=dict)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class SourceAnalysis(Artifact):
+    categorized_sources: Dict[str, Any]
+    high_priority_sources: List[Any] = field(default_factory=list)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ResearchArtifact(Artifact):
+    """phase2_research.json"""
+    phase1_params: RequestParams
+    research_data: ResearchData
+    source_analysis: SourceAnalysis
+    research_queries: List[Any] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+# Phase 3
+
+@dataclass(slots=True)
+class Section(Artifact):
+    """One H2 section of the planned structure"""
+    section_id: Union[int, str]
+    h2_title: str
+    section_purpose: str
+    word_count_target: int
+    target_keywords: List[str] = field(default_factory=list)
+    subsections: List[Any] = field(default_factory=list)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class FaqSection(Artifact):
+    questions: List[Dict[str, Any]]
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class StructureArtifact(Artifact):
+    """phase3_structure.json"""
+    title: str
+    introduction: Dict[str, Any]
+    main_sections: List[Section]
+    faq_section: FaqSection
+    conclusion: Dict[str, Any]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    meta_description: Optional[str] = None
+    internal_linking_plan: List[Any] = field(default_factory=list)
+    image_requirements: List[Any] = field(default_factory=list)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+# Phase 4
+
+@dataclass(slots=True)
+class WrittenSection(Artifact):
+    """One written section in phase4_metadata.json"""
+    section_id: Union[int, str]
+    title: str
+    content: str
+    word_count: int
+    target_word_count: Optional[int] = None
+    keywords_used: Any = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ArticleMetadata(Artifact):
+    """phase4_metadata.json"""
+    title: str
+    total_word_count: int
+    sections: List[WrittenSection]
+    main_keyword: str = ""
+    target_word_count: Optional[int] = None
+    keyword_density: Optional[float] = None
+    keyword_analysis: Dict[str, Any] = field(default_factory=dict)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def validate_artifact(data: Dict[str, Any], model: type, name: Optional[str] = None) -> Dict[str, Any]:
+    """Raise ArtifactValidationError unless `data` matches `model`; return `data` unchanged"""
+    model.from_dict(data, name or model.__name__)
+    return data
+
+
+def read_artifact(file_path: Union[str, Path], model: type, typed: bool = False):
+    """Load and validate an artifact
+    
+    Returns the plain dict (what the phase functions take) unless `typed` is
+    set, in which case the model instance is returned.
+    """
+    data = read_json(file_path)
+    artifact = model.from_dict(data, Path(file_path).name)
+    return artifact if typed else data
+
+
+def write_artifact(artifact: Union[Artifact, Dict[str, Any]], file_path: Union[str, Path], compact: Optional[bool] = None) -> None:
+    """Write a model or dict through write_json (orjson when available)"""
+    write_json(artifact.to_dict() if isinstance(artifact, Artifact) else artifact, file_path, compact=compact)
\ No newline at end of file
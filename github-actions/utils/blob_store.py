@@ -0,0 +1,324 @@
+"""Content-addressed blob store for phase artifacts
+
+Blobs are stored once per SHA-256 of their content under
+`objects/<first two hex digits>/<hash>`, compressed with zstd when the
+`zstandard` package is installed and with zlib otherwise (the codec is
+detected from the blob's magic bytes, so stores written either way can be
+read back).
+
+JSON artifacts are split into a tree: every object or array that serializes
+to at least CHUNK_MIN_BYTES becomes its own blob and its parent refers to it
+as `{"$blob": "<hash>"}`. An artifact's own single-key `{"$blob": ...}` (or
+`{"$lit": ...}`) object is stored wrapped as `{"$lit": {...}}`, so it is never
+mistaken for a reference. Phase outputs that embed their inputs (e.g.
+`phase1_params` inside phase2_research.json, search records shared by the
+batch files and the merged research) therefore reference the same blobs
+instead of storing the bytes again.
+
+A run manifest maps each file of an output directory to its root hash, so
+the directory can be rebuilt anywhere the blobs are available.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+import logging
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .file_utils import ensure_dir, read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+BLOB_REF_KEY = "$blob"
+# Wraps artifact objects that would otherwise look like a reference
+LITERAL_KEY = "$lit"
+
+# Smaller values are cheaper inline than as a reference plus a blob file
+CHUNK_MIN_BYTES = 512
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+MANIFEST_VERSION = 1
+
+
+def canonical_json(value: Any) -> bytes:
+    """Serialization used for hashing: compact UTF-8, keys in their original order
+    
+    Keys are not sorted so unpacked artifacts keep their layout; the phases
+    build embedded inputs from the same dicts, so their key order matches.
+    """
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _is_ref(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and BLOB_REF_KEY in value
+
+
+def _is_literal(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and LITERAL_KEY in value
+
+
+class BlobStore:
+    """Deduplicating blob storage rooted at one directory (safe to share between threads)"""
+    
+    def __init__(self, root: Union[str, Path], codec: Optional[str] = None):
+        self.root = ensure_dir(root)
+        self.objects_dir = ensure_dir(self.root / "objects")
+        self.manifests_dir = ensure_dir(self.root / "manifests")
+        if codec is None:
+            codec = "zstd" if zstandard is not None else "zlib"
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+        self.codec = codec
+        self._lock = threading.Lock()
+        self._stats = {"blobs_written": 0, "blobs_reused": 0, "bytes_in": 0, "bytes_written": 0}
+    
+    def path_for(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+    
+    def has(self, digest: str) -> bool:
+        return self.path_for(digest).exists()
+    
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        return zlib.compress(data, ZLIB_LEVEL)
+    
+    @staticmethod
+    def _decompress(stored: bytes) -> bytes:
+        if stored.startswith(ZSTD_MAGIC):
+            if zstandard is None:
+                raise RuntimeError("Blob is zstd-compressed but the zstandard package is not installed")
+            return zstandard.ZstdDecompressor().decompressobj().decompress(stored)
+        return zlib.decompress(stored)
+    
+    def put_bytes(self, data: bytes) -> str:
+        """Store `data` unless a blob with the same content exists; return its hash"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        with self._lock:
+            self._stats["bytes_in"] += len(data)
+        
+        if path.exists():
+            with self._lock:
+                self._stats["blobs_reused"] += 1
+            return digest
+        
+        compressed = self._compress(data)
+        ensure_dir(path.parent)
+        # Write then rename, so concurrent writers of the same blob never expose a partial file
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{digest[:8]}.")
+        with os.fdopen(fd, "wb") as f:
+            f.write(compressed)
+        os.replace(temp_path, path)
+        
+        with self._lock:
+            self._stats["blobs_written"] += 1
+            self._stats["bytes_written"] += len(compressed)
+        return digest
+    
+    def get_bytes(self, digest: str) -> bytes:
+        path = self.path_for(digest)
+        if not path.exists():
+            raise KeyError(f"Blob {digest} not found in {self.root}")
+        return self._decompress(path.read_bytes())
+    
+    def remove(self, digest: str) -> int:
+        """Delete a blob; returns the stored bytes freed (0 if it didn't exist)"""
+        path = self.path_for(digest)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return 0
+        return size
+    
+    def put_json(self, value: Any) -> str:
+        """Store a JSON value as a blob tree and return the root hash"""
+        return self.put_bytes(canonical_json(self._split(value)))
+    
+    def _split(self, value: Any) -> Any:
+        """Replace large nested objects/arrays (children first) with blob references"""
+        if isinstance(value, dict):
+            node = {key: self._chunk(item) for key, item in value.items()}
+            if _is_ref(node) or _is_literal(node):
+                node = {LITERAL_KEY: node}
+        elif isinstance(value, list):
+            node = [self._chunk(item) for item in value]
+        else:
+            node = value
+        return node
+    
+    def _chunk(self, value: Any) -> Any:
+        if not isinstance(value, (dict, list)):
+            return value
+        node = self._split(value)
+        encoded = canonical_json(node)
+        if len(encoded) < CHUNK_MIN_BYTES:
+            return node
+        return {BLOB_REF_KEY: self.put_bytes(encoded)}
+    
+    def get_json(self, digest: str) -> Any:
+        """Load a blob tree written by `put_json`, resolving every reference"""
+        return self._resolve(json.loads(self.get_bytes(digest)))
+    
+    def _resolve(self, value: Any) -> Any:
+        if _is_ref(value):
+            return self.get_json(value[BLOB_REF_KEY])
+        if _is_literal(value):
+            return {key: self._resolve(item) for key, item in value[LITERAL_KEY].items()}
+        if isinstance(value, dict):
+            return {key: self._resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(item) for item in value]
+        return value
+    
+    def references(self, digest: str) -> List[str]:
+        """Hashes of every blob reachable from `digest` (including itself)"""
+        seen = []
+        stack = [digest]
+        visited = set()
+        while stack:
+            current = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            seen.append(current)
+            data = self.get_bytes(current)
+            if data[:1] not in (b"{", b"["):
+                continue
+            try:
+                value = json.loads(data)
+            except ValueError:
+                continue
+            nodes = [value]
+            while nodes:
+                node = nodes.pop()
+                if _is_ref(node):
+                    stack.append(node[BLOB_REF_KEY])
+                elif _is_literal(node):
+                    nodes.extend(node[LITERAL_KEY].values())
+                elif isinstance(node, dict):
+                    nodes.extend(node.values())
+                elif isinstance(node, list):
+                    nodes.extend(node)
+        return seen
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["reduction_ratio"] = round(stats["bytes_in"] / stats["bytes_written"], 2) if stats["bytes_written"] else None
+        return stats
+    
+    def disk_usage(self) -> Dict[str, int]:
+        """Blob count and stored bytes of the whole store"""
+        blobs = [path for path in self.objects_dir.glob("*/*") if not path.name.startswith(".")]
+        return {"blobs": len(blobs), "bytes": sum(path.stat().st_size for path in blobs)}
+
+
+def pack_directory(
+    store: BlobStore,
+    directory: Union[str, Path],
+    run_id: Optional[str] = None,
+    exclude: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Store every file of `directory` and write the run manifest
+    
+    JSON files are stored as blob trees, everything else as a single blob.
+    `exclude` holds relative paths or file/directory names to skip.
+    Returns the manifest, which is also saved as `manifests/<run_id>.json`.
+    """
+    directory = Path(directory)
+    run_id = run_id or directory.name
+    exclude = set(exclude or [])
+    before = store.stats()
+    
+    files = {}
+    for path in sorted(directory.rglob("*")):
+        relative = path.relative_to(directory).as_posix()
+        if not path.is_file() or relative in exclude or any(part in exclude for part in path.relative_to(directory).parts):
+            continue
+        size = path.stat().st_size
+        entry = {"size": size}
+        if path.suffix == ".json":
+            try:
+                entry.update(kind="json", hash=store.put_json(read_json(path)))
+            except ValueError:
+                entry.update(kind="raw", hash=store.put_bytes(path.read_bytes()))
+        else:
+            entry.update(kind="raw", hash=store.put_bytes(path.read_bytes()))
+        files[relative] = entry
+    
+    after = store.stats()
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "run_id": run_id,
+        "source_dir": str(directory),
+        "created_at": datetime.utcnow().isoformat(),
+        "codec": store.codec,
+        "files": files,
+        "stats": {
+            "files": len(files),
+            "bytes_in": sum(entry["size"] for entry in files.values()),
+            "blobs_written": after["blobs_written"] - before["blobs_written"],
+            "blobs_reused": after["blobs_reused"] - before["blobs_reused"],
+            "bytes_written": after["bytes_written"] - before["bytes_written"]
+        }
+    }
+    write_json(manifest, store.manifests_dir / f"{run_id}.json")
+    logger.info(
+        f"Packed {len(files)} files of {directory} into {store.root}: "
+        f"{manifest['stats']['bytes_in']} bytes in, {manifest['stats']['bytes_written']} bytes of new blobs"
+    )
+    return manifest
+
+
+def unpack_manifest(store: BlobStore, manifest: Union[str, Path, Dict[str, Any]], output_dir: Union[str, Path]) -> List[Path]:
+    """Rebuild the files recorded in a run manifest under `output_dir`"""
+    if not isinstance(manifest, dict):
+        manifest = read_json(manifest)
+    output_dir = ensure_dir(output_dir)
+    
+    written = []
+    for relative, entry in manifest["files"].items():
+        path = output_dir / relative
+        ensure_dir(path.parent)
+        if entry["kind"] == "json":
+            write_json(store.get_json(entry["hash"]), path)
+        else:
+            path.write_bytes(store.get_bytes(entry["hash"]))
+        written.append(path)
+    return written
+
+
+def export_blobs(store: BlobStore, manifest: Dict[str, Any], target: Union[str, Path], skip: Optional[set] = None) -> int:
+    """Copy the blobs a manifest needs (minus `skip`) into another store directory
+    
+    Used to ship only the blobs a downstream job doesn't have yet; returns the
+    number of blobs copied.
+    """
+    target_store = BlobStore(target, store.codec)
+    skip = skip or set()
+    copied = 0
+    for entry in manifest["files"].values():
+        for digest in store.references(entry["hash"]):
+            destination = target_store.path_for(digest)
+            if digest in skip or destination.exists():
+                continue
+            ensure_dir(destination.parent)
+            shutil.copy2(store.path_for(digest), destination)
+            copied += 1
+    write_json(manifest, target_store.manifests_dir / f"{manifest['run_id']}.json")
+    return copied
\ No newline at end of file
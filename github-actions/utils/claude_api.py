@@ -2,24 +2,37 @@
 import os
 import json
 import time
-from typing import Dict, List, Optional, Any
-from anthropic import Anthropic
+from typing import Callable, Dict, List, Optional, Any
 from tenacity import retry, stop_after_attempt, wait_exponential
 import logging
 
+from .config import Config
+from .model_routing import ModelRouter
+from .prompt_budget import estimate_tokens
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
 
 class ClaudeAPI:
-    """Wrapper for Claude API with retry logic and error handling"""
+    """Wrapper for Claude API with retry logic and error handling
+    
+    Each call's model is chosen by `router` from the task named in its
+    metadata (see utils/model_routing); `model` is the default tier's model.
+    """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, limiter=None, router: Optional[ModelRouter] = None):
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment")
         
+        # Imported here so scripts that never call Claude don't pay for the SDK import
+        from anthropic import Anthropic
         self.client = Anthropic(api_key=self.api_key)
-        self.model = "claude-3-5-sonnet-20241022"
+        self.router = router or ModelRouter.from_config(Config())
+        self.model = self.router.default_model
+        # Optional ProviderLimiter shared with other articles (batch mode)
+        self.limiter = limiter
         
     @retry(
         stop=stop_after_attempt(3),
@@ -34,20 +47,42 @@ class ClaudeAPI:
         metadata: Optional[Dict[str, Any]] = None
     ) -> str:
         """Generate completion with retry logic"""
+        task, tier, model = self.router.route(metadata)
+        start_time = time.time()
         try:
-            start_time = time.time()
-            
-            messages = [{"role": "user", "content": prompt}]
-            
-            response = self.client.messages.create(
-                model=self.model,
-                messages=messages,
-                system=system_prompt,
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
-            
-            elapsed_time = time.time() - start_time
+            with span("claude.completion", {
+                "llm.model": model,
+                "llm.task": task,
+                "llm.tier": tier,
+                "llm.max_tokens": max_tokens,
+                "article_flow.phase": (metadata or {}).get("phase"),
+                "prompt.version": (metadata or {}).get("prompt_version")
+            }) as call_span:
+                if self.limiter is not None:
+                    call_span.set_attribute("quota.wait_seconds", round(
+                        self.limiter.acquire(estimate_tokens(prompt) + estimate_tokens(system_prompt or "")), 3
+                    ))
+                
+                start_time = time.time()
+                
+                messages = [{"role": "user", "content": prompt}]
+                
+                response = self.client.messages.create(
+                    model=model,
+                    messages=messages,
+                    system=system_prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+                
+                elapsed_time = time.time() - start_time
+                self.router.record_call(task, model, elapsed_time)
+                usage = getattr(response, "usage", None)
+                if usage is not None:
+                    call_span.set_attributes({
+                        "llm.input_tokens": getattr(usage, "input_tokens", None),
+                        "llm.output_tokens": getattr(usage, "output_tokens", None)
+                    })
             
             # Log metadata
             if metadata:
@@ -59,18 +94,78 @@ class ClaudeAPI:
             return response.content[0].text
             
         except Exception as e:
+            self.router.record_call(task, model, time.time() - start_time, error=True)
             logger.error(f"Claude API error: {str(e)}")
             raise
     
-    def generate_with_structured_output(
+    def stream_completion(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
-        expected_format: Optional[Dict[str, Any]] = None,
-        **kwargs
-    ) -> Dict[str, Any]:
-        """Generate completion and parse as JSON"""
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        metadata: Optional[Dict[str, Any]] = None,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """Generate a completion, passing each text chunk to `on_text` as it arrives
         
+        Not retried, since chunks have already been handed out; callers fall
+        back to `generate_completion` on failure.
+        """
+        task, tier, model = self.router.route(metadata)
+        with span("claude.stream", {
+            "llm.model": model,
+            "llm.task": task,
+            "llm.tier": tier,
+            "llm.max_tokens": max_tokens,
+            "article_flow.phase": (metadata or {}).get("phase"),
+            "prompt.version": (metadata or {}).get("prompt_version")
+        }) as call_span:
+            if self.limiter is not None:
+                call_span.set_attribute("quota.wait_seconds", round(
+                    self.limiter.acquire(estimate_tokens(prompt) + estimate_tokens(system_prompt or "")), 3
+                ))
+            
+            start_time = time.time()
+            chunks = []
+            try:
+                with self.client.messages.stream(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    system=system_prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                ) as stream:
+                    for text in stream.text_stream:
+                        if not chunks:
+                            call_span.set_attribute("llm.time_to_first_token", round(time.time() - start_time, 3))
+                        chunks.append(text)
+                        if on_text is not None:
+                            on_text(text)
+                    usage = getattr(stream.get_final_message(), "usage", None)
+            except Exception:
+                self.router.record_call(task, model, time.time() - start_time, error=True)
+                raise
+            self.router.record_call(task, model, time.time() - start_time)
+            
+            if usage is not None:
+                call_span.set_attributes({
+                    "llm.input_tokens": getattr(usage, "input_tokens", None),
+                    "llm.output_tokens": getattr(usage, "output_tokens", None)
+                })
+        
+        if metadata:
+            logger.info(f"API stream completed in {time.time() - start_time:.2f}s", extra={"phase": metadata.get("phase")})
+        
+        return "".join(chunks)
+    
+    def _structured_request(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        expected_format: Optional[Dict[str, Any]]
+    ) -> tuple:
+        """Prompt and system prompt asking for JSON output"""
         # Add format instructions to prompt if provided
         if expected_format:
             format_instruction = f"\n\nPlease provide your response in the following JSON format:\n{json.dumps(expected_format, indent=2)}\n\nIMPORTANT: Return ONLY valid JSON without any additional text or markdown formatting."
@@ -79,13 +174,64 @@ class ClaudeAPI:
         # Add JSON-specific system prompt enhancement
         enhanced_system = system_prompt or ""
         enhanced_system += "\n\nAlways respond with valid JSON format only. Do not include any explanatory text outside the JSON structure."
+        return prompt, enhanced_system
+    
+    def generate_with_structured_output(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        expected_format: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Generate completion and parse as JSON"""
+        prompt, enhanced_system = self._structured_request(prompt, system_prompt, expected_format)
         
         response = self.generate_completion(
             prompt=prompt,
             system_prompt=enhanced_system,
             **kwargs
         )
+        return self._parse_and_score(response, kwargs.get("metadata"))
+    
+    def stream_with_structured_output(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        expected_format: Optional[Dict[str, Any]] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """`generate_with_structured_output`, streaming the raw JSON text to `on_text`
+        
+        If the stream fails, the request is repeated without streaming (with
+        the usual retries), so `on_text` may have seen only part of a response.
+        """
+        prompt, enhanced_system = self._structured_request(prompt, system_prompt, expected_format)
         
+        try:
+            response = self.stream_completion(prompt=prompt, system_prompt=enhanced_system, on_text=on_text, **kwargs)
+        except Exception as e:
+            logger.warning(f"Claude stream failed, retrying without streaming: {e}")
+            response = self.generate_completion(prompt=prompt, system_prompt=enhanced_system, **kwargs)
+        return self._parse_and_score(response, kwargs.get("metadata"))
+    
+    def _parse_and_score(self, response: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Parse a structured response, scoring the call's quality by whether it parsed"""
+        parsed = self.parse_structured_response(response)
+        self.record_quality(metadata, 0.0 if "parse_error" in parsed else 1.0)
+        return parsed
+    
+    def record_quality(self, metadata: Optional[Dict[str, Any]], score: float) -> None:
+        """Record a 0-1 quality score for a response to a call made with this metadata"""
+        task, _, model = self.router.route(metadata)
+        self.router.record_quality(task, model, score)
+    
+    def model_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-task model, latency and quality stats of the calls made so far"""
+        return self.router.stats()
+    
+    def parse_structured_response(self, response: str) -> Dict[str, Any]:
+        """Parse a JSON response, returning {"raw_response", "parse_error"} when it isn't valid"""
         # Try to extract JSON from response
         try:
             # Clean up common formatting issues
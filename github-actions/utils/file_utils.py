@@ -1,13 +1,22 @@
 """File handling utilities"""
 import os
 import json
+import math
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Union
+from typing import Dict, Any, Optional, Union
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Set to 1 to write artifacts without indentation (smaller files, faster dumps)
+COMPACT_JSON_ENV_VAR = "ARTICLE_FLOW_COMPACT_JSON"
+
 
 def ensure_dir(path: Union[str, Path]) -> Path:
     """Ensure directory exists"""
@@ -17,16 +26,59 @@ def ensure_dir(path: Union[str, Path]) -> Path:
 
 
 def read_json(file_path: Union[str, Path]) -> Dict[str, Any]:
-    """Read JSON file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
-
-
-def write_json(data: Dict[str, Any], file_path: Union[str, Path], indent: int = 2) -> None:
-    """Write JSON file"""
+    """Read JSON file (with orjson when installed)"""
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which json.dump writes; let json decide
+            pass
+    return json.loads(raw.decode('utf-8'))
+
+
+def _has_non_finite(value: Any) -> bool:
+    """Whether the data holds NaN or Infinity anywhere"""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(item) for item in value)
+    return False
+
+
+def write_json(data: Dict[str, Any], file_path: Union[str, Path], indent: Optional[int] = 2, compact: Optional[bool] = None) -> None:
+    """Write JSON file
+    
+    `compact` (default: ARTICLE_FLOW_COMPACT_JSON) drops the indentation.
+    orjson is used when installed and the indent is 2 or none. Data orjson
+    can't encode (non-JSON types) or would silently write as null (NaN and
+    Infinity) goes through json instead. orjson formats some floats
+    differently from json (1e-05 vs 0.00001), so files are equivalent but not
+    always byte-identical to json.dump output.
+    """
     ensure_dir(Path(file_path).parent)
+    if compact is None:
+        compact = os.environ.get(COMPACT_JSON_ENV_VAR, "").lower() in ("1", "true", "yes")
+    if compact:
+        indent = None
+    
+    if orjson is not None and indent in (2, None) and not _has_non_finite(data):
+        options = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            encoded = orjson.dumps(data, option=options)
+        except TypeError:
+            encoded = None
+        if encoded is not None:
+            with open(file_path, 'wb') as f:
+                f.write(encoded)
+            logger.info(f"Wrote JSON to {file_path}")
+            return
+    
     with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=indent)
+        json.dump(data, f, ensure_ascii=False, indent=indent, separators=(',', ':') if indent is None else None)
     logger.info(f"Wrote JSON to {file_path}")
 
 
@@ -59,19 +111,9 @@ def write_text(content: str, file_path: Union[str, Path]) -> None:
 
 
 def read_prompt(prompt_name: str) -> str:
-    """Read prompt template from prompts directory"""
-    # Try multiple possible locations
-    possible_paths = [
-        Path("prompts") / f"{prompt_name}.md",
-        Path("..") / "prompts" / f"{prompt_name}.md",
-        Path("/mnt/c/article-flow/prompts") / f"{prompt_name}.md"
-    ]
-    
-    for path in possible_paths:
-        if path.exists():
-            return read_text(path)
-    
-    raise FileNotFoundError(f"Prompt template '{prompt_name}' not found in any of: {possible_paths}")
+    """Read prompt template (loaded once per process by utils.prompt_registry)"""
+    from .prompt_registry import get_prompt
+    return get_prompt(prompt_name).text
 
 
 def get_output_path(output_dir: Union[str, Path], filename: str) -> Path:
@@ -0,0 +1,133 @@
+"""Input fingerprints and stored phase results for incremental pipeline runs
+
+Each phase of article_flow declares what its output depends on (upstream
+results, prompt templates, config files, options, code modules, the model).
+Every input is hashed, and the phase is skipped when all hashes match the
+ones recorded for the stored result in the same output directory, the way
+make skips a target whose prerequisites are unchanged.
+
+State lives in `<output_dir>/.article_flow/`: `phases.json` holds the input
+hashes per phase, and results are kept in a blob store next to it, so a
+reused phase hands downstream phases exactly what it returned last time.
+"""
+import hashlib
+import importlib
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Union
+import logging
+
+from .blob_store import BlobStore
+from .file_utils import read_json, write_json
+from .prompt_registry import get_prompt, PromptTemplateError
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR_NAME = ".article_flow"
+STATE_VERSION = 1
+
+MISSING = "missing"
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_value(value: Any) -> str:
+    """Hash of a JSON-like value; key order does not matter"""
+    return hash_bytes(json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    path = Path(path)
+    return hash_bytes(path.read_bytes()) if path.is_file() else MISSING
+
+
+def hash_module(module_name: str) -> str:
+    """Hash of a module's source file, so code changes invalidate the phases using it"""
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        return MISSING
+    return hash_file(module.__file__) if getattr(module, "__file__", None) else MISSING
+
+
+def hash_prompt(prompt_name: str) -> str:
+    try:
+        return get_prompt(prompt_name).version
+    except (FileNotFoundError, PromptTemplateError):
+        return MISSING
+
+
+class PhaseState:
+    """Input hashes and results of the last successful run of each phase in one output directory"""
+    
+    def __init__(self, output_dir: Union[str, Path]):
+        self.output_dir = Path(output_dir)
+        self.state_dir = self.output_dir / STATE_DIR_NAME
+        self.state_file = self.state_dir / "phases.json"
+        self.store = BlobStore(self.state_dir / "blobs")
+        self._lock = threading.Lock()
+        
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        if self.state_file.exists():
+            try:
+                state = read_json(self.state_file)
+                if state.get("version") == STATE_VERSION:
+                    self.phases = state.get("phases", {})
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable phase state {self.state_file}: {e}")
+    
+    def lookup(self, name: str, inputs: Dict[str, Optional[str]]) -> Tuple[bool, str]:
+        """Whether the stored result of `name` can be reused, and why (not)"""
+        entry = self.phases.get(name)
+        if entry is None:
+            return False, "no stored result"
+        if any(value is None for value in inputs.values()):
+            unknown = sorted(key for key, value in inputs.items() if value is None)
+            return False, f"unknown inputs: {', '.join(unknown)}"
+        
+        stored = entry["inputs"]
+        changed = sorted(key for key in set(stored) | set(inputs) if stored.get(key) != inputs.get(key))
+        if changed:
+            return False, f"changed: {', '.join(changed)}"
+        
+        missing = [output for output in entry.get("outputs", []) if not (self.output_dir / output).exists()]
+        if missing:
+            return False, f"missing outputs: {', '.join(missing)}"
+        if not self.store.has(entry["result"]):
+            return False, "stored result lost"
+        return True, "inputs unchanged"
+    
+    def load_result(self, name: str) -> Any:
+        return self.store.get_json(self.phases[name]["result"])
+    
+    def result_hash(self, name: str) -> Optional[str]:
+        entry = self.phases.get(name)
+        return entry["result"] if entry else None
+    
+    def record(self, name: str, inputs: Dict[str, Optional[str]], result: Any, outputs: List[str]) -> Optional[str]:
+        """Store a phase result under its inputs; returns the result hash (None if it can't be stored)"""
+        try:
+            result_hash = self.store.put_json(result)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Result of phase {name} is not JSON-serializable, it will always re-run: {e}")
+            with self._lock:
+                self.phases.pop(name, None)
+                self._save()
+            return None
+        
+        with self._lock:
+            self.phases[name] = {
+                "inputs": inputs,
+                "result": result_hash,
+                "outputs": [output for output in outputs if (self.output_dir / output).exists()],
+                "recorded_at": datetime.utcnow().isoformat()
+            }
+            self._save()
+        return result_hash
+    
+    def _save(self) -> None:
+        write_json({"version": STATE_VERSION, "phases": self.phases}, self.state_file)
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""Incremental extraction of array items from a JSON object that is still streaming in"""
+import json
+from typing import Any, Callable, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayItemStream:
+    """Call `on_item` with each element of a top-level array as soon as it is complete
+    
+    Feed the response text chunk by chunk. Only `{...}` elements of the array
+    stored under `key` in the outermost object are reported, each parsed on
+    its own; text before the first `{` (e.g. a ```json fence) is skipped.
+    """
+    
+    def __init__(self, key: str, on_item: Callable[[Any], None]):
+        self.key = key
+        self.on_item = on_item
+        self.items: List[Any] = []
+        
+        self._buffer: List[str] = []
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expect_key = False
+        self._last_key = None
+        self._in_target = False
+        self._item_start = None
+    
+    def feed(self, chunk: str) -> None:
+        for char in chunk:
+            self._buffer.append(char)
+            self._scan(char, self._position)
+            self._position += 1
+    
+    def _text(self, start: int, end: int) -> str:
+        return "".join(self._buffer[start:end])
+    
+    def _scan(self, char: str, index: int) -> None:
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._depth == 1 and self._expect_key:
+                    self._last_key = json.loads(self._text(self._string_start, index + 1))
+                    self._expect_key = False
+            return
+        
+        if char == '"':
+            if self._depth > 0:
+                self._in_string = True
+                self._string_start = index
+        elif char in "{[":
+            if self._depth == 0 and char != "{":
+                return
+            self._depth += 1
+            if self._depth == 1:
+                self._expect_key = True
+            elif self._depth == 2 and char == "[" and self._last_key == self.key:
+                self._in_target = True
+            elif self._depth == 3 and self._in_target and char == "{":
+                self._item_start = index
+        elif char in "}]":
+            if self._depth == 0:
+                return
+            if self._depth == 3 and self._item_start is not None and char == "}":
+                self._emit(self._text(self._item_start, index + 1))
+                self._item_start = None
+            elif self._depth == 2 and char == "]":
+                self._in_target = False
+            self._depth -= 1
+        elif char == "," and self._depth == 1:
+            self._expect_key = True
+    
+    def _emit(self, text: str) -> None:
+        try:
+            item = json.loads(text)
+        except ValueError as e:
+            logger.debug(f"Skipping unparseable streamed '{self.key}' item: {e}")
+            return
+        self.items.append(item)
+        self.on_item(item)
\ No newline at end of file
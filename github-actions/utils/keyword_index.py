@@ -0,0 +1,123 @@
+"""Keyword counting utilities based on an Aho-Corasick automaton"""
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+# Characters ignored when counting Japanese article length
+NON_COUNTED_CHARS_PATTERN = re.compile(r'[\s\n。、！？「」『』（）【】〈〉《》・…]')
+
+
+def count_japanese_characters(text: str) -> int:
+    """Count characters in Japanese text (excluding spaces and punctuation)"""
+    return len(NON_COUNTED_CHARS_PATTERN.sub('', text))
+
+
+class KeywordIndex:
+    """Count occurrences of many keywords in a single pass over the text
+    
+    Matching is case-insensitive. Counts follow ``str.count`` semantics, i.e.
+    occurrences of the same keyword never overlap, while different keywords
+    may overlap each other (e.g. "爪ケア" and "ケア").
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        # Preserve the caller's order and spelling, drop empties and duplicates
+        self.keywords: List[str] = []
+        seen = set()
+        for keyword in keywords:
+            if not keyword:
+                continue
+            key = keyword.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            self.keywords.append(keyword)
+        
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._build()
+    
+    def _build(self) -> None:
+        """Build the trie, failure links and output lists"""
+        for keyword_id, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword.lower():
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(keyword_id)
+        
+        # Breadth-first traversal to compute failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+    
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """Return start offsets of every keyword occurrence in the text"""
+        offsets: Dict[str, List[int]] = {keyword: [] for keyword in self.keywords}
+        if not self.keywords or not text:
+            return offsets
+        
+        lengths = [len(keyword.lower()) for keyword in self.keywords]
+        # End offset of the last accepted match per keyword (non-overlapping)
+        last_end = [0] * len(self.keywords)
+        goto, fail, output = self._goto, self._fail, self._output
+        
+        node = 0
+        for position, char in enumerate(text.lower()):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword_id in output[node]:
+                start = position - lengths[keyword_id] + 1
+                if start >= last_end[keyword_id]:
+                    offsets[self.keywords[keyword_id]].append(start)
+                    last_end[keyword_id] = position + 1
+        
+        return offsets
+    
+    def count(self, text: str) -> Dict[str, int]:
+        """Return occurrence counts for every keyword"""
+        return {keyword: len(found) for keyword, found in self.find_all(text).items()}
+    
+    def density(self, text: str, offsets: Optional[Dict[str, List[int]]] = None) -> Dict[str, float]:
+        """Return keyword density percentages relative to the Japanese character count"""
+        char_count = count_japanese_characters(text)
+        if offsets is None:
+            offsets = self.find_all(text)
+        
+        densities = {}
+        for keyword, found in offsets.items():
+            densities[keyword] = (len(found) * len(keyword) / char_count) * 100 if char_count else 0.0
+        return densities
+
+
+def build_density_heatmap(
+    offsets: Dict[str, List[int]],
+    text_length: int,
+    buckets: int = 20
+) -> Dict[str, List[int]]:
+    """Bucket keyword offsets into equal-width slices of the text for heatmaps"""
+    heatmap = {}
+    if text_length <= 0 or buckets <= 0:
+        return {keyword: [] for keyword in offsets}
+    
+    for keyword, found in offsets.items():
+        row = [0] * buckets
+        for offset in found:
+            row[min(offset * buckets // text_length, buckets - 1)] += 1
+        heatmap[keyword] = row
+    return heatmap
\ No newline at end of file
@@ -1,10 +1,17 @@
 """Logging configuration and utilities"""
 import logging
+import os
 import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
+from .tracing import start_span, end_span, current_span
+
+# Open phase spans keyed by (thread, phase name); phases of different articles can run at once
+_phase_spans = {}
+
 
 def setup_logging(
     name: str,
@@ -47,6 +54,10 @@ def log_phase_start(logger: logging.Logger, phase: str, metadata: dict = None):
     if metadata:
         logger.info(f"Phase metadata: {metadata}")
     
+    _phase_spans[(threading.get_ident(), phase)] = start_span(
+        phase, {"phase.name": phase, "article.id": getattr(logger, "extra", {}).get("article_id")}
+    )
+    
     # GitHub Actions group
     print(f"::group::{phase}")
 
@@ -56,6 +67,10 @@ def log_phase_end(logger: logging.Logger, phase: str, success: bool = True):
     status = "completed successfully" if success else "failed"
     logger.info(f"Phase {phase} {status}")
     
+    span = _phase_spans.pop((threading.get_ident(), phase), None)
+    if span is not None:
+        end_span(span, None if success else "phase failed")
+    
     # End GitHub Actions group
     print("::endgroup::")
 
@@ -79,6 +94,10 @@ def log_metric(logger: logging.Logger, metric_name: str, value: any, unit: str =
     """Log a metric value"""
     unit_str = f" {unit}" if unit else ""
     logger.info(f"Metric - {metric_name}: {value}{unit_str}")
+    current_span().set_attribute(f"metric.{metric_name}", value)
     
-    # Output as GitHub Actions output
-    print(f"::set-output name={metric_name}::{value}")
\ No newline at end of file
+    # Output as GitHub Actions step output (::set-output is deprecated)
+    output_file = os.environ.get("GITHUB_OUTPUT")
+    if output_file:
+        with open(output_file, 'a', encoding='utf-8') as f:
+            f.write(f"{metric_name}={value}\n")
\ No newline at end of file
@@ -0,0 +1,388 @@
+"""Deterministic offline stand-ins for Claude, search providers and Google Drive
+
+Used by the pipeline benchmark to exercise phases end to end without a
+network. Every mock takes a MockBehavior that injects latency and errors and
+counts calls and bytes. Latency and error decisions are derived from a hash of
+the seed and the request, so they do not depend on thread scheduling.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+import logging
+
+from .claude_api import ClaudeAPI
+from .model_routing import ModelRouter
+from .prompt_budget import estimate_tokens
+from .research_engine import ResearchProvider, SearchError
+
+logger = logging.getLogger(__name__)
+
+
+class MockAPIError(Exception):
+    """Injected provider failure"""
+
+
+class MockBehavior:
+    """Latency/error injection and call accounting for one mock provider"""
+    
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.calls = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._occurrences: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def _draws(self, key: str) -> tuple:
+        """Two deterministic values in [0, 1) for the n-th occurrence of a request"""
+        with self._lock:
+            occurrence = self._occurrences.get(key, 0)
+            self._occurrences[key] = occurrence + 1
+        digest = hashlib.blake2b(f"{self.seed}:{occurrence}:{key}".encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little") / 2 ** 64, int.from_bytes(digest[8:], "little") / 2 ** 64
+    
+    def begin(self, key: str, bytes_sent: int) -> float:
+        """Record a call and return its simulated latency; raises on an injected error"""
+        error_draw, jitter_draw = self._draws(key)
+        with self._lock:
+            self.calls += 1
+            self.bytes_sent += bytes_sent
+            if error_draw < self.error_rate:
+                self.errors += 1
+                failed = True
+            else:
+                failed = False
+        if failed:
+            raise MockAPIError(f"Injected error for {key[:60]!r}")
+        return max(0.0, self.latency + self.jitter * (2 * jitter_draw - 1))
+    
+    def finish(self, bytes_received: int) -> None:
+        with self._lock:
+            self.bytes_received += bytes_received
+    
+    def stats(self) -> Dict[str, Any]:
+        """Call and byte counters for the benchmark report"""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received
+        }
+
+
+# Mock Claude
+
+MOCK_FAQ_COUNT = 7
+MOCK_SECTION_COUNT = 6
+
+# Streamed mock completions arrive in this many chunks
+MOCK_STREAM_CHUNKS = 20
+
+# Model names the mock Claude client routes to
+MOCK_MODEL_TIERS = {"strong": "mock-claude", "fast": "mock-claude-fast"}
+
+
+def _mock_analysis(topic: str) -> Dict[str, Any]:
+    return {
+        "main_keyword": topic,
+        "related_keywords": [f"{topic} 効果", f"{topic} 方法", f"{topic} 注意点", f"{topic} 比較"],
+        "search_intent": "informational",
+        "content_type": "guide",
+        "tone": "friendly",
+        "key_points": [f"{topic}の基礎知識", f"{topic}の正しい方法", f"{topic}のよくある誤解"],
+        "research_queries": [f"{topic} {aspect}" for aspect in ["効果", "研究", "統計", "ガイドライン", "リスク"]],
+        "competitor_analysis_needed": False,
+        "local_seo_focus": False,
+        "estimated_sections": MOCK_SECTION_COUNT
+    }
+
+
+def _mock_queries(topic: str) -> Dict[str, Any]:
+    categories = {
+        "technical_queries": ["仕組み", "成分", "メカニズム"],
+        "academic_queries": ["論文", "臨床試験", "メタ分析"],
+        "practical_queries": ["やり方", "頻度", "期間"],
+        "local_queries": ["おすすめ 店舗", "料金 相場"],
+        "competitor_queries": ["比較", "口コミ"],
+        "statistics_queries": ["統計", "調査 データ", "市場規模"]
+    }
+    return {name: [f"{topic} {aspect}" for aspect in aspects] for name, aspects in categories.items()}
+
+
+def _mock_categorized_sources(topic: str) -> Dict[str, Any]:
+    domains = {
+        "government_sources": "www.mhlw.go.jp",
+        "academic_sources": "www.u-tokyo.ac.jp",
+        "medical_sources": "www.dermatol.or.jp",
+        "industry_sources": "www.jcia.org",
+        "media_sources": "www.nikkei.com"
+    }
+    return {
+        category: [
+            {"url": f"https://{domain}/{category}/{i}", "title": f"{topic}に関する資料 {i}", "key_info": f"{topic}の要点 {i}"}
+            for i in range(1, 3)
+        ]
+        for category, domain in domains.items()
+    }
+
+
+def _mock_structure(topic: str) -> Dict[str, Any]:
+    word_target = 3200 // MOCK_SECTION_COUNT
+    return {
+        "title": f"{topic}の完全ガイド",
+        "meta_description": f"{topic}について、効果・方法・注意点を根拠とともに解説します。",
+        "introduction": {
+            "hook": f"{topic}に興味はありませんか？",
+            "background": f"{topic}は近年注目されています。",
+            "thesis": f"正しい知識で{topic}を活用しましょう。",
+            "preview": [f"セクション{i}" for i in range(1, MOCK_SECTION_COUNT + 1)]
+        },
+        "main_sections": [
+            {
+                "h2_title": f"{topic}のポイント{i}",
+                "section_id": f"section_{i}",
+                "subsections": [
+                    {"h3_title": f"ポイント{i}-{j}", "key_points": ["要点"], "evidence_needed": ["統計"], "word_count_target": word_target // 2}
+                    for j in range(1, 3)
+                ],
+                "section_purpose": f"{topic}の観点{i}を説明する",
+                "target_keywords": [topic, f"{topic} ポイント{i}"],
+                "word_count_target": word_target
+            }
+            for i in range(1, MOCK_SECTION_COUNT + 1)
+        ],
+        "faq_section": {
+            "questions": [
+                {"question": f"{topic}に関する質問{i}は？", "answer_outline": f"回答{i}", "evidence_source": "厚生労働省"}
+                for i in range(1, MOCK_FAQ_COUNT + 1)
+            ]
+        },
+        "conclusion": {
+            "summary_points": ["要点1", "要点2"],
+            "call_to_action": "まずは試してみましょう",
+            "future_outlook": "今後の研究に期待"
+        },
+        "internal_linking_plan": [{"anchor_text": topic, "target_section": "section_1", "purpose": "回遊"}],
+        "image_requirements": [{"placement": "hero", "type": "hero", "description": topic, "alt_text": topic}]
+    }
+
+
+def _mock_markdown(label: str, max_tokens: int) -> str:
+    """Japanese body text sized to roughly a third of the token allowance"""
+    paragraph = f"{label}について、公的機関の資料をもとに分かりやすく解説します。正しい知識を身につけることが大切です。"
+    paragraphs = [paragraph] * max(1, (max_tokens // 3) // len(paragraph))
+    lines = ["\n\n".join(paragraphs), "", "1. 基本を確認する", "2. 継続して取り組む", "3. 専門家に相談する", ""]
+    lines.append('[blog_card url="https://www.mhlw.go.jp/stf/index.html"]')
+    return "\n".join(lines)
+
+
+class MockClaudeAPI(ClaudeAPI):
+    """ClaudeAPI stand-in that answers each pipeline call with canned content
+    
+    Responses are chosen by the `metadata["phase"]` every pipeline call
+    passes, so JSON parsing in `generate_with_structured_output` runs exactly
+    as it does against the real API.
+    """
+    
+    def __init__(
+        self,
+        topic: str = "",
+        behavior: Optional[MockBehavior] = None,
+        limiter=None,
+        fast_latency_factor: float = 1.0,
+        router: Optional[ModelRouter] = None
+    ):
+        # Deliberately skips ClaudeAPI.__init__: no API key or SDK client
+        self.api_key = "mock"
+        self.client = None
+        # Default routing policy with mock model names; calls routed to the fast tier
+        # take `fast_latency_factor` times the configured latency
+        self.router = router or ModelRouter(tiers=MOCK_MODEL_TIERS)
+        self.model = self.router.default_model
+        self.fast_latency_factor = fast_latency_factor
+        self.limiter = limiter
+        self.topic = topic
+        self.behavior = behavior or MockBehavior()
+    
+    def _latency(self, metadata: Dict[str, Any], request: str) -> tuple:
+        """(task, model, seconds) for a call"""
+        task, tier, model = self.router.route(metadata)
+        try:
+            latency = self.behavior.begin(
+                f"{metadata.get('phase', '')}:{metadata.get('section', '')}:{request}", len(request.encode("utf-8"))
+            )
+        except MockAPIError:
+            self.router.record_call(task, model, 0.0, error=True)
+            raise
+        return task, model, latency * (self.fast_latency_factor if tier == "fast" else 1.0)
+    
+    def _json_response(self, phase: str, metadata: Dict[str, Any], prompt: str) -> Optional[Dict[str, Any]]:
+        topic = self.topic or "テーマ"
+        if phase == "request_analysis":
+            return _mock_analysis(topic)
+        if phase == "research_query_generation":
+            return _mock_queries(topic)
+        if phase == "source_categorization":
+            return _mock_categorized_sources(topic)
+        if phase == "structure_planning":
+            return _mock_structure(topic)
+        if phase == "keyword_generation":
+            section = metadata.get("section", "")
+            return {"keywords": [f"{topic} {section} {i}" for i in range(1, 6)]}
+        return None
+    
+    def generate_completion(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Return a canned completion after the configured latency"""
+        metadata = metadata or {}
+        phase = metadata.get("phase", "")
+        
+        if self.limiter is not None:
+            self.limiter.acquire(estimate_tokens(prompt) + estimate_tokens(system_prompt or ""))
+        
+        request = (system_prompt or "") + prompt
+        task, model, latency = self._latency(metadata, request)
+        time.sleep(latency)
+        self.router.record_call(task, model, latency)
+        
+        payload = self._json_response(phase, metadata, prompt)
+        if payload is not None:
+            response = json.dumps(payload, ensure_ascii=False)
+        else:
+            response = _mock_markdown(str(metadata.get("section") or self.topic), max_tokens)
+        
+        self.behavior.finish(len(response.encode("utf-8")))
+        return response
+    
+    def stream_completion(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+        metadata: Optional[Dict[str, Any]] = None,
+        on_text=None
+    ) -> str:
+        """Hand out the canned completion in chunks spread over the configured latency"""
+        metadata = metadata or {}
+        phase = metadata.get("phase", "")
+        
+        if self.limiter is not None:
+            self.limiter.acquire(estimate_tokens(prompt) + estimate_tokens(system_prompt or ""))
+        
+        request = (system_prompt or "") + prompt
+        task, model, latency = self._latency(metadata, request)
+        
+        payload = self._json_response(phase, metadata, prompt)
+        if payload is not None:
+            response = json.dumps(payload, ensure_ascii=False)
+        else:
+            response = _mock_markdown(str(metadata.get("section") or self.topic), max_tokens)
+        
+        chunk_size = max(1, len(response) // MOCK_STREAM_CHUNKS + 1)
+        for start in range(0, len(response), chunk_size):
+            time.sleep(latency / MOCK_STREAM_CHUNKS)
+            if on_text is not None:
+                on_text(response[start:start + chunk_size])
+        self.router.record_call(task, model, latency)
+        
+        self.behavior.finish(len(response.encode("utf-8")))
+        return response
+
+
+# Mock search
+
+class MockSearchProvider(ResearchProvider):
+    """Research provider returning deterministic results for any query
+    
+    `cache_key` makes one class stand in for Bing ("bing") or Gemini
+    ("gemini_sdk:mock"), e.g. to benchmark failover between them.
+    """
+    
+    name = "mock_search"
+    
+    def __init__(self, cache_key: str = "bing", behavior: Optional[MockBehavior] = None, results_per_query: int = 5, **quota):
+        super().__init__(**quota)
+        self._cache_key = cache_key
+        self.behavior = behavior or MockBehavior()
+        self.results_per_query = results_per_query
+    
+    @property
+    def cache_key(self) -> str:
+        return self._cache_key
+    
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        try:
+            latency = self.behavior.begin(f"{self._cache_key}:{query}", len(query.encode("utf-8")))
+        except MockAPIError as e:
+            raise SearchError(str(e))
+        await asyncio.sleep(latency)
+        
+        slug = hashlib.blake2b(query.encode("utf-8"), digest_size=4).hexdigest()
+        domains = ["www.mhlw.go.jp", "www.u-tokyo.ac.jp", "www.dermatol.or.jp", "www.jcia.org", "www.nikkei.com"]
+        results = [
+            {
+                "url": f"https://{domains[i % len(domains)]}/{slug}/{i}",
+                "title": f"{query} - 資料{i + 1}",
+                "snippet": f"{query}に関する調査結果の概要です。",
+                "priority": "very_high" if i < 2 else "medium",
+                "source_type": "government" if i == 0 else "media",
+                "reliability_score": 9 - i
+            }
+            for i in range(self.results_per_query)
+        ]
+        self.behavior.finish(len(json.dumps(results, ensure_ascii=False).encode("utf-8")))
+        return results
+
+
+# Mock Drive
+
+class MockDriveUploader:
+    """GoogleDriveUploader stand-in that only counts uploaded bytes"""
+    
+    def __init__(self, behavior: Optional[MockBehavior] = None):
+        self.behavior = behavior or MockBehavior()
+        self.files: List[Dict[str, Any]] = []
+    
+    def create_folder(self, name: str, parent_id: Optional[str] = None) -> str:
+        time.sleep(self.behavior.begin(f"folder:{name}", len(name.encode("utf-8"))))
+        return f"mock-folder-{hashlib.blake2b(name.encode('utf-8'), digest_size=4).hexdigest()}"
+    
+    def upload_file(
+        self,
+        file_path: Path,
+        folder_id: str,
+        file_name: Optional[str] = None,
+        mime_type: Optional[str] = None
+    ) -> Dict[str, str]:
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        file_name = file_name or file_path.name
+        time.sleep(self.behavior.begin(f"upload:{file_name}", file_path.stat().st_size))
+        file_id = f"mock-{hashlib.blake2b(file_name.encode('utf-8'), digest_size=6).hexdigest()}"
+        self.files.append({"id": file_id, "name": file_name, "folder_id": folder_id})
+        self.behavior.finish(0)
+        return {
+            "id": file_id,
+            "name": file_name,
+            "webViewLink": f"https://drive.example/{file_id}/view",
+            "webContentLink": f"https://drive.example/{file_id}/download"
+        }
+    
+    def set_permissions(self, file_id: str, permission_type: str = 'anyone', role: str = 'reader'):
+        time.sleep(self.behavior.begin(f"permissions:{file_id}", 0))
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""Route Claude calls to model tiers by task type and record per-task stats
+
+A task is named by the `task` (or, failing that, `phase`) key of the call
+metadata the pipeline already passes. Each task maps to a tier, and each tier
+to a model, so short structured subtasks (request analysis, source
+categorization, section keywords, FAQ answers) can run on a fast model while
+long-form writing stays on the strong one.
+
+The policy can be changed with a `model_routing` config file:
+
+    tiers:
+      strong: claude-3-5-sonnet-20241022
+      fast: claude-3-5-haiku-20241022
+    default_tier: strong
+    tasks:            # task -> tier
+      faq_answer: fast
+    overrides:        # task -> model, bypassing its tier
+      request_analysis: claude-3-5-sonnet-20241022
+"""
+import threading
+from typing import Dict, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIERS = {
+    "strong": "claude-3-5-sonnet-20241022",
+    "fast": "claude-3-5-haiku-20241022"
+}
+
+DEFAULT_TIER = "strong"
+
+# Short, JSON-shaped or length-capped subtasks; everything else uses the default tier
+DEFAULT_TASK_TIERS = {
+    "request_analysis": "fast",
+    "source_categorization": "fast",
+    "keyword_generation": "fast",
+    "faq_answer": "fast"
+}
+
+ROUTING_CONFIG_NAME = "model_routing"
+
+
+class ModelRouter:
+    """Model choice per task, plus latency and quality stats per task and model"""
+    
+    def __init__(
+        self,
+        tiers: Optional[Dict[str, str]] = None,
+        task_tiers: Optional[Dict[str, str]] = None,
+        overrides: Optional[Dict[str, str]] = None,
+        default_tier: str = DEFAULT_TIER
+    ):
+        self.tiers = {**DEFAULT_TIERS, **(tiers or {})}
+        self.task_tiers = {**DEFAULT_TASK_TIERS, **(task_tiers or {})}
+        self.overrides = dict(overrides or {})
+        self.default_tier = default_tier
+        
+        unknown = {tier for tier in [default_tier, *self.task_tiers.values()] if tier not in self.tiers}
+        if unknown:
+            raise ValueError(f"Unknown model tiers in routing policy: {sorted(unknown)}")
+        
+        self._stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config=None) -> "ModelRouter":
+        """The default policy, updated by the `model_routing` config file when there is one"""
+        settings = {}
+        if config is not None:
+            try:
+                settings = config.load_config(ROUTING_CONFIG_NAME) or {}
+            except FileNotFoundError:
+                pass
+        return cls(
+            tiers=settings.get("tiers"),
+            task_tiers=settings.get("tasks"),
+            overrides=settings.get("overrides"),
+            default_tier=settings.get("default_tier", DEFAULT_TIER)
+        )
+    
+    @property
+    def default_model(self) -> str:
+        return self.tiers[self.default_tier]
+    
+    def route(self, metadata: Optional[Dict[str, Any]] = None) -> Tuple[str, str, str]:
+        """(task, tier, model) for a call with this metadata"""
+        metadata = metadata or {}
+        task = metadata.get("task") or metadata.get("phase") or "default"
+        tier = self.task_tiers.get(task, self.default_tier)
+        if task in self.overrides:
+            return task, "override", self.overrides[task]
+        return task, tier, self.tiers[tier]
+    
+    def policy(self) -> Dict[str, Any]:
+        """The effective policy, e.g. to fingerprint it for incremental runs"""
+        return {
+            "tiers": self.tiers,
+            "default_tier": self.default_tier,
+            "tasks": self.task_tiers,
+            "overrides": self.overrides
+        }
+    
+    def _entry(self, task: str, model: str) -> Dict[str, Any]:
+        key = (task, model)
+        if key not in self._stats:
+            self._stats[key] = {
+                "calls": 0,
+                "errors": 0,
+                "latency_total": 0.0,
+                "latency_max": 0.0,
+                "quality_total": 0.0,
+                "quality_samples": 0
+            }
+        return self._stats[key]
+    
+    def record_call(self, task: str, model: str, latency: float, error: bool = False) -> None:
+        with self._lock:
+            entry = self._entry(task, model)
+            entry["calls"] += 1
+            entry["errors"] += int(error)
+            entry["latency_total"] += latency
+            entry["latency_max"] = max(entry["latency_max"], latency)
+    
+    def record_quality(self, task: str, model: str, score: float) -> None:
+        """A 0-1 quality score for one response (e.g. whether its JSON parsed)"""
+        with self._lock:
+            entry = self._entry(task, model)
+            entry["quality_total"] += score
+            entry["quality_samples"] += 1
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per task: model, call count, error count, latency and mean quality"""
+        with self._lock:
+            report = {}
+            for (task, model), entry in sorted(self._stats.items()):
+                calls = entry["calls"]
+                report[task if task not in report else f"{task}@{model}"] = {
+                    "model": model,
+                    "calls": calls,
+                    "errors": entry["errors"],
+                    "mean_latency": round(entry["latency_total"] / calls, 3) if calls else None,
+                    "max_latency": round(entry["latency_max"], 3),
+                    "quality": round(entry["quality_total"] / entry["quality_samples"], 3) if entry["quality_samples"] else None
+                }
+            return report
\ No newline at end of file
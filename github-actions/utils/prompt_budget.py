@@ -0,0 +1,114 @@
+"""Token-budgeted packing of research context into prompts"""
+import json
+import re
+from typing import Dict, List, Any, Callable, Optional, Sequence
+
+# Default budgets (estimated input tokens) for research context blocks
+DEFAULT_STRUCTURE_SOURCE_BUDGET = 3000
+DEFAULT_SECTION_SOURCE_BUDGET = 1500
+
+# Fields kept when a source is rendered in compact form
+COMPACT_SOURCE_FIELDS = ("category", "title", "url", "key_info")
+
+# Order in which source categories are considered when priorities tie
+CATEGORY_PRIORITY = [
+    "government_sources",
+    "academic_sources",
+    "medical_sources",
+    "industry_sources",
+    "media_sources"
+]
+
+_ASCII_RUN_PATTERN = re.compile(r'[\x00-\x7f]+')
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate Claude input tokens locally without calling the API
+    
+    ASCII runs average about four characters per token, while Japanese
+    characters are close to one token each, so the two are counted separately.
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(len(run) for run in _ASCII_RUN_PATTERN.findall(text))
+    other_chars = len(text) - ascii_chars
+    return other_chars + (ascii_chars + 3) // 4
+
+
+def compact_source(source: Dict[str, Any], fields: Sequence[str] = COMPACT_SOURCE_FIELDS) -> str:
+    """Render a source as a single-line JSON object with empty fields removed"""
+    compact = {field: source[field] for field in fields if source.get(field)}
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+
+def source_label(source: Dict[str, Any]) -> str:
+    """Short identifier used when reporting dropped sources"""
+    return source.get("url") or source.get("title") or "untitled"
+
+
+def pack_sources(
+    sources: List[Dict[str, Any]],
+    token_budget: int,
+    render: Callable[[Dict[str, Any]], str] = compact_source
+) -> Dict[str, Any]:
+    """Greedily pack sources (highest priority first) into a token budget
+    
+    Sources that do not fit are skipped rather than ending the pack, so a
+    long source does not crowd out shorter lower-priority ones.
+    """
+    included = []
+    lines = []
+    dropped = []
+    used_tokens = 0
+    
+    for source in sources:
+        line = render(source)
+        cost = estimate_tokens(line) + 1  # newline separator
+        if used_tokens + cost > token_budget:
+            dropped.append(source_label(source))
+            continue
+        included.append(source)
+        lines.append(line)
+        used_tokens += cost
+    
+    return {
+        "text": "\n".join(lines),
+        "included": included,
+        "dropped": dropped,
+        "tokens": used_tokens,
+        "budget": token_budget
+    }
+
+
+def prioritize_categorized_sources(
+    categorized_sources: Dict[str, Any],
+    category_order: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """Flatten categorized sources round-robin so every category gets its best sources in first"""
+    order = list(category_order or CATEGORY_PRIORITY)
+    order += [c for c in categorized_sources if c not in order]
+    
+    queues = [
+        [dict(source, category=category) for source in categorized_sources.get(category) or [] if isinstance(source, dict)]
+        for category in order
+        if isinstance(categorized_sources.get(category), list)
+    ]
+    
+    flattened = []
+    depth = 0
+    while any(depth < len(queue) for queue in queues):
+        for queue in queues:
+            if depth < len(queue):
+                flattened.append(queue[depth])
+        depth += 1
+    return flattened
+
+
+def budget_report(packed: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize a pack result for metadata and logs (without the prompt text)"""
+    return {
+        "budget": packed["budget"],
+        "tokens": packed["tokens"],
+        "included": len(packed["included"]),
+        "dropped": packed["dropped"]
+    }
\ No newline at end of file
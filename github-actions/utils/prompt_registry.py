@@ -0,0 +1,243 @@
+"""Prompt template registry
+
+Templates are read once per process and compiled when the registry is first
+used:
+
+- `prompts/*.md` are `str.format` templates, registered under their file stem
+  (e.g. `03_writing`). The same directories `read_prompt` always searched
+  are used, and the first match wins.
+- `Prompt_v2/*.md` and `Prompt_v3/*.md` are the chat templates with
+  `【ここに…を入力】` fill-ins, registered as e.g. `Prompt_v3/CHAT_01_phase1_analysis`.
+
+Every template gets its declared placeholders and a version hash of its text
+(for cache keys). Code that renders a template declares the fields it supplies
+with `prompt_spec`, and `validate_prompts()` checks all declarations against
+the templates, so a template that needs a field the code doesn't pass fails at
+startup instead of with a KeyError after the first paid API call.
+"""
+import hashlib
+import re
+import string
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+import logging
+
+from .file_utils import read_text
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Same search order as the original read_prompt
+PROMPT_DIRS = [
+    Path("prompts"),
+    Path("..") / "prompts",
+    Path("/mnt/c/article-flow/prompts")
+]
+
+CHAT_PROMPT_DIRS = [REPO_ROOT / "Prompt_v2", REPO_ROOT / "Prompt_v3"]
+
+# 【ここに記事タイトルを入力】 / 【ここに目標文字数を入力（例：3200）】
+CHAT_PLACEHOLDER_PATTERN = re.compile(r"【ここに(?P<name>[^】（]+?)を入力(?:（[^】]*）)?】")
+
+VERSION_LENGTH = 12
+
+
+class PromptTemplateError(ValueError):
+    """A template can't be parsed, is missing, or doesn't match the code rendering it"""
+
+
+class PromptTemplate:
+    """One loaded template with a precompiled renderer"""
+    
+    def __init__(self, name: str, text: str, path: Optional[Path] = None, syntax: str = "format"):
+        self.name = name
+        self.text = text
+        self.path = path
+        self.syntax = syntax
+        self.version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:VERSION_LENGTH]
+        if syntax == "format":
+            self._segments = self._compile_format(text)
+            self.placeholders = tuple(dict.fromkeys(field for _, field, _, _ in self._segments if field is not None))
+        else:
+            self._segments = None
+            self.placeholders = tuple(dict.fromkeys(match.group("name") for match in CHAT_PLACEHOLDER_PATTERN.finditer(text)))
+    
+    def _compile_format(self, text: str) -> List[Tuple[str, Optional[str], str, Optional[str]]]:
+        try:
+            segments = list(string.Formatter().parse(text))
+        except ValueError as e:
+            raise PromptTemplateError(f"Prompt '{self.name}' is not a valid format template: {e}") from e
+        
+        for _, field, spec, _ in segments:
+            if field is None:
+                continue
+            if not field.isidentifier():
+                # Positional ({}) and indexed ({a[0]}, {a.b}) fields can't be checked against keyword arguments
+                raise PromptTemplateError(f"Prompt '{self.name}' has unsupported placeholder {{{field}}}; use named fields")
+            if spec and "{" in spec:
+                raise PromptTemplateError(f"Prompt '{self.name}' has a nested placeholder in the format spec of {{{field}}}")
+        return segments
+    
+    def render(self, **values: Any) -> str:
+        """Fill in the template; every declared placeholder must be given (extra values are ignored)"""
+        missing = [name for name in self.placeholders if name not in values]
+        if missing:
+            raise PromptTemplateError(f"Prompt '{self.name}' needs values for: {', '.join(missing)}")
+        
+        if self.syntax != "format":
+            return CHAT_PLACEHOLDER_PATTERN.sub(lambda match: str(values[match.group("name")]), self.text)
+        
+        parts = []
+        for literal, field, spec, conversion in self._segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "a":
+                value = ascii(value)
+            elif conversion == "s":
+                value = str(value)
+            parts.append(format(value, spec))
+        return "".join(parts)
+
+
+class PromptSpec:
+    """A template as used by one call site: the name plus the fields the code supplies"""
+    
+    def __init__(self, registry: "PromptRegistry", name: str, fields: Iterable[str], owner: str):
+        self.registry = registry
+        self.name = name
+        self.fields = tuple(fields)
+        self.owner = owner
+    
+    @property
+    def template(self) -> PromptTemplate:
+        return self.registry.get(self.name)
+    
+    @property
+    def version(self) -> str:
+        return self.template.version
+    
+    def render(self, **values: Any) -> str:
+        return self.template.render(**values)
+
+
+class PromptRegistry:
+    """Loads every template once and checks the declared call sites against them"""
+    
+    def __init__(self, prompt_dirs: Optional[List[Path]] = None, chat_dirs: Optional[List[Path]] = None):
+        self.prompt_dirs = list(prompt_dirs) if prompt_dirs is not None else list(PROMPT_DIRS)
+        self.chat_dirs = list(chat_dirs) if chat_dirs is not None else list(CHAT_PROMPT_DIRS)
+        self.templates: Dict[str, PromptTemplate] = {}
+        self.errors: Dict[str, str] = {}
+        self.specs: List[PromptSpec] = []
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    def load(self) -> "PromptRegistry":
+        """Read and compile all templates; parse errors are kept and reported by validate()"""
+        with self._lock:
+            if self._loaded:
+                return self
+            for directory in self.prompt_dirs:
+                for path in sorted(directory.glob("*.md")) if directory.is_dir() else []:
+                    if path.stem not in self.templates and path.stem not in self.errors:
+                        self._add(path.stem, path, "format")
+            for directory in self.chat_dirs:
+                for path in sorted(directory.glob("*.md")) if directory.is_dir() else []:
+                    self._add(f"{directory.name}/{path.stem}", path, "chat")
+            self._loaded = True
+        logger.debug(f"Loaded {len(self.templates)} prompt templates ({len(self.errors)} invalid)")
+        return self
+    
+    def _add(self, name: str, path: Path, syntax: str) -> None:
+        try:
+            self.templates[name] = PromptTemplate(name, read_text(path), path, syntax)
+        except (PromptTemplateError, OSError, UnicodeDecodeError) as e:
+            self.errors[name] = str(e)
+    
+    def get(self, name: str) -> PromptTemplate:
+        self.load()
+        if name in self.templates:
+            return self.templates[name]
+        if name in self.errors:
+            raise PromptTemplateError(self.errors[name])
+        searched = self.prompt_dirs + self.chat_dirs
+        raise FileNotFoundError(f"Prompt template '{name}' not found in any of: {searched}")
+    
+    def spec(self, name: str, fields: Iterable[str], owner: str = "") -> PromptSpec:
+        """Declare a call site; checked by validate()"""
+        declared = PromptSpec(self, name, fields, owner)
+        self.specs.append(declared)
+        return declared
+    
+    def problems(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Every mismatch between the declared call sites (optionally only `names`) and the templates"""
+        self.load()
+        selected = set(names) if names is not None else None
+        found = []
+        for declared in self.specs:
+            if selected is not None and declared.name not in selected:
+                continue
+            where = f" (used by {declared.owner})" if declared.owner else ""
+            try:
+                template = self.get(declared.name)
+            except (FileNotFoundError, PromptTemplateError) as e:
+                found.append(f"{e}{where}")
+                continue
+            unsupplied = [field for field in template.placeholders if field not in declared.fields]
+            if unsupplied:
+                found.append(f"Prompt '{declared.name}'{where} uses placeholders the code does not supply: {', '.join(unsupplied)}")
+        return found
+    
+    def validate(self, names: Optional[Iterable[str]] = None) -> None:
+        """Raise PromptTemplateError listing every problem found by `problems()`"""
+        found = self.problems(names)
+        if found:
+            raise PromptTemplateError("Invalid prompt templates:\n  " + "\n  ".join(found))
+    
+    def versions(self) -> Dict[str, str]:
+        self.load()
+        return {name: template.version for name, template in sorted(self.templates.items())}
+
+
+_registry: Optional[PromptRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> PromptRegistry:
+    """The process-wide registry (templates are loaded on first use, relative to the working directory)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PromptRegistry()
+        return _registry
+
+
+def reset_registry() -> PromptRegistry:
+    """Forget loaded templates (e.g. after changing directory); declared call sites are kept"""
+    global _registry
+    with _registry_lock:
+        specs = _registry.specs if _registry is not None else []
+        _registry = PromptRegistry()
+        for declared in specs:
+            declared.registry = _registry
+        _registry.specs = specs
+        return _registry
+
+
+def prompt_spec(name: str, fields: Iterable[str], owner: str = "") -> PromptSpec:
+    return get_registry().spec(name, fields, owner)
+
+
+def get_prompt(name: str) -> PromptTemplate:
+    return get_registry().get(name)
+
+
+def validate_prompts(names: Optional[Iterable[str]] = None) -> None:
+    """Check the declared call sites against the templates before any API call"""
+    get_registry().validate(names)
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""Near-duplicate collapsing and diversity selection for research queries"""
+import hashlib
+import random
+import re
+import unicodedata
+from typing import Dict, List, Any, Iterable, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Queries at or above this estimated Jaccard similarity are merged
+DEFAULT_SIMILARITY_THRESHOLD = 0.6
+
+DEFAULT_NUM_PERMUTATIONS = 64
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+_SEPARATOR_PATTERN = re.compile(r'[\s\W_]+', re.UNICODE)
+# A one-character case particle right after a kanji, katakana or alphanumeric
+# word ("爪が薄い", "ケアの方法"); particles inside hiragana words are kept
+_PARTICLE_PATTERN = re.compile(r'(?<=[\u3400-\u9fff\u30a0-\u30ffa-z0-9])[がのをにはでとへも]')
+
+
+def normalize_for_shingles(query: str, ignore_terms: Iterable[str] = ()) -> str:
+    """Normalize a query and remove terms shared by every query (topic, main keyword)
+    
+    Queries are usually "<main keyword> <aspect>", so comparing them with the
+    keyword left in makes "X 効果" and "X 注意点" look almost identical.
+    Particles are dropped too, so "爪が薄い 原因" and "爪 薄い 原因" compare equal.
+    """
+    text = _PARTICLE_PATTERN.sub("", unicodedata.normalize("NFKC", query or "").lower())
+    stripped = text
+    for term in sorted(ignore_terms, key=len, reverse=True):
+        term = unicodedata.normalize("NFKC", term or "").lower().strip()
+        term = _PARTICLE_PATTERN.sub("", term)
+        if term:
+            stripped = stripped.replace(term, " ")
+    stripped = _SEPARATOR_PATTERN.sub("", stripped)
+    # A query that is nothing but the topic is compared in full
+    return stripped or _SEPARATOR_PATTERN.sub("", text)
+
+
+def char_shingles(text: str, k: int = 2) -> set:
+    """Character k-shingles (Japanese has no word boundaries)"""
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+class MinHasher:
+    """MinHash signatures over string shingles
+    
+    Hashes are derived from blake2b so signatures are stable across
+    processes (Python's built-in hash() is salted per run).
+    """
+    
+    def __init__(self, num_permutations: int = DEFAULT_NUM_PERMUTATIONS, seed: int = 1):
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_permutations)
+        ]
+    
+    @staticmethod
+    def _hash(shingle: str) -> int:
+        return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+    
+    def signature(self, shingles: Iterable[str]) -> Tuple[int, ...]:
+        """Return the MinHash signature of a shingle set"""
+        hashes = [self._hash(shingle) for shingle in shingles]
+        if not hashes:
+            return tuple(_MAX_HASH for _ in self.permutations)
+        return tuple(
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+            for a, b in self.permutations
+        )
+    
+    @staticmethod
+    def similarity(first: Sequence[int], second: Sequence[int]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        if not first:
+            return 0.0
+        return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+def dedupe_queries(
+    queries: List[str],
+    limit: int = 25,
+    ignore_terms: Iterable[str] = (),
+    priority: int = 0,
+    threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    shingle_size: int = 2,
+    hasher: Optional[MinHasher] = None
+) -> Dict[str, Any]:
+    """Collapse near-duplicate queries, then pick up to `limit` diverse ones
+    
+    Queries are clustered in order, so the first spelling of a paraphrase is
+    kept. The first `priority` surviving queries (e.g. those from phase 1) are
+    always selected; the remaining slots go to whichever candidate is least
+    similar to everything selected so far instead of simply the next in line.
+    The returned queries keep their original relative order.
+    
+    Returns:
+        {"queries": [...], "merged": {kept: [duplicates]}, "candidates": int}
+    """
+    hasher = hasher or MinHasher()
+    ignore_terms = [term for term in ignore_terms if term]
+    
+    # Pass 1: exact and near-duplicate collapsing
+    representatives: List[str] = []
+    signatures: List[Tuple[int, ...]] = []
+    merged: Dict[str, List[str]] = {}
+    seen = set()
+    
+    for query in queries:
+        if not isinstance(query, str) or not query.strip() or query in seen:
+            continue
+        seen.add(query)
+        
+        signature = hasher.signature(char_shingles(normalize_for_shingles(query, ignore_terms), shingle_size))
+        match = next(
+            (i for i, existing in enumerate(signatures) if hasher.similarity(signature, existing) >= threshold),
+            None
+        )
+        if match is not None:
+            merged.setdefault(representatives[match], []).append(query)
+            continue
+        
+        representatives.append(query)
+        signatures.append(signature)
+    
+    # Pass 2: greedy max-min diversity selection for the remaining slots
+    selected = list(range(min(priority, len(representatives), limit)))
+    # Highest similarity of each candidate to any selected query
+    closest = [0.0] * len(representatives)
+    for chosen in selected:
+        for i in range(len(representatives)):
+            closest[i] = max(closest[i], hasher.similarity(signatures[i], signatures[chosen]))
+    
+    remaining = [i for i in range(len(representatives)) if i not in set(selected)]
+    while remaining and len(selected) < limit:
+        best = min(remaining, key=lambda i: (closest[i], i))
+        remaining.remove(best)
+        selected.append(best)
+        for i in remaining:
+            closest[i] = max(closest[i], hasher.similarity(signatures[i], signatures[best]))
+    
+    selected.sort()
+    result = [representatives[i] for i in selected]
+    
+    if merged:
+        logger.info(f"Collapsed {sum(len(d) for d in merged.values())} near-duplicate queries")
+    
+    return {
+        "queries": result,
+        "merged": merged,
+        "candidates": len(representatives)
+    }
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""Thread-safe token buckets for sharing provider quotas between articles"""
+import asyncio
+import threading
+import time
+from typing import Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`
+    
+    `capacity` defaults to one minute's worth of tokens, so a cold bucket can
+    absorb a burst up to the per-minute quota. Requests larger than the
+    capacity are clamped to it instead of waiting forever.
+    """
+    
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity or rate_per_minute)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.waited = 0.0
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return seconds until they will be"""
+        tokens = min(tokens, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+    
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until tokens are taken and return the time spent waiting"""
+        started_at = time.monotonic()
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                break
+            time.sleep(wait)
+        waited = time.monotonic() - started_at
+        self.waited += waited
+        return waited
+    
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Asyncio variant of `acquire`"""
+        started_at = time.monotonic()
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                break
+            await asyncio.sleep(wait)
+        waited = time.monotonic() - started_at
+        self.waited += waited
+        return waited
+
+
+class ProviderLimiter:
+    """Request and token quotas for one provider, shared by every caller
+    
+    Either limit may be 0 (unlimited). Token costs are estimates supplied by
+    the caller, e.g. estimated input tokens of a Claude prompt.
+    """
+    
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.calls = 0
+        self.tokens_charged = 0
+        self._lock = threading.Lock()
+    
+    def _record(self, tokens: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.tokens_charged += tokens
+    
+    def acquire(self, tokens: float = 0) -> float:
+        """Block until one request (and `tokens`) fit within the quota"""
+        waited = 0.0
+        if self.requests:
+            waited += self.requests.acquire()
+        if self.tokens and tokens:
+            waited += self.tokens.acquire(tokens)
+        if waited > 1:
+            logger.debug(f"{self.name}: waited {waited:.1f}s for quota")
+        self._record(tokens)
+        return waited
+    
+    async def acquire_async(self, tokens: float = 0) -> float:
+        """Asyncio variant of `acquire`"""
+        waited = 0.0
+        if self.requests:
+            waited += await self.requests.acquire_async()
+        if self.tokens and tokens:
+            waited += await self.tokens.acquire_async(tokens)
+        self._record(tokens)
+        return waited
+    
+    def stats(self) -> Dict[str, Any]:
+        """Usage counters for metrics"""
+        return {
+            "calls": self.calls,
+            "tokens_charged": self.tokens_charged,
+            "wait_seconds": round(
+                (self.requests.waited if self.requests else 0) + (self.tokens.waited if self.tokens else 0), 2
+            )
+        }
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""Persistent cross-article research cache (SQLite)"""
+import os
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default freshness window for cached search results
+DEFAULT_TTL_HOURS = 24 * 7
+
+# Per-provider freshness overrides in hours, e.g. {"bing": 24}
+PROVIDER_TTL_HOURS: Dict[str, float] = {}
+
+_PUNCTUATION_PATTERN = re.compile(r'[\s　、。,.!?！？「」『』（）()\[\]【】"\'“”‘’・:：;；]+')
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different spellings share a cache entry"""
+    normalized = unicodedata.normalize("NFKC", query or "").lower()
+    return _PUNCTUATION_PATTERN.sub(" ", normalized).strip()
+
+
+def default_cache_path() -> Path:
+    """Cache location, overridable with RESEARCH_CACHE_PATH"""
+    configured = os.environ.get("RESEARCH_CACHE_PATH")
+    if configured:
+        return Path(configured)
+    return Path.home() / ".cache" / "article-flow" / "research_cache.sqlite3"
+
+
+class ResearchCache:
+    """Search results keyed by normalized query and provider
+    
+    The connection is shared between threads (phase 2 scripts search from a
+    thread pool), so every statement runs under a lock.
+    """
+    
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        ttl_hours: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        if enabled is None:
+            enabled = os.environ.get("RESEARCH_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+        self.enabled = enabled
+        self.db_path = Path(db_path) if db_path else default_cache_path()
+        
+        if ttl_hours is None:
+            ttl_hours = float(os.environ.get("RESEARCH_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS))
+        self.ttl_hours = ttl_hours
+        
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        
+        if self.enabled:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS research_results (
+                        provider TEXT NOT NULL,
+                        query_key TEXT NOT NULL,
+                        query TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        PRIMARY KEY (provider, query_key)
+                    )
+                    """
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Research cache disabled ({self.db_path}): {e}")
+                self.enabled = False
+                self._conn = None
+    
+    def _ttl_seconds(self, provider: str) -> float:
+        """Freshness window for a provider"""
+        return PROVIDER_TTL_HOURS.get(provider, self.ttl_hours) * 3600
+    
+    def get(self, query: str, provider: str) -> Optional[Any]:
+        """Return a fresh cached payload or None"""
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM research_results WHERE provider = ? AND query_key = ?",
+                (provider, normalize_query(query))
+            ).fetchone()
+            
+            if row is None or time.time() - row[1] > self._ttl_seconds(provider):
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+        return json.loads(row[0])
+    
+    def put(self, query: str, provider: str, payload: Any) -> None:
+        """Store a payload; callers should only store successful results"""
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO research_results (provider, query_key, query, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (provider, normalize_query(query), query, json.dumps(payload, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+    
+    def purge_expired(self) -> int:
+        """Delete entries older than the default TTL and return how many were removed"""
+        if not self.enabled:
+            return 0
+        
+        cutoff = time.time() - max([self.ttl_hours] + list(PROVIDER_TTL_HOURS.values())) * 3600
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM research_results WHERE created_at < ?", (cutoff,))
+            self._conn.commit()
+        return cursor.rowcount
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for metrics"""
+        return {
+            "enabled": self.enabled,
+            "path": str(self.db_path),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+    
+    def close(self) -> None:
+        """Close the underlying connection"""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
\ No newline at end of file
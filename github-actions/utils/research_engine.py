@@ -0,0 +1,529 @@
+"""Async research engine shared by all phase 2 search providers"""
+import asyncio
+import json
+import sqlite3
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional
+import logging
+
+from .research_cache import ResearchCache
+from .tracing import span, start_span, end_span
+
+logger = logging.getLogger(__name__)
+
+# Dispatch modes
+MODE_FAILOVER = "failover"  # first provider, the next one only after a failure
+MODE_RACE = "race"          # whichever provider has spare quota first
+
+# Mapping between the two source classifications used by the providers
+SOURCE_TYPE_PRIORITY = {
+    "government": "very_high",
+    "academic": "high",
+    "medical": "high",
+    "industry": "medium_high",
+    "media": "medium"
+}
+PRIORITY_SOURCE_TYPE = {
+    "very_high": "government",
+    "high": "academic",
+    "medium_high": "industry",
+    "medium": "media",
+    "low": "media"
+}
+
+
+class SearchError(Exception):
+    """Raised by providers when a search attempt fails"""
+
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """Extract the outermost JSON object from an LLM response
+    
+    Handles ```json fenced blocks and leading/trailing prose.
+    """
+    if not text:
+        raise SearchError("Empty response")
+    
+    if '```json' in text:
+        block_start = text.find('```json') + 7
+        block_end = text.find('```', block_start)
+        if block_end > block_start:
+            text = text[block_start:block_end]
+    
+    json_start = text.find('{')
+    json_end = text.rfind('}') + 1
+    if json_start < 0 or json_end <= json_start:
+        raise SearchError("No JSON found in response")
+    
+    try:
+        return json.loads(text[json_start:json_end])
+    except json.JSONDecodeError as e:
+        raise SearchError(f"Invalid JSON in response: {e}")
+
+
+def normalize_result_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill the common fields every provider's result items share
+    
+    Provider-specific fields (display_url, statistics, quotes, ...) are kept.
+    """
+    key_findings = item.get("key_findings") or item.get("key_facts") or []
+    source_type = item.get("source_type") or PRIORITY_SOURCE_TYPE.get(item.get("priority"), "media")
+    
+    normalized = dict(item)
+    normalized.update({
+        "url": item.get("url", ""),
+        "title": item.get("title", ""),
+        "snippet": item.get("snippet") or " ".join(str(f) for f in key_findings),
+        "source_type": source_type,
+        "priority": item.get("priority") or SOURCE_TYPE_PRIORITY.get(source_type, "medium"),
+        "reliability_score": item.get("reliability_score", 5),
+        "key_findings": key_findings,
+        "publication_date": item.get("publication_date") or item.get("date", "")
+    })
+    return normalized
+
+
+def make_result_record(
+    query: str,
+    provider: str,
+    results: Optional[List[Dict[str, Any]]] = None,
+    error: Optional[str] = None,
+    **extra
+) -> Dict[str, Any]:
+    """Build the normalized per-query record returned by the engine
+    
+    Failed records carry an "error" key; successful ones never do, which is
+    what the existing phase 2 result processors check for.
+    """
+    record = {
+        "query": query,
+        "provider": provider,
+        "results": results or [],
+        "result_count": len(results or []),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    if error is not None:
+        record["error"] = error
+    record.update(extra)
+    return record
+
+
+class ResearchProvider:
+    """Base class for research providers
+    
+    Subclasses implement `search`, returning a list of result items or
+    raising an exception. Quota settings are read by the engine, and
+    `cost_per_request` (in arbitrary units) is used to cap hedged spend.
+    An optional `limiter` (utils.rate_limit.ProviderLimiter) shares the
+    provider's quota with other engines, e.g. across articles in batch mode.
+    """
+    
+    name = "provider"
+    
+    def __init__(
+        self,
+        max_concurrent: int = 3,
+        requests_per_minute: float = 0,
+        timeout: float = 60,
+        cost_per_request: float = 1.0,
+        limiter=None
+    ):
+        self.max_concurrent = max_concurrent
+        self.requests_per_minute = requests_per_minute
+        self.timeout = timeout
+        self.cost_per_request = cost_per_request
+        self.limiter = limiter
+    
+    @property
+    def cache_key(self) -> str:
+        """Provider key under which results are cached (unique per model)"""
+        return self.name
+    
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+    
+    async def close(self) -> None:
+        """Release clients or sessions opened by the provider"""
+
+
+class ProviderQuota:
+    """Concurrency slots plus a minimum interval between request starts"""
+    
+    def __init__(self, max_concurrent: int, requests_per_minute: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.in_flight = 0
+        self.next_start = 0.0
+    
+    def wait_time(self, now: float) -> Optional[float]:
+        """Seconds until a request may start, or None while all slots are busy"""
+        if self.in_flight >= self.max_concurrent:
+            return None
+        return max(0.0, self.next_start - now)
+    
+    def reserve(self, now: float) -> None:
+        self.in_flight += 1
+        self.next_start = max(now, self.next_start) + self.interval
+    
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+class ResearchEngine:
+    """Run queries against one or more providers with shared scheduling
+    
+    Handles per-provider concurrency and rate limits, per-attempt timeouts,
+    retries (on the next provider in failover mode), hedging and the
+    cross-article research cache. Providers are identified by `cache_key`.
+    
+    Hedging is opt-in (`hedge_after`): when an attempt has been running for
+    longer than the `hedge_percentile` latency of its provider, a duplicate is
+    sent to another provider (preferring `hedge_providers`) and whichever
+    answers first wins. `hedge_budget` caps hedged spend as a fraction of the
+    run's expected primary spend.
+    """
+    
+    def __init__(
+        self,
+        providers: List[ResearchProvider],
+        cache: Optional[ResearchCache] = None,
+        mode: str = MODE_FAILOVER,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+        hedge_after: Optional[float] = None,
+        hedge_percentile: float = 0.9,
+        hedge_budget: Optional[float] = None,
+        hedge_providers: Optional[List[ResearchProvider]] = None,
+        log=None
+    ):
+        if not providers:
+            raise ValueError("At least one research provider is required")
+        if mode not in (MODE_FAILOVER, MODE_RACE):
+            raise ValueError(f"Unknown research mode: {mode}")
+        
+        self.providers = providers
+        self.hedge_providers = hedge_providers or []
+        self.cache = cache
+        self.mode = mode
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.hedge_after = hedge_after
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self.logger = log or logger
+        
+        every_provider = self.providers + self.hedge_providers
+        self._by_key = {p.cache_key: p for p in every_provider}
+        if len(self._by_key) != len(every_provider):
+            raise ValueError("Research providers must have distinct cache keys")
+        
+        self.quotas = {p.cache_key: ProviderQuota(p.max_concurrent, p.requests_per_minute) for p in every_provider}
+        self.latencies: Dict[str, List[float]] = {p.cache_key: [] for p in every_provider}
+        self.provider_stats = {p.cache_key: {"calls": 0, "failures": 0, "timeouts": 0} for p in every_provider}
+        self.hedge_stats = {"hedges": 0, "wins": 0, "spend": 0.0, "budget": None}
+        self._quota_changed: Optional[asyncio.Condition] = None
+    
+    # Scheduling
+    
+    def _candidates(self, tried: List[str]) -> List[ResearchProvider]:
+        """Providers allowed for the next regular attempt of a query"""
+        untried = [p for p in self.providers if p.cache_key not in tried]
+        if self.mode == MODE_FAILOVER:
+            return untried[:1] or self.providers[:1]
+        return untried or self.providers
+    
+    def _hedge_candidates(self, active: List[str]) -> List[ResearchProvider]:
+        """Providers for a hedge: dedicated hedge providers first, never the straggling one if avoidable"""
+        pool = [p for p in self.hedge_providers + self.providers if p.cache_key not in active]
+        return pool or self.providers
+    
+    async def _acquire(self, candidates: List[ResearchProvider]) -> ResearchProvider:
+        """Wait for the first candidate with spare quota and reserve a slot on it"""
+        async with self._quota_changed:
+            while True:
+                now = time.monotonic()
+                soonest = None
+                for provider in candidates:
+                    wait = self.quotas[provider.cache_key].wait_time(now)
+                    if wait == 0:
+                        self.quotas[provider.cache_key].reserve(now)
+                        return provider
+                    if wait is not None and (soonest is None or wait < soonest):
+                        soonest = wait
+                try:
+                    await asyncio.wait_for(self._quota_changed.wait(), timeout=soonest)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def _release(self, provider: ResearchProvider) -> None:
+        async with self._quota_changed:
+            self.quotas[provider.cache_key].release()
+            self._quota_changed.notify_all()
+    
+    def hedge_delay(self, provider_key: str) -> float:
+        """Seconds before a straggling attempt is hedged
+        
+        Uses the `hedge_percentile` latency of the provider once a few samples
+        exist, otherwise `hedge_after`.
+        """
+        samples = self.latencies[provider_key]
+        if len(samples) < 3:
+            return self.hedge_after
+        ordered = sorted(samples)
+        index = min(int(len(ordered) * self.hedge_percentile), len(ordered) - 1)
+        return max(1.0, ordered[index])
+    
+    def _reserve_hedge(self, candidates: List[ResearchProvider]) -> Optional[float]:
+        """Charge a hedge to these candidates against the budget, or return None if it doesn't fit
+        
+        The most expensive candidate's cost is charged up front, so concurrent
+        stragglers can't all pass the check before any of them is charged.
+        `_attempt` settles it at the chosen provider's cost, or refunds it if
+        the hedge is cancelled before it starts.
+        """
+        cost = max(p.cost_per_request for p in candidates)
+        if self.hedge_stats["budget"] is not None and self.hedge_stats["spend"] + cost > self.hedge_stats["budget"]:
+            return None
+        self.hedge_stats["spend"] += cost
+        return cost
+    
+    # Execution
+    
+    async def _attempt(
+        self,
+        query: str,
+        candidates: List[ResearchProvider],
+        delay: float = 0,
+        active: Optional[List[str]] = None,
+        started: Optional[asyncio.Event] = None,
+        hedge: bool = False,
+        hedge_cost: float = 0.0
+    ) -> Dict[str, Any]:
+        """Run one attempt on the first candidate with spare quota
+        
+        `hedge_cost` is what `_reserve_hedge` charged for this hedge.
+        """
+        reserved = hedge_cost
+        provider = None
+        attempt_span = None
+        record = None
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            
+            provider = await self._acquire(candidates)
+            key = provider.cache_key
+            # Inside the try so a cancelled wait (the other side of a hedge won) still frees the slot
+            if provider.limiter is not None:
+                await provider.limiter.acquire_async()
+            if active is not None:
+                active.append(key)
+            if started is not None:
+                started.set()
+            if hedge:
+                # The hedge really starts: settle the reservation at this provider's cost
+                self.hedge_stats["hedges"] += 1
+                self.hedge_stats["spend"] += provider.cost_per_request - reserved
+                reserved = 0.0
+            
+            stats = self.provider_stats[key]
+            stats["calls"] += 1
+            attempt_span = start_span("research.attempt", {"research.provider": key, "research.hedge": hedge})
+            started_at = time.monotonic()
+            try:
+                items = await asyncio.wait_for(provider.search(query), timeout=provider.timeout)
+                latency = time.monotonic() - started_at
+                self.latencies[key].append(latency)
+                record = make_result_record(
+                    query,
+                    key,
+                    [normalize_result_item(item) for item in items or []],
+                    latency=round(latency, 3),
+                    won_by_hedge=hedge
+                )
+            except asyncio.TimeoutError:
+                stats["failures"] += 1
+                stats["timeouts"] += 1
+                record = make_result_record(query, key, error=f"Timed out after {provider.timeout}s")
+            except Exception as e:
+                stats["failures"] += 1
+                self.logger.warning(f"{key} search failed for '{query}': {e}")
+                record = make_result_record(query, key, error=str(e))
+        finally:
+            if reserved:
+                # Cancelled before it started: the hedge cost nothing
+                self.hedge_stats["spend"] -= reserved
+            # record stays None when the attempt is cancelled (the other side of a hedge won)
+            if attempt_span is not None:
+                end_span(attempt_span, record.get("error") if record else "cancelled")
+            if provider is not None:
+                await self._release(provider)
+        return record
+    
+    def _cached_record(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return a cached record from any allowed provider"""
+        if not self.cache:
+            return None
+        providers = self.providers if self.mode == MODE_RACE else self.providers[:1]
+        for provider in providers:
+            cached = self.cache.get(query, provider.cache_key)
+            # Older cache entries may hold a provider-specific payload
+            if isinstance(cached, list):
+                return make_result_record(query, provider.cache_key, cached, cached=True, attempts=0)
+        return None
+    
+    def _cache_put(self, query: str, record: Dict[str, Any]) -> None:
+        """Cache a successful record; a cache write failure never fails the search"""
+        try:
+            self.cache.put(query, record["provider"], record["results"])
+        except sqlite3.Error as e:
+            self.logger.warning(f"Research cache write failed for '{query}': {e}")
+    
+    async def search(self, query: str) -> Dict[str, Any]:
+        """Research a single query: cache, attempts, hedging and retries"""
+        with span("research.query", {"research.query": query}) as query_span:
+            record = await self._search(query)
+            query_span.set_attributes({
+                "research.provider": record.get("provider"),
+                "research.cached": record.get("cached", False),
+                "research.attempts": record.get("attempts"),
+                "research.hedged": record.get("hedged", False),
+                "research.results": len(record.get("results") or [])
+            })
+            if "error" in record:
+                query_span.record_error(record["error"])
+            return record
+    
+    async def _search(self, query: str) -> Dict[str, Any]:
+        cached = self._cached_record(query)
+        if cached is not None:
+            return cached
+        
+        tried: List[str] = []
+        active: List[str] = []
+        in_flight = set()
+        started = asyncio.Event()
+        attempts = 0
+        hedge_considered = False
+        hedged = False
+        last_record = None
+        
+        def start(
+            delay: float = 0,
+            candidates: Optional[List[ResearchProvider]] = None,
+            hedge: bool = False,
+            hedge_cost: float = 0.0
+        ) -> None:
+            nonlocal attempts
+            attempts += 1
+            if not hedge:
+                # A retry's hedge timer starts once it is running, from its own provider's latency
+                started.clear()
+            in_flight.add(asyncio.create_task(self._attempt(
+                query, candidates or self._candidates(tried), delay, active, started, hedge, hedge_cost
+            )))
+        
+        start()
+        try:
+            while in_flight:
+                wait_timeout = None
+                if self.hedge_after is not None and not hedge_considered and attempts < self.max_attempts:
+                    if not started.is_set():
+                        # Time spent queueing for quota does not count towards the threshold
+                        waiter = asyncio.create_task(started.wait())
+                        await asyncio.wait(in_flight | {waiter}, return_when=asyncio.FIRST_COMPLETED)
+                        waiter.cancel()
+                        continue
+                    # The current regular attempt is the last provider to start
+                    wait_timeout = self.hedge_delay(active[-1])
+                
+                done, in_flight = await asyncio.wait(
+                    in_flight,
+                    timeout=wait_timeout,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                if not done:
+                    # Straggler: duplicate the request and keep whichever finishes first
+                    hedge_considered = True
+                    candidates = self._hedge_candidates(active)
+                    hedge_cost = self._reserve_hedge(candidates)
+                    if hedge_cost is not None:
+                        hedged = True
+                        start(candidates=candidates, hedge=True, hedge_cost=hedge_cost)
+                    continue
+                
+                for task in done:
+                    record = task.result()
+                    if "error" not in record:
+                        if record["won_by_hedge"]:
+                            self.hedge_stats["wins"] += 1
+                        record.update({"attempts": attempts, "hedged": hedged})
+                        if self.cache and record["results"]:
+                            self._cache_put(query, record)
+                        return record
+                    tried.append(record["provider"])
+                    last_record = record
+                
+                if not in_flight and attempts < self.max_attempts:
+                    start(self.retry_delay * 2 ** (attempts - 1))
+        finally:
+            for task in in_flight:
+                task.cancel()
+        
+        last_record.update({"attempts": attempts, "hedged": hedged})
+        return last_record
+    
+    async def run(
+        self,
+        queries: List[str],
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Research all queries concurrently and return records in query order
+        
+        `on_result` is called with each record as soon as it is available.
+        """
+        self._quota_changed = asyncio.Condition()
+        unique_queries = list(dict.fromkeys(queries))
+        records: Dict[str, Dict[str, Any]] = {}
+        
+        if self.hedge_budget is not None:
+            # Budget relative to what the run would cost on the primary provider alone
+            primary_cost = self.providers[0].cost_per_request * len(unique_queries)
+            self.hedge_stats["budget"] = (self.hedge_stats["budget"] or 0.0) + self.hedge_budget * primary_cost
+        
+        try:
+            tasks = [asyncio.create_task(self.search(query)) for query in unique_queries]
+            for completed, next_record in enumerate(asyncio.as_completed(tasks), 1):
+                record = await next_record
+                records[record["query"]] = record
+                status = "cached" if record.get("cached") else ("failed" if "error" in record else record["provider"])
+                self.logger.info(f"Research {completed}/{len(unique_queries)} ({status}): {record['query']}")
+                if on_result:
+                    on_result(record)
+        finally:
+            for provider in self.providers + self.hedge_providers:
+                await provider.close()
+        
+        return [records[query] for query in unique_queries]
+    
+    def run_sync(self, queries: List[str], on_result=None) -> List[Dict[str, Any]]:
+        """Blocking wrapper around `run` for the phase scripts"""
+        return asyncio.run(self.run(queries, on_result))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Per-provider call counts, latency percentiles and hedging spend for metrics"""
+        summary = {}
+        for key, provider_stats in self.provider_stats.items():
+            samples = sorted(self.latencies[key])
+            summary[key] = dict(
+                provider_stats,
+                median_latency=round(samples[len(samples) // 2], 3) if samples else None,
+                p99_latency=round(samples[min(int(len(samples) * 0.99), len(samples) - 1)], 3) if samples else None
+            )
+        if self.hedge_after is not None:
+            summary["hedging"] = dict(self.hedge_stats)
+        if self.cache:
+            summary["cache"] = self.cache.stats()
+        return summary
\ No newline at end of file
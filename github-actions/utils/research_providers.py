@@ -0,0 +1,341 @@
+"""Research provider implementations for the phase 2 research engine"""
+import asyncio
+import os
+import signal
+from typing import List, Dict, Any, Optional
+import logging
+
+from .research_engine import ResearchProvider, SearchError, extract_json_object
+
+logger = logging.getLogger(__name__)
+
+
+class BingProvider(ResearchProvider):
+    """Bing Web Search API (results ranked by domain priority)"""
+    
+    name = "bing"
+    
+    def __init__(self, api_key: Optional[str] = None, count: int = 10, **quota):
+        quota.setdefault("requests_per_minute", 120)
+        quota.setdefault("timeout", 45)
+        super().__init__(**quota)
+        from .web_search import BingSearchAPI
+        self.searcher = BingSearchAPI(api_key)
+        self.count = count
+    
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        # The Bing client is blocking (requests + tenacity), so run it off the event loop
+        return await asyncio.to_thread(self.searcher.search_with_priority, query, None, self.count)
+
+
+class ClaudeWebSearchProvider(ResearchProvider):
+    """Claude web search tool"""
+    
+    name = "claude_web_search"
+    
+    def __init__(self, searcher=None, num_results: int = 10, **quota):
+        quota.setdefault("requests_per_minute", 120)
+        super().__init__(**quota)
+        if searcher is None:
+            from .claude_web_search import ClaudeWebSearch
+            searcher = ClaudeWebSearch()
+        self.searcher = searcher
+        self.num_results = num_results
+    
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.searcher.search_and_analyze, query, num_results=self.num_results)
+
+
+GEMINI_API_PROMPT = """
+        Perform a web search for the following query and return accurate, up-to-date results from reliable sources:
+        
+        Query: {query}
+        
+        Requirements:
+        1. Use web grounding to find real, current information
+        2. Prioritize official sources (.gov, .edu, academic journals)
+        3. Include publication dates and source credibility
+        4. Return structured data with URLs, titles, and key findings
+        
+        Format the response as JSON:
+        {{
+            "results": [
+                {{
+                    "url": "actual URL",
+                    "title": "page title",
+                    "source_type": "government/academic/medical/industry/media",
+                    "date": "publication date if available",
+                    "reliability_score": 1-10,
+                    "key_findings": ["finding 1", "finding 2"],
+                    "relevant_quote": "exact quote if important"
+                }}
+            ]
+        }}
+        """
+
+
+class GeminiApiProvider(ResearchProvider):
+    """Gemini REST API with Google Search grounding (aiohttp)"""
+    
+    name = "gemini_api"
+    
+    def __init__(self, api_key: str, model: str = "gemini-pro", **quota):
+        quota.setdefault("max_concurrent", 5)
+        quota.setdefault("timeout", 30)
+        super().__init__(**quota)
+        self.api_key = api_key
+        self.model = model
+        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
+        self._session = None
+    
+    @property
+    def cache_key(self) -> str:
+        return f"gemini_api:{self.model}"
+    
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        import aiohttp
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        
+        data = {
+            "contents": [{
+                "parts": [{
+                    "text": GEMINI_API_PROMPT.format(query=query)
+                }]
+            }],
+            "generationConfig": {
+                "temperature": 0.3,
+                "maxOutputTokens": 2048,
+                "topP": 0.8,
+                "topK": 10
+            },
+            "tools": [{
+                "googleSearchRetrieval": {
+                    "dynamicRetrievalConfig": {
+                        "mode": "MODE_DYNAMIC",
+                        "dynamicThreshold": 0.3
+                    }
+                }
+            }]
+        }
+        
+        async with self._session.post(
+            f"{self.base_url}/{self.model}:generateContent",
+            headers={"Content-Type": "application/json", "x-goog-api-key": self.api_key},
+            json=data,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise SearchError(f"Gemini API error {response.status}: {error_text}")
+            result = await response.json()
+        
+        text_response = result['candidates'][0]['content']['parts'][0]['text']
+        return extract_json_object(text_response).get("results", [])
+    
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+GEMINI_CLI_PROMPT = """
+    Web検索を実行してください: "{query}"
+    
+    以下の優先度で信頼性の高い情報源を重視してください：
+    - 政府機関（.go.jp, .gov）
+    - 学術機関（.ac.jp, .edu）
+    - 業界団体、専門協会
+    - 大手メディア
+    
+    各検索結果について以下の形式でJSONで返してください：
+    {{
+        "query": "{query}",
+        "results": [
+            {{
+                "url": "実際のURL",
+                "title": "ページタイトル",
+                "source_type": "government/academic/medical/industry/media",
+                "reliability_score": 1-10,
+                "key_findings": ["重要な発見"],
+                "publication_date": "公開日（分かれば）"
+            }}
+        ]
+    }}
+    """
+
+
+class GeminiCliProvider(ResearchProvider):
+    """Gemini CLI subprocess with the web_search tool"""
+    
+    name = "gemini_cli"
+    
+    def __init__(self, model: str = "gemini-2.0-flash-exp", **quota):
+        quota.setdefault("max_concurrent", 4)
+        quota.setdefault("requests_per_minute", 30)
+        super().__init__(**quota)
+        self.model = model
+    
+    @property
+    def cache_key(self) -> str:
+        return f"gemini_cli:{self.model}"
+    
+    def build_command(self, query: str) -> List[str]:
+        """Build the Gemini CLI command line for a single search"""
+        return [
+            "gemini", "chat",
+            "--model", self.model,
+            "--tools", "web_search",
+            "--temperature", "1.0",  # Recommended for grounding
+            "--max-tokens", "2048",
+            "--format", "json",
+            "-p", GEMINI_CLI_PROMPT.format(query=query)
+        ]
+    
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        process = await asyncio.create_subprocess_exec(
+            *self.build_command(query),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True  # lets a timeout kill helper processes the CLI spawned
+        )
+        try:
+            # communicate() drains both pipes while the process runs
+            stdout, stderr = await process.communicate()
+            if process.returncode != 0:
+                raise SearchError(f"Gemini CLI failed: {stderr.decode('utf-8', errors='replace')}")
+            return extract_json_object(stdout.decode('utf-8', errors='replace')).get("results", [])
+        finally:
+            if process.returncode is None:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                await process.wait()
+
+
+GEMINI_SDK_PROMPT = """
+Web検索を実行: "{query}"
+
+重要な指示：
+- 実際のウェブサイトのURL（ドメイン名を含む）を提供してください
+- リダイレクトURLではなく、元のソースのURLを記載してください
+- 一次情報（政府機関、学術機関）を最優先してください
+
+優先順位：
+1. 政府機関（.go.jp, .gov） - 厚生労働省、消費者庁、政府データベース等
+2. 学術機関（.ac.jp, .edu） - 大学、研究機関、学術論文等
+3. 医学会・専門団体 - 日本皮膚科学会、医師会等
+4. 大手メディア - 信頼できる健康メディア
+
+以下の形式でJSONで返してください：
+{{
+  "query": "{query}",
+  "results": [
+    {{
+      "url": "実際のウェブサイトURL（例: https://www.mhlw.go.jp/...）",
+      "domain": "ドメイン名（例: mhlw.go.jp）",
+      "title": "タイトル",
+      "source_type": "government/academic/medical/industry/media",
+      "reliability_score": 1-10,
+      "key_findings": ["重要な発見、具体的なデータや統計を含む"],
+      "publication_date": "YYYY-MM-DD",
+      "author": "著者名や組織名（わかる場合）"
+    }}
+  ]
+}}
+
+注意：
+- vertexaisearch.cloud.google.comのリダイレクトURLは使用しないでください
+- 実際の情報源のURLを提供してください
+- 政府・学術機関の情報を優先的に検索してください
+"""
+
+
+def response_text(response) -> str:
+    """Text of a google-genai response, falling back to candidate parts"""
+    try:
+        if response.text:
+            return response.text
+    except (AttributeError, ValueError):
+        pass
+    for candidate in getattr(response, "candidates", None) or []:
+        content = getattr(candidate, "content", None)
+        for part in getattr(content, "parts", None) or []:
+            if getattr(part, "text", None):
+                return part.text
+    raise SearchError("Could not extract text from response candidates")
+
+
+class GeminiSdkProvider(ResearchProvider):
+    """google-genai SDK with the google_search grounding tool"""
+    
+    name = "gemini_sdk"
+    
+    def __init__(self, client=None, api_key: Optional[str] = None, model: str = "gemini-2.5-flash", **quota):
+        # Free-tier grounding quota: roughly one request every 8 seconds
+        quota.setdefault("max_concurrent", 2)
+        quota.setdefault("requests_per_minute", 7.5)
+        super().__init__(**quota)
+        from google.genai import types
+        if client is None:
+            from google import genai
+            client = genai.Client(api_key=api_key or os.environ.get("GEMINI_API_KEY"))
+        self.client = client
+        self.model = model
+        self.config = types.GenerateContentConfig(
+            tools=[types.Tool(google_search=types.GoogleSearch())],
+            temperature=1.0,
+            max_output_tokens=8192  # Increased to handle full JSON responses
+        )
+    
+    @property
+    def cache_key(self) -> str:
+        return f"gemini_sdk:{self.model}"
+    
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            self.client.models.generate_content,
+            model=self.model,
+            contents=GEMINI_SDK_PROMPT.format(query=query),
+            config=self.config
+        )
+        return extract_json_object(response_text(response)).get("results", [])
+
+
+class GeminiTextProvider(ResearchProvider):
+    """google-generativeai model answering the raw query with search enabled
+    
+    Returns a single item holding the free-text answer under "content".
+    """
+    
+    name = "gemini_text"
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.0-flash-exp", **quota):
+        quota.setdefault("max_concurrent", 2)
+        quota.setdefault("requests_per_minute", 20)
+        super().__init__(**quota)
+        import google.generativeai as genai
+        genai.configure(api_key=api_key or os.environ.get("GEMINI_API_KEY"))
+        self.genai = genai
+        self.model = model
+        self.client = genai.GenerativeModel(model)
+    
+    @property
+    def cache_key(self) -> str:
+        return f"gemini_text:{self.model}"
+    
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            self.client.generate_content,
+            query,
+            tools=['google_search'],
+            generation_config=self.genai.GenerationConfig(
+                temperature=0.7,
+                max_output_tokens=2048
+            )
+        )
+        content = response.text if response.text else ""
+        if not content:
+            raise SearchError("Empty response")
+        return [{"content": content, "key_findings": []}]
\ No newline at end of file
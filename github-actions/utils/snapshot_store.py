@@ -0,0 +1,178 @@
+"""Delta-compressed snapshot history of a text file
+
+Each snapshot is stored either as a base (the full text) or as a line delta
+against the snapshot before it. Payloads are blobs in a BlobStore, so they are
+compressed and an unchanged step costs only a few bytes. `index.json` records
+the chain, and a snapshot is rebuilt on demand by applying the deltas after
+its base. A new base is started when a delta would be nearly as large as the
+text or the chain gets long, which bounds reconstruction work.
+"""
+import difflib
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+import logging
+
+from .blob_store import BlobStore, canonical_json
+from .file_utils import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_INDEX_VERSION = 1
+
+# Longest run of deltas before another base is stored
+MAX_CHAIN_LENGTH = 20
+
+# A delta larger than this fraction of the full text is stored as a base instead
+MAX_DELTA_RATIO = 0.5
+
+
+def line_delta(old: str, new: str) -> List[Any]:
+    """Ops rebuilding `new` from `old`: `[start, end]` copies old lines, a string is inserted text"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old: str, ops: List[Any]) -> str:
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SnapshotStore:
+    """Ordered snapshots of one file, kept as a base plus deltas"""
+    
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.store = BlobStore(self.root)
+        self.index_file = self.root / "index.json"
+        self.snapshots: List[Dict[str, Any]] = []
+        if self.index_file.exists():
+            index = read_json(self.index_file)
+            if index.get("version") == SNAPSHOT_INDEX_VERSION:
+                self.snapshots = index.get("snapshots", [])
+            else:
+                logger.warning(f"Ignoring snapshot index with unknown version: {self.index_file}")
+    
+    def _save(self) -> None:
+        write_json({"version": SNAPSHOT_INDEX_VERSION, "snapshots": self.snapshots}, self.index_file)
+    
+    def _by_id(self, snapshot_id: int) -> Dict[str, Any]:
+        for entry in self.snapshots:
+            if entry["id"] == snapshot_id:
+                return entry
+        raise KeyError(f"Snapshot {snapshot_id} not found in {self.index_file}")
+    
+    def _chain_length(self, entry: Dict[str, Any]) -> int:
+        length = 0
+        while entry["kind"] == "delta":
+            length += 1
+            entry = self._by_id(entry["parent"])
+        return length
+    
+    def add(self, text: str, step_name: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Store a snapshot of `text`, as a delta against the latest one when that is small enough"""
+        encoded = text.encode("utf-8")
+        entry = {
+            "id": self.snapshots[-1]["id"] + 1 if self.snapshots else 1,
+            "step_name": step_name,
+            **(metadata or {}),
+            "sha256": _sha256(text),
+            "size": len(encoded),
+            "created_at": datetime.now().isoformat()
+        }
+        
+        payload = encoded
+        entry["kind"] = "base"
+        previous = self.snapshots[-1] if self.snapshots else None
+        if previous is not None and self._chain_length(previous) < MAX_CHAIN_LENGTH:
+            ops = line_delta(self.text(previous["id"]), text)
+            delta = canonical_json(ops)
+            if len(delta) <= len(encoded) * MAX_DELTA_RATIO:
+                payload = delta
+                entry["kind"] = "delta"
+                entry["parent"] = previous["id"]
+        
+        entry["blob"] = self.store.put_bytes(payload)
+        entry["stored_bytes"] = self.store.path_for(entry["blob"]).stat().st_size
+        self.snapshots.append(entry)
+        self._save()
+        return entry
+    
+    def text(self, snapshot_id: int) -> str:
+        """Rebuild a snapshot from its base and deltas, checking the result against its hash"""
+        entry = self._by_id(snapshot_id)
+        deltas = []
+        while entry["kind"] == "delta":
+            deltas.append(entry)
+            entry = self._by_id(entry["parent"])
+        
+        text = self.store.get_bytes(entry["blob"]).decode("utf-8")
+        for delta in reversed(deltas):
+            text = apply_delta(text, json.loads(self.store.get_bytes(delta["blob"])))
+        
+        if _sha256(text) != self._by_id(snapshot_id)["sha256"]:
+            raise ValueError(f"Snapshot {snapshot_id} does not match its recorded hash")
+        return text
+    
+    def find(self, ref: str) -> Dict[str, Any]:
+        """A snapshot by id, or the latest one whose step name matches"""
+        if str(ref).isdigit():
+            return self._by_id(int(ref))
+        for entry in reversed(self.snapshots):
+            if entry["step_name"] == ref or entry.get("safe_step_name") == ref:
+                return entry
+        raise KeyError(f"No snapshot for step '{ref}'")
+    
+    def drop_oldest(self) -> int:
+        """Remove the oldest snapshot, turning its successor into a base; returns stored bytes freed"""
+        if not self.snapshots:
+            return 0
+        oldest = self.snapshots[0]
+        successor = self.snapshots[1] if len(self.snapshots) > 1 else None
+        if successor is not None and successor.get("parent") == oldest["id"]:
+            text = self.text(successor["id"])
+            successor["kind"] = "base"
+            successor.pop("parent")
+            successor["blob"] = self.store.put_bytes(text.encode("utf-8"))
+            successor["stored_bytes"] = self.store.path_for(successor["blob"]).stat().st_size
+        
+        self.snapshots.pop(0)
+        referenced = {entry["blob"] for entry in self.snapshots}
+        freed = 0
+        for path in self.store.objects_dir.glob("*/*"):
+            if path.name not in referenced and not path.name.startswith("."):
+                freed += self.store.remove(path.name)
+        self._save()
+        return freed
+    
+    def disk_usage(self) -> int:
+        index_bytes = self.index_file.stat().st_size if self.index_file.exists() else 0
+        return self.store.disk_usage()["bytes"] + index_bytes
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "snapshots": len(self.snapshots),
+            "bases": sum(1 for entry in self.snapshots if entry["kind"] == "base"),
+            "logical_bytes": sum(entry["size"] for entry in self.snapshots),
+            "stored_bytes": self.disk_usage()
+        }
\ No newline at end of file
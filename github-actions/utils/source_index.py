@@ -0,0 +1,128 @@
+"""Ranked retrieval over research sources (BM25 on character n-grams)"""
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Any, Iterable, Optional
+
+# Whitespace and punctuation are removed before building n-grams
+_SEPARATOR_PATTERN = re.compile(r'[\s\W_]+', re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize width and case so that 'ＡＢＣ' and 'abc' share n-grams"""
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def char_ngrams(text: str, n: int = 2) -> List[str]:
+    """Split text into character n-grams (Japanese has no word boundaries)"""
+    grams = []
+    for segment in _SEPARATOR_PATTERN.split(normalize_text(text)):
+        if not segment:
+            continue
+        if len(segment) <= n:
+            grams.append(segment)
+            continue
+        grams.extend(segment[i:i + n] for i in range(len(segment) - n + 1))
+    return grams
+
+
+class SourceIndex:
+    """Inverted index over categorized sources, built once per run"""
+    
+    # Fields indexed for each source; the title is counted twice so that
+    # matches in the headline outrank matches buried in long snippets
+    INDEXED_FIELDS = ("title", "title", "key_info", "snippet")
+    
+    def __init__(
+        self,
+        categorized_sources: Dict[str, Any],
+        ngram: int = 2,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.ngram = ngram
+        self.k1 = k1
+        self.b = b
+        self.documents: List[Dict[str, Any]] = []
+        self._postings: Dict[str, List[tuple]] = defaultdict(list)
+        self._lengths: List[int] = []
+        
+        for category, sources in (categorized_sources or {}).items():
+            # Skip fallback payloads such as {"raw_response": ..., "parse_error": ...}
+            if not isinstance(sources, list):
+                continue
+            for source in sources:
+                if isinstance(source, dict):
+                    self._add_document(category, source)
+        
+        self.average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+    
+    def __len__(self) -> int:
+        return len(self.documents)
+    
+    def _add_document(self, category: str, source: Dict[str, Any]) -> None:
+        """Tokenize a source and append it to the postings lists"""
+        text = " ".join(str(source.get(field) or "") for field in self.INDEXED_FIELDS)
+        grams = Counter(char_ngrams(text, self.ngram))
+        
+        doc_id = len(self.documents)
+        self.documents.append({"category": category, "source": source})
+        self._lengths.append(sum(grams.values()))
+        for gram, frequency in grams.items():
+            self._postings[gram].append((doc_id, frequency))
+    
+    def _idf(self, document_frequency: int) -> float:
+        """BM25 inverse document frequency (always positive)"""
+        total = len(self.documents)
+        return math.log(1 + (total - document_frequency + 0.5) / (document_frequency + 0.5))
+    
+    def score(self, terms: Iterable[str]) -> Dict[int, float]:
+        """Return BM25 scores for every document matching at least one n-gram"""
+        query_grams = set()
+        for term in terms:
+            query_grams.update(char_ngrams(term, self.ngram))
+        
+        scores: Dict[int, float] = defaultdict(float)
+        for gram in query_grams:
+            postings = self._postings.get(gram)
+            if not postings:
+                continue
+            idf = self._idf(len(postings))
+            for doc_id, frequency in postings:
+                length_norm = 1 - self.b + self.b * (self._lengths[doc_id] / self.average_length)
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+        return scores
+    
+    def search(self, terms: Iterable[str], limit: int = 5, min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Return the best `limit` sources for the query terms, one per URL"""
+        scores = self.score(terms)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        
+        results = []
+        seen_urls = set()
+        for doc_id, doc_score in ranked:
+            if doc_score <= min_score:
+                break
+            document = self.documents[doc_id]
+            source = document["source"]
+            url = source.get("url")
+            if url and url in seen_urls:
+                continue
+            seen_urls.add(url)
+            results.append({
+                "category": document["category"],
+                "title": source.get("title"),
+                "url": url,
+                "key_info": source.get("key_info"),
+                "score": round(doc_score, 3)
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+
+def build_source_index(research_data: Dict[str, Any], **kwargs) -> SourceIndex:
+    """Build the source index from a phase 2 research payload"""
+    categorized: Optional[Dict[str, Any]] = research_data.get("source_analysis", {}).get("categorized_sources")
+    return SourceIndex(categorized or {}, **kwargs)
\ No newline at end of file
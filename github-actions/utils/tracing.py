@@ -0,0 +1,309 @@
+"""Lightweight span tracing exported as OpenTelemetry (OTLP/JSON) trace files
+
+Tracing is off unless `configure_tracing()` is called or ARTICLE_FLOW_TRACE
+names an output file. When it is off, `span()` hands out a shared no-op span,
+so instrumented code costs one function call.
+
+The exported file has the OTLP/JSON `resourceSpans` layout, so it can be
+posted to an OpenTelemetry collector (`/v1/traces`) or rendered locally with
+scripts/trace_report.py.
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "article-flow"
+TRACE_ENV_VAR = "ARTICLE_FLOW_TRACE"
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("article_flow_span", default=None)
+
+
+class Span:
+    """A timed operation with attributes; children share the trace id of their parent"""
+    
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.attributes: Dict[str, Any] = {
+            "thread.id": threading.get_ident(),
+            "thread.name": threading.current_thread().name
+        }
+        if attributes:
+            self.set_attributes(attributes)
+        self._token = None
+    
+    @property
+    def recording(self) -> bool:
+        return True
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+    
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+    
+    def record_error(self, error: Union[Exception, str]) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}" if isinstance(error, Exception) else str(error)
+    
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end (or to now while running)"""
+        return ((self.end_time_ns or time.time_ns()) - self.start_time_ns) / 1e9
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or time.time_ns()),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status_code}
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class _NonRecordingSpan:
+    """Stand-in returned while tracing is disabled"""
+    
+    name = ""
+    recording = False
+    duration = 0.0
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+    
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+    
+    def record_error(self, error: Union[Exception, str]) -> None:
+        pass
+
+
+NON_RECORDING_SPAN = _NonRecordingSpan()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Encode one attribute as an OTLP AnyValue"""
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    elif isinstance(value, (list, tuple)):
+        encoded = {"arrayValue": {"values": [_otlp_attribute("", item)["value"] for item in value]}}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+class Tracer:
+    """Collects finished spans of this process and writes them as one OTLP resource"""
+    
+    def __init__(self):
+        self.enabled = False
+        self.output_path: Optional[Path] = None
+        self.append = False
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._exit_hook = False
+    
+    def configure(self, output_path: Union[str, Path], append: bool = False) -> None:
+        """Enable tracing and export to `output_path` when the process exits"""
+        self.enabled = True
+        self.output_path = Path(output_path)
+        self.append = append
+        if not self._exit_hook:
+            atexit.register(self.export)
+            self._exit_hook = True
+    
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[Span] = None,
+        activate: bool = True
+    ):
+        """Start a span under `parent` (default: the current span) and optionally make it current"""
+        if not self.enabled:
+            return NON_RECORDING_SPAN
+        if parent is None:
+            parent = _current_span.get()
+        span = Span(name, parent if isinstance(parent, Span) else None, attributes)
+        if activate:
+            span._token = _current_span.set(span)
+        return span
+    
+    def end_span(self, span, error: Optional[Union[Exception, str]] = None) -> None:
+        """Finish a span started with `start_span`"""
+        if not isinstance(span, Span) or span.end_time_ns is not None:
+            return
+        if error is not None:
+            span.record_error(error)
+        elif span.status_code == STATUS_UNSET:
+            span.status_code = STATUS_OK
+        span.end_time_ns = time.time_ns()
+        if span._token is not None:
+            try:
+                _current_span.reset(span._token)
+            except ValueError:
+                # Ended from another context (e.g. a different thread); leave that context alone
+                pass
+            span._token = None
+        with self._lock:
+            self.spans.append(span)
+    
+    def resource_spans(self) -> Dict[str, Any]:
+        """Finished spans of this process in the OTLP/JSON layout"""
+        with self._lock:
+            spans = [span.to_otlp() for span in self.spans]
+        return {
+            "resource": {"attributes": [
+                _otlp_attribute("service.name", SERVICE_NAME),
+                _otlp_attribute("process.pid", os.getpid()),
+                _otlp_attribute("process.command", Path(sys.argv[0]).name if sys.argv and sys.argv[0] else "python")
+            ]},
+            "scopeSpans": [{"scope": {"name": "article_flow.tracing"}, "spans": spans}]
+        }
+    
+    def export(self, output_path: Optional[Union[str, Path]] = None) -> Optional[Path]:
+        """Write the collected spans; in append mode, add them to spans already in the file"""
+        path = Path(output_path) if output_path else self.output_path
+        if not self.enabled or path is None or not self.spans:
+            return None
+        
+        document = {"resourceSpans": []}
+        if self.append and path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    document = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read existing trace file {path}, overwriting: {e}")
+        document.setdefault("resourceSpans", []).append(self.resource_spans())
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False)
+        with self._lock:
+            self.spans = []
+        return path
+
+
+_tracer = Tracer()
+
+# Phase scripts of the GitHub workflow run as separate processes; each appends its spans to one file
+if os.environ.get(TRACE_ENV_VAR):
+    _tracer.configure(os.environ[TRACE_ENV_VAR], append=True)
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def configure_tracing(output_path: Union[str, Path], append: bool = False) -> Tracer:
+    """Enable tracing for this process (see Tracer.configure)"""
+    _tracer.configure(output_path, append)
+    return _tracer
+
+
+def current_span():
+    """The innermost active span, or the no-op span"""
+    return _current_span.get() or NON_RECORDING_SPAN
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional[Span] = None, activate: bool = True):
+    return _tracer.start_span(name, attributes, parent, activate)
+
+
+def end_span(span, error: Optional[Union[Exception, str]] = None) -> None:
+    _tracer.end_span(span, error)
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional[Span] = None):
+    """Trace the enclosed block; exceptions mark the span as failed and propagate"""
+    active = _tracer.start_span(name, attributes, parent)
+    try:
+        yield active
+    except BaseException as e:
+        _tracer.end_span(active, e)
+        raise
+    else:
+        _tracer.end_span(active)
+
+
+@contextmanager
+def use_span(active):
+    """Make an existing span current (e.g. an article's root span in a worker thread)"""
+    if not isinstance(active, Span):
+        yield active
+        return
+    token = _current_span.set(active)
+    try:
+        yield active
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of `span` for plain and async functions"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    
+    return decorator
+
+
+def bind_context(func):
+    """Run `func` in a copy of the caller's context, so spans in worker threads keep their parent"""
+    context = contextvars.copy_context()
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.run(func, *args, **kwargs)
+    return wrapper
\ No newline at end of file
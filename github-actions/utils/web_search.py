@@ -1,6 +1,5 @@
 """Web search utilities using Bing Search API"""
 import os
-import requests
 import time
 from typing import List, Dict, Any, Optional
 from urllib.parse import quote
@@ -34,6 +33,8 @@ class BingSearchAPI:
         safe_search: str = "Moderate"
     ) -> Dict[str, Any]:
         """Perform web search"""
+        import requests
+        
         params = {
             "q": query,
             "count": count,